@@ -6,7 +6,7 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[('resources', 'resources')],
-    hiddenimports=[],
+    hiddenimports=['screens.main_screen', 'screens.input_screen', 'screens.complete_screen'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
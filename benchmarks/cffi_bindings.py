@@ -0,0 +1,95 @@
+"""
+SmartComm 바인딩 비교 벤치마크: 인라인 모드 vs 미리 빌드한 아웃오브라인 모듈
+
+시뮬레이터를 대상으로 cffi_defs import 시간과 호출당 오버헤드를 모드별로 측정한다.
+아웃오브라인 모듈이 없으면 먼저 print_utils.build_smartcomm_cffi로 생성한다.
+
+사용법:
+    python -m benchmarks.cffi_bindings --runs 10 --calls 100000 --output cffi_bench.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 자식 프로세스에서 실행: import 시간과 호출당 시간을 JSON으로 출력
+CHILD_SCRIPT = """
+import json, sys, time
+t0 = time.perf_counter()
+from print_utils.cffi_defs import ffi, lib, PAGE_FRONT, PANELID_BLACK
+import_seconds = time.perf_counter() - t0
+
+calls = int(sys.argv[1])
+handle_ptr = ffi.new("HSMART *")
+device_list = ffi.new("SMART_PRINTER_LIST *")
+lib.SmartComm_GetDeviceList2(device_list)
+lib.SmartComm_OpenDevice2(handle_ptr, device_list.item[0].id, 0)
+handle = handle_ptr[0]
+text = ffi.new("wchar_t[]", "Guest's")
+
+t0 = time.perf_counter()
+for _ in range(calls):
+    ffi.new("DRAWTEXT2INFO *")
+alloc_seconds = (time.perf_counter() - t0) / calls
+
+info = ffi.new("DRAWTEXT2INFO *")
+status = ffi.new("DWORD *")
+t0 = time.perf_counter()
+for _ in range(calls):
+    lib.SmartComm_DrawText2(handle, PAGE_FRONT, PANELID_BLACK, info, text)
+    lib.SmartComm_GetStatus(handle, status)
+call_seconds = (time.perf_counter() - t0) / (calls * 2)
+
+print(json.dumps({
+    "compiled": not hasattr(ffi, "cdef"),
+    "import_ms": import_seconds * 1000,
+    "struct_alloc_us": alloc_seconds * 1e6,
+    "call_us": call_seconds * 1e6,
+}))
+"""
+
+def run_mode(inline, calls):
+    env = dict(os.environ, SMARTCOMM_SIMULATOR="instant")
+    if inline:
+        env["SMARTCOMM_CFFI_INLINE"] = "1"
+    else:
+        env.pop("SMARTCOMM_CFFI_INLINE", None)
+    output = subprocess.check_output(
+        [sys.executable, "-c", CHILD_SCRIPT, str(calls)], cwd=ROOT_DIR, env=env
+    )
+    return json.loads(output)
+
+def median(values):
+    ordered = sorted(values)
+    return ordered[len(ordered) // 2]
+
+def main():
+    parser = argparse.ArgumentParser(description="SmartComm cffi 바인딩 비교")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--calls", type=int, default=100000)
+    parser.add_argument("--output", default="cffi_bench.json")
+    args = parser.parse_args()
+
+    if not os.path.exists(os.path.join(ROOT_DIR, "print_utils", "_smartcomm_cffi.py")):
+        subprocess.check_call([sys.executable, "-m", "print_utils.build_smartcomm_cffi"], cwd=ROOT_DIR)
+
+    results = {}
+    for mode, inline in (("inline", True), ("out_of_line", False)):
+        samples = [run_mode(inline, args.calls) for _ in range(args.runs)]
+        results[mode] = {
+            "compiled": samples[0]["compiled"],
+            "import_ms": round(median(s["import_ms"] for s in samples), 3),
+            "struct_alloc_us": round(median(s["struct_alloc_us"] for s in samples), 3),
+            "call_us": round(median(s["call_us"] for s in samples), 3),
+        }
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+가상 키보드 입력 지연 벤치마크
+
+VirtualKeyboard를 화면 없이(Qt offscreen) 띄우고 글자 키, 백스페이스, Shift를 반복해서
+눌러 '탭 → 입력창 다시 그림'까지 걸린 시간(p50/p95/p99)과 키보드 생성 시간을 측정한다.
+글자 키의 p95가 목표(기본 한 프레임, 16.7ms)를 넘으면 종료 코드 1을 반환한다.
+
+사용법:
+    python -m benchmarks.keyboard_latency --taps 500 --target-ms 16.7 --output keyboard_bench.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from benchmarks.kiosk_throughput import summarize
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_benchmark(args):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    sys.path.insert(0, ROOT_DIR)
+
+    from PySide6.QtWidgets import QApplication, QLineEdit, QWidget
+    from PySide6.QtCore import QObject, QEvent
+
+    app = QApplication.instance() or QApplication([])
+    from virtual_keyboard import VirtualKeyboard
+
+    window = QWidget()
+    window.resize(1280, 800)
+    line_edit = QLineEdit(window)
+    line_edit.setGeometry(100, 100, 800, 100)
+    window.show()
+
+    begin = time.perf_counter()
+    keyboard = VirtualKeyboard(line_edit)
+    keyboard.setGeometry(100, 300, 1200, 435)
+    keyboard.show()
+    app.processEvents()
+    construct = time.perf_counter() - begin
+
+    class PaintProbe(QObject):
+        painted = False
+
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Type.Paint:
+                self.painted = True
+            return False
+
+    probe = PaintProbe()
+    line_edit.installEventFilter(probe)
+
+    def tap(button, target):
+        """버튼을 누른 뒤 대상 위젯이 다시 그려질 때까지의 시간"""
+        probe.painted = False
+        started = time.perf_counter()
+        button.click()
+        deadline = started + 1.0
+        while not probe.painted and time.perf_counter() < deadline:
+            app.processEvents()
+        if target is not line_edit:
+            app.processEvents()
+        return time.perf_counter() - started
+
+    letters = [button for row in keyboard.button_widgets for button in row if button.text() != "←"]
+    backspace = next(button for row in keyboard.button_widgets for button in row if button.text() == "←")
+    shift = next(button for button in keyboard.findChildren(type(backspace)) if button.text().lower() == "shift")
+
+    samples = {"key": [], "backspace": [], "shift": []}
+    for i in range(args.taps):
+        samples["key"].append(tap(letters[i % len(letters)], line_edit))
+        if i % 20 == 19:
+            # 입력창이 너무 길어지지 않도록 주기적으로 지움
+            for _ in range(10):
+                samples["backspace"].append(tap(backspace, line_edit))
+            line_edit.clear()
+            app.processEvents()
+        if i % 50 == 0:
+            started = time.perf_counter()
+            shift.click()
+            app.processEvents()
+            samples["shift"].append(time.perf_counter() - started)
+
+    keyboard.close()
+    window.close()
+
+    key_stats = summarize(samples["key"])
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": vars(args),
+        "construct_ms": round(construct * 1000, 3),
+        "tap_to_paint_ms": {name: summarize(values) for name, values in samples.items()},
+        "target_met": key_stats["p95"] <= args.target_ms,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="가상 키보드 입력 지연 벤치마크")
+    parser.add_argument("--taps", type=int, default=500)
+    parser.add_argument("--target-ms", type=float, default=16.7, help="글자 키 p95 목표(ms)")
+    parser.add_argument("--output", default="keyboard_bench.json")
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output)
+    results = run_benchmark(args)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+    sys.exit(0 if results["target_met"] else 1)
+
+
+if __name__ == "__main__":
+    main()
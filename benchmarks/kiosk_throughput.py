@@ -0,0 +1,195 @@
+"""
+키오스크 처리량 벤치마크
+
+InputScreen을 화면 없이(Qt offscreen) 띄우고, 시뮬레이터 프린터와 로컬 가짜 서버를
+상대로 가상 손님을 계속 입력시켜 단계별 지연 시간(p50/p95/p99)과 시간당 처리 카드 수를 측정한다.
+결과는 JSON으로 저장해 릴리스 간 비교에 사용한다.
+
+사용법:
+    python -m benchmarks.kiosk_throughput --guests 1000 --profile fast --devices 1 --output bench.json
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(p / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def summarize(values):
+    return {
+        "count": len(values),
+        "p50": round(percentile(values, 50) * 1000, 3),
+        "p95": round(percentile(values, 95) * 1000, 3),
+        "p99": round(percentile(values, 99) * 1000, 3),
+        "max": round(max(values) * 1000, 3) if values else 0.0,
+    }
+
+
+class FakeServerHandler(BaseHTTPRequestHandler):
+    """모니터 서버 흉내: 단건/묶음 경로 모두 지연 후 200 응답"""
+    latency = 0.05
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        time.sleep(self.latency)
+        body = b'{"results": []}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fake_server(latency):
+    FakeServerHandler.latency = latency
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeServerHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class StubMainWindow:
+    def closeApplication(self):
+        pass
+
+
+def run_benchmark(args):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    os.environ["SMARTCOMM_SIMULATOR"] = args.profile
+    os.environ["SMARTCOMM_SIM_DEVICES"] = str(args.devices)
+    if args.in_process:
+        os.environ["PSAPP_PRINT_IN_PROCESS"] = "1"
+    else:
+        # 같은 호스트의 실제 키오스크 서비스와 섞이지 않도록 이번 실행 전용 서비스 사용
+        os.environ["PSAPP_PRINTER_SERVICE"] = f"psapp-bench-{os.getpid()}"
+    sys.path.insert(0, ROOT_DIR)
+
+    from PySide6.QtWidgets import QApplication
+    from PySide6.QtCore import QTimer
+
+    app = QApplication.instance() or QApplication([])
+
+    server = start_fake_server(args.server_latency)
+    import net_utils.upload_thread as upload_thread
+    upload_thread.SERVER_URL = f"http://127.0.0.1:{server.server_port}"
+
+    from main import build_stack, INPUT_INDEX
+    from virtual_keyboard import VirtualKeyboard
+
+    # 스풀 파일과 리소스 경로를 분리된 작업 디렉터리에 둠
+    work_dir = tempfile.mkdtemp(prefix="kiosk_bench_")
+    os.symlink(os.path.join(ROOT_DIR, "resources"), os.path.join(work_dir, "resources"))
+    os.chdir(work_dir)
+
+    # 앱과 같은 LazyStack 구성으로 입력 화면을 띄움 (완료 화면 전환, 미리보기, ETA 경로 포함)
+    stack = build_stack((1920, 1080), StubMainWindow())
+    stack.setCurrentIndex(INPUT_INDEX)
+    screen = stack.currentWidget()
+    keyboard = VirtualKeyboard(screen.line_edit)
+    keyboard.on_next_pressed = screen.send_text_to_server
+    screen.virtual_keyboard = keyboard
+
+    submitted_at = {}
+    stages = {"submit": [], "queue_wait": [], "print": [], "end_to_end": [], "upload": []}
+    started_at = {}
+    state = {"next_guest": 0, "done": 0, "uploaded": 0, "errors": 0}
+
+    def on_job_started(job_id, wait):
+        started_at[job_id] = time.perf_counter()
+        stages["queue_wait"].append(wait)
+
+    def on_job_done(job_id, *error):
+        now = time.perf_counter()
+        if error:
+            state["errors"] += 1
+        else:
+            stages["print"].append(now - started_at.get(job_id, now))
+            stages["end_to_end"].append(now - submitted_at[job_id])
+        state["done"] += 1
+
+    def on_uploaded(job_id, *_):
+        stages["upload"].append(time.perf_counter() - submitted_at[job_id])
+        state["uploaded"] += 1
+
+    screen.print_queue.job_started.connect(on_job_started)
+    screen.print_queue.job_finished.connect(on_job_done)
+    screen.print_queue.job_error.connect(on_job_done)
+    screen.upload_thread.upload_finished.connect(on_uploaded)
+    screen.upload_thread.upload_error.connect(on_uploaded)
+
+    def feed_guests():
+        # 대기열이 넘치지 않도록 동시에 진행 중인 손님 수를 제한
+        while state["next_guest"] < args.guests and len(screen.print_queue.pending) < args.concurrency:
+            name = f"Guest{state['next_guest']:05d}"
+            state["next_guest"] += 1
+            for char in name:
+                keyboard.button_clicked(char)
+            t0 = time.perf_counter()
+            keyboard.next_pressed()
+            stages["submit"].append(time.perf_counter() - t0)
+            job_id = max(screen.print_queue.pending) if screen.print_queue.pending else None
+            if job_id is not None:
+                submitted_at[job_id] = t0
+
+        if state["done"] >= args.guests and state["uploaded"] >= args.guests:
+            app.quit()
+
+    begin = time.perf_counter()
+    timer = QTimer()
+    timer.timeout.connect(feed_guests)
+    timer.start(1)
+    app.exec()
+    elapsed = time.perf_counter() - begin
+
+    screen.print_queue.stop()
+    screen.upload_thread.stop()
+    server.shutdown()
+
+    printed = len(stages["print"])
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": vars(args),
+        "elapsed_seconds": round(elapsed, 3),
+        "cards_printed": printed,
+        "errors": state["errors"],
+        "cards_per_hour": round(printed / elapsed * 3600, 1) if elapsed else 0.0,
+        "stages_ms": {name: summarize(values) for name, values in stages.items()},
+        "print_queue": screen.print_queue.stats(),
+        "upload": screen.upload_thread.stats(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="키오스크 처리량 벤치마크")
+    parser.add_argument("--guests", type=int, default=1000)
+    parser.add_argument("--profile", default="fast", help="시뮬레이터 지연 시간 프로필")
+    parser.add_argument("--devices", type=int, default=1, help="가상 프린터 수")
+    parser.add_argument("--concurrency", type=int, default=10, help="동시에 대기열에 있는 최대 손님 수")
+    parser.add_argument("--server-latency", type=float, default=0.05, help="가짜 서버 응답 지연(초)")
+    parser.add_argument("--in-process", action="store_true", help="프린터 서비스 없이 GUI 프로세스에서 인쇄")
+    parser.add_argument("--output", default="bench_results.json")
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output)
+    results = run_benchmark(args)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+파이프라인 인쇄 벤치마크: 직렬 경로 vs 카드 N+1을 미리 그리는 파이프라인 경로
+
+시뮬레이터 프린터 한 대에 밀린 작업을 한꺼번에 넣고 PrinterThread로 모두 인쇄해
+모드별 시간당 카드 수를 측정한다. 기본 레이아웃에 뒷면(PAGE_BACK) 페이지를 더한
+양면 카드를 쓰며, 인쇄된 카드마다 그 작업의 이름만 그려졌는지(핸들 간 섞임 없음) 확인한다.
+
+사용법:
+    python -m benchmarks.pipeline_print --cards 200 --profile fast --output pipeline_bench.json
+"""
+import argparse
+import copy
+import json
+import os
+import queue
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def duplex_spec(spec):
+    """앞면 필드를 뒷면에도 그리는 양면 레이아웃"""
+    spec = copy.deepcopy(spec)
+    back = copy.deepcopy(spec["pages"][0])
+    back["page"] = "back"
+    back["template"] = None
+    spec["pages"].append(back)
+    return spec
+
+def run_mode(lib, pipeline, cards, front_only):
+    from print_utils.card_layout import CompiledLayout, load_layout_spec, DEFAULT_LAYOUT
+    from print_utils.device_functions import PrinterSession
+    from print_utils.print_queue import PrintJob, STOP_JOB
+    from print_utils.pt import PrinterThread
+
+    device = lib.devices[0]
+    device.printed.clear()
+    session = PrinterSession(device_id=device.id)
+    job_queue = queue.PriorityQueue()
+    worker = PrinterThread(job_queue, session, pipeline=pipeline)
+    spec = load_layout_spec(DEFAULT_LAYOUT)
+    worker.layouts[DEFAULT_LAYOUT] = CompiledLayout(spec if front_only else duplex_spec(spec))
+
+    errors = []
+    worker.job_error.connect(lambda job_id, message: errors.append((job_id, message)))
+
+    session.acquire()
+    for job_id in range(1, cards + 1):
+        job_queue.put((job_id, PrintJob(job_id, f"Guest {job_id}'s")))
+    job_queue.put(STOP_JOB)
+
+    # 작업 스레드 없이 이 스레드에서 워커 루프를 끝까지 실행
+    t0 = time.perf_counter()
+    worker.run()
+    elapsed = time.perf_counter() - t0
+    session.close()
+
+    # 카드 한 장에 두 작업의 명령이 섞였거나 같은 카드가 두 번 인쇄되었는지
+    mixed = 0
+    names = set()
+    for ops in device.printed:
+        card_names = {op[-1] for op in ops if op[0] == "text"}
+        if len(card_names) != 1 or card_names & names:
+            mixed += 1
+        names |= card_names
+
+    return {
+        "pipeline": pipeline,
+        "cards": worker.printed_count,
+        "errors": len(errors),
+        "mixed_cards": mixed,
+        "pipelined": worker.pipelined_count,
+        "seconds": round(elapsed, 3),
+        "cards_per_hour": round(worker.printed_count / elapsed * 3600, 1) if elapsed else 0.0,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cards", type=int, default=200)
+    parser.add_argument("--profile", default="fast", help="시뮬레이터 지연 시간 프로필 (instant/usb/fast)")
+    parser.add_argument("--print-ms", type=float, default=None, help="SmartComm_Print 지연 시간 재정의 (ms)")
+    parser.add_argument("--draw-ms", type=float, default=None, help="DrawText2/DrawImage 지연 시간 재정의 (ms)")
+    parser.add_argument("--front-only", action="store_true", help="뒷면 없이 앞면만 그림")
+    parser.add_argument("--output", default="pipeline_bench.json")
+    args = parser.parse_args()
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    os.environ["SMARTCOMM_SIMULATOR"] = args.profile
+    os.environ["SMARTCOMM_SIM_DEVICES"] = "1"
+    sys.path.insert(0, ROOT_DIR)
+
+    # 글자 폭 맞춤에 폰트 데이터베이스가 필요
+    from PySide6.QtGui import QGuiApplication
+    app = QGuiApplication(sys.argv)
+    from print_utils.cffi_defs import lib
+
+    if args.print_ms is not None:
+        lib.set_latency("SmartComm_Print", args.print_ms / 1000)
+    if args.draw_ms is not None:
+        lib.set_latency("SmartComm_DrawText2", args.draw_ms / 1000)
+        lib.set_latency("SmartComm_DrawImage", args.draw_ms / 1000)
+
+    serial = run_mode(lib, False, args.cards, args.front_only)
+    pipelined = run_mode(lib, True, args.cards, args.front_only)
+    gain = pipelined["cards_per_hour"] / serial["cards_per_hour"] - 1 if serial["cards_per_hour"] else 0.0
+    report = {
+        "profile": args.profile,
+        "duplex": not args.front_only,
+        "serial": serial,
+        "pipelined": pipelined,
+        "gain_percent": round(gain * 100, 1),
+    }
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 0 if not serial["mixed_cards"] and not pipelined["mixed_cards"] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,103 @@
+import time
+START_TIME = time.perf_counter()
+
+# 다른 모듈보다 먼저 설치해야 전체 import 시간을 잴 수 있음
+import startup_profile
+startup_profile.install_if_requested()
+
+import importlib
 import os
 import sys
-from PySide6.QtWidgets import QApplication, QMainWindow, QStackedWidget
-from PySide6.QtCore import Qt, QCoreApplication
+import threading
+from PySide6.QtWidgets import QApplication, QMainWindow
+from PySide6.QtCore import Qt, QCoreApplication, QTimer
+from screens.lazy_stack import LazyStack
+from screens.image_cache import background_cache
 from screens.splash_screen import SplashScreen
-from screens.main_screen import MainScreen
-from screens.input_screen import InputScreen
-from screens.complete_screen import CompleteScreen
+import metrics
+from print_utils.service_protocol import SERVICE_FLAG
+
+# 화면 인덱스 (흐름 순서)
+SPLASH_INDEX = 0
+INPUT_INDEX = 2
+
+# 첫 화면 이후 백그라운드 스레드에서 미리 불러올 무거운 모듈 (requests, 인쇄 모듈)
+WARM_UP_MODULES = (
+    "net_utils.upload_thread",
+    "screens.input_screen",
+)
+
+def lazy_screen(module_name, class_name):
+    """처음 생성될 때 모듈을 import하는 화면 팩토리"""
+    def factory(stack, screen_size, main_window):
+        module = importlib.import_module(module_name)
+        return getattr(module, class_name)(stack, screen_size, main_window)
+    return factory
+
+def build_stack(screen_size, main_window):
+    """화면 흐름 순서대로 팩토리를 등록한 LazyStack (벤치마크도 같은 구성을 사용)"""
+    # 화면은 팩토리로 등록하고 처음 표시될 때 생성
+    stack = LazyStack(screen_size, main_window)
+
+    # 나머지 화면의 배경은 백그라운드에서 화면 크기로 미리 디코딩
+    for name in ("main", "input", "complete"):
+        background_cache.prefetch(f"resources/{name}.jpg", screen_size)
+
+    stack.register(SplashScreen)
+    stack.register(lazy_screen("screens.main_screen", "MainScreen"))
+    stack.register(lazy_screen("screens.input_screen", "InputScreen"))
+    stack.register(lazy_screen("screens.complete_screen", "CompleteScreen"))
+    return stack
+
+def warm_up_modules():
+    from print_utils import service_client
+    if service_client.in_process_printing():
+        modules = ("print_utils.print_queue",) + WARM_UP_MODULES
+    else:
+        # 프린터 서비스가 DLL을 불러오고 장치를 여는 동안 UI는 계속 진행
+        try:
+            service_client.ensure_service()
+        except OSError as e:
+            print(f"프린터 서비스 시작 실패: {e}")
+        modules = WARM_UP_MODULES
+
+    for module_name in modules:
+        try:
+            importlib.import_module(module_name)
+        except Exception as e:
+            print(f"모듈 미리 불러오기 실패 ({module_name}): {e}")
+    if startup_profile.profiler:
+        startup_profile.profiler.write_report()
+
+def peak_rss_mb():
+    """프로세스 최대 메모리 사용량(MB)"""
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD),
+                ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t),
+                ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t),
+                ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        ctypes.windll.psapi.GetProcessMemoryInfo(
+            ctypes.windll.kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb
+        )
+        return counters.PeakWorkingSetSize / (1024 * 1024)
+
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
 
 class PSApp(QMainWindow):
     def __init__(self):
@@ -27,35 +119,56 @@ class PSApp(QMainWindow):
         
         os.chdir(self.base_dir)
 
-        self.stack = QStackedWidget()
         self.setupStack()
 
         self.setCentralWidget(self.stack)
 
+        # 첫 화면이 그려진 뒤 시작 시간과 메모리 사용량 기록
+        QTimer.singleShot(0, self.reportStartup)
+
     def setupStack(self):
-        self.stack = QStackedWidget()
-        self.splash_screen = SplashScreen(self.stack, self.screen_size, self)
-        self.main_screen = MainScreen(self.stack, self.screen_size, self)
-        self.input_screen = InputScreen(self.stack, self.screen_size, self)
-        self.complete_screen = CompleteScreen(self.stack, self.screen_size, self)
+        self.stack = build_stack(self.screen_size, self)
+        self.stack.setCurrentIndex(SPLASH_INDEX)
+
+    def reportStartup(self):
+        elapsed = time.perf_counter() - START_TIME
+        print(f"첫 화면 표시까지 {elapsed:.3f}초, 최대 메모리 {peak_rss_mb():.1f}MB")
+        if startup_profile.profiler:
+            startup_profile.profiler.write_report()
+
+        # 단계별 지표를 localhost 엔드포인트와 파일로 내보냄
+        metrics.start_exporter()
 
-        self.stack.addWidget(self.splash_screen)
-        self.stack.addWidget(self.main_screen)
-        self.stack.addWidget(self.input_screen)
-        self.stack.addWidget(self.complete_screen)
+        # 스플래시가 보이는 동안 프린터 서비스와 네트워크/인쇄 모듈을 백그라운드에서 준비
+        threading.Thread(target=warm_up_modules, daemon=True).start()
+
+    def stopWorkers(self):
+        # 인쇄 워커(또는 프린터 서비스 연결)와 전송 스레드 종료
+        input_screen = self.stack.built_screen(INPUT_INDEX)
+        if input_screen is not None:
+            input_screen.print_queue.stop()
+            input_screen.upload_thread.stop()
 
     def keyPressEvent(self, event):
         if event.key() == Qt.Key_Escape:
             self.close()
     
+    def closeEvent(self, event):
+        self.stopWorkers()
+        super().closeEvent(event)
+
     def closeApplication(self):
         """앱 종료 동작"""
+        self.stopWorkers()
         QCoreApplication.instance().quit() 
 
 if __name__ == "__main__":
+    # 배포 실행 파일은 같은 파일을 프린터 서비스 모드로도 실행함
+    if SERVICE_FLAG in sys.argv:
+        from print_utils.printer_service import main as service_main
+        sys.exit(service_main())
+
     app = QApplication(sys.argv)
     window = PSApp()
     window.show()
     sys.exit(app.exec())
-
-
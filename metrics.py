@@ -0,0 +1,208 @@
+"""
+단계별 지연 시간 히스토그램과 카운터
+
+인쇄/전송 경로의 각 단계를 기록하고, localhost HTTP 엔드포인트(/metrics)에서
+Prometheus 텍스트 형식으로 내보내며 주기적으로 파일에도 저장한다
+(console=False 빌드에서는 print 출력이 보이지 않으므로).
+"""
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRICS_PORT_ENV = "PSAPP_METRICS_PORT"
+DEFAULT_METRICS_PORT = 9464
+DEFAULT_DUMP_PATH = "metrics.prom"
+DEFAULT_DUMP_INTERVAL = 60.0
+
+# 지연 시간 버킷 (초): USB 호출 수 ms부터 기계적 인쇄 수십 초까지
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    inner = ",".join(f'{key}="{escape_label(value)}"' for key, value in labels)
+    return "{" + inner + "}"
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.sum += value
+
+
+class MetricsRegistry:
+    """스레드 안전한 카운터/게이지/히스토그램 저장소"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}  # (이름, 레이블) -> 값
+        self.gauges = {}  # (이름, 레이블) -> 현재 값
+        self.histograms = {}  # (이름, 레이블) -> Histogram
+        self.help = {}
+
+    def describe(self, name, text):
+        self.help[name] = text
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def set(self, name, value, **labels):
+        """게이지를 현재 값으로 설정 (대기열 깊이처럼 오르내리는 값)"""
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.gauges[key] = value
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """with 블록의 실행 시간을 name 히스토그램에 기록"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def render(self):
+        """Prometheus 텍스트 형식"""
+        lines = []
+        with self.lock:
+            counters = sorted(self.counters.items())
+            gauges = sorted(self.gauges.items())
+            histograms = sorted(self.histograms.items(), key=lambda item: item[0])
+            seen = set()
+            for (name, labels), value in counters:
+                if name not in seen:
+                    seen.add(name)
+                    if name in self.help:
+                        lines.append(f"# HELP {name} {self.help[name]}")
+                    lines.append(f"# TYPE {name} counter")
+                lines.append(f"{name}{format_labels(labels)} {value}")
+
+            for (name, labels), value in gauges:
+                if name not in seen:
+                    seen.add(name)
+                    if name in self.help:
+                        lines.append(f"# HELP {name} {self.help[name]}")
+                    lines.append(f"# TYPE {name} gauge")
+                lines.append(f"{name}{format_labels(labels)} {value}")
+
+            for (name, labels), histogram in histograms:
+                if name not in seen:
+                    seen.add(name)
+                    if name in self.help:
+                        lines.append(f"# HELP {name} {self.help[name]}")
+                    lines.append(f"# TYPE {name} histogram")
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    bucket_labels = labels + (("le", repr(bound)),)
+                    lines.append(f"{name}_bucket{format_labels(bucket_labels)} {cumulative}")
+                lines.append(f"{name}_bucket{format_labels(labels + (('le', '+Inf'),))} {histogram.count}")
+                lines.append(f"{name}_sum{format_labels(labels)} {histogram.sum}")
+                lines.append(f"{name}_count{format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path=DEFAULT_DUMP_PATH):
+        """파일에 원자적으로 저장 (읽는 쪽이 반쯤 쓴 파일을 보지 않도록)"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(tmp_path, path)
+
+
+# 앱 전체에서 공유하는 지표 저장소
+metrics = MetricsRegistry()
+metrics.describe("psapp_stage_seconds", "Latency of each print/upload stage")
+metrics.describe("psapp_jobs_total", "Print jobs by result")
+metrics.describe("psapp_uploads_total", "Server uploads by result")
+metrics.describe("psapp_print_queue_depth", "Print jobs waiting to start")
+metrics.describe("psapp_print_queue_oldest_wait_seconds", "Wait time of the oldest unfinished print job")
+metrics.describe("psapp_jobs_unknown_total", "Print jobs whose result was lost when the printer service connection dropped")
+metrics.describe("psapp_deadline_exceeded_total", "SmartComm calls that did not return within their deadline")
+metrics.describe("psapp_deadline_refused_total", "SmartComm calls refused because a timed-out call still holds the handle")
+metrics.describe("psapp_smartcomm_abandoned_threads", "Helper threads left inside the DLL after a deadline")
+
+
+def trace_source():
+    """추적 중인 SmartComm lib (추적이 꺼져 있거나 아직 불러오지 않았으면 None)"""
+    cffi_defs = sys.modules.get("print_utils.cffi_defs")
+    lib = getattr(cffi_defs, "lib", None)
+    return lib if hasattr(lib, "chrome_trace") else None
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        if path == "/metrics":
+            body = metrics.render().encode("utf-8")
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        elif path == "/trace" and trace_source() is not None:
+            # SMARTCOMM_TRACE가 켜져 있으면 SDK 호출 기록을 Chrome trace로 제공
+            body = json.dumps(trace_source().chrome_trace(), ensure_ascii=False).encode("utf-8")
+            content_type = "application/json"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_exporter(port=None, dump_path=DEFAULT_DUMP_PATH, dump_interval=DEFAULT_DUMP_INTERVAL):
+    """
+    localhost /metrics 엔드포인트와 주기적 파일 저장을 백그라운드에서 시작
+
+    포트가 0이면 HTTP 엔드포인트 없이 파일만 저장한다. 서버 객체(또는 None)를 반환한다.
+    """
+    if port is None:
+        port = int(os.environ.get(METRICS_PORT_ENV, DEFAULT_METRICS_PORT))
+
+    server = None
+    if port:
+        try:
+            server = ThreadingHTTPServer(("127.0.0.1", port), MetricsHandler)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+        except OSError as e:
+            print(f"지표 엔드포인트를 열 수 없습니다 (포트 {port}): {e}")
+
+    def dump_loop():
+        while True:
+            time.sleep(dump_interval)
+            try:
+                metrics.dump(dump_path)
+            except OSError as e:
+                print(f"지표 파일 저장 실패: {e}")
+
+    threading.Thread(target=dump_loop, daemon=True).start()
+    return server
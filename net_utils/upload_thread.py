@@ -0,0 +1,286 @@
+import gzip
+import json
+import queue
+import threading
+import time
+import urllib.parse
+import requests
+from requests.adapters import HTTPAdapter
+from PySide6.QtCore import QThread, Signal
+from metrics import metrics
+
+SERVER_URL = "https://port-0-monitor-server-m47pn82w3295ead8.sel4.cloudtype.app"
+ADD_ITEM_PATH = "/items/add_test/"
+BULK_ADD_PATH = "/items/add_test/bulk/"
+
+# 연결/응답 대기 시간 제한 (초)
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = 10
+
+# 묶음 전송 기본값: 첫 항목 이후 최대 대기 시간(초)과 최대 항목 수
+BATCH_WINDOW = 2.0
+BATCH_MAX_ITEMS = 20
+
+# 묶음 전송 자체가 실패했을 때(서버에 닿지 않음 등) 다시 보내기까지의 대기 시간 (초, 실패할 때마다 두 배)
+RETRY_BACKOFF = 1.0
+MAX_RETRY_BACKOFF = 60.0
+
+def create_session():
+    """keep-alive 연결을 재사용하는 requests 세션 생성"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=2)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class UploadThread(QThread):
+    """
+    서버 전송을 GUI 스레드 밖에서 처리하는 장기 실행 워커
+
+    제출된 항목을 일정 시간 또는 개수만큼 모아 gzip 압축한 JSON 하나로 전송한다.
+    서버가 묶음 경로를 지원하지 않으면 기존 단건 경로로 전환하고,
+    서버가 실패로 알려 준 항목만 단건으로 다시 보낸다. 묶음 요청 자체가 실패하면
+    항목을 하나씩 보내 보지 않고 묶음째로 보관했다가 대기 시간을 늘려 가며 다시 보낸다.
+    하나의 세션으로 연결을 재사용하고, 모든 요청에 연결/응답 시간 제한을 둔다.
+    큐에 None이 들어오면 남은 항목을 보내고 종료한다.
+    """
+    upload_finished = Signal(int, int)  # 작업 ID, HTTP 상태 코드
+    upload_error = Signal(int, str)
+    batch_flushed = Signal(int, float)  # 묶음 크기, 첫 항목 제출부터 전송 완료까지 걸린 시간(초)
+
+    def __init__(self, server_url=None, batch_window=BATCH_WINDOW, batch_max_items=BATCH_MAX_ITEMS):
+        super().__init__()
+        self.server_url = server_url or SERVER_URL
+        self.batch_window = batch_window
+        self.batch_max_items = batch_max_items
+        self.upload_queue = queue.Queue()
+        self.session = None
+        self.bulk_supported = True
+        self.retry_batch = None  # 다시 보낼 묶음 (없으면 None)
+        self.retry_at = 0.0
+        self.retry_backoff = RETRY_BACKOFF
+        self.stop_requested = threading.Event()
+
+        # 묶음 전송 지표
+        self.batch_count = 0
+        self.item_count = 0
+        self.last_batch_size = 0
+        self.last_flush_latency = 0.0
+        self.max_flush_latency = 0.0
+
+    def submit(self, job_id, text):
+        self.upload_queue.put((job_id, text, time.monotonic()))
+
+    def stop(self, timeout_ms=5000):
+        if self.isRunning():
+            self.stop_requested.set()
+            self.upload_queue.put(None)
+            self.wait(timeout_ms)
+
+    def stats(self):
+        return {
+            "bulk_supported": self.bulk_supported,
+            "retry_pending": len(self.retry_batch or ()),
+            "batch_count": self.batch_count,
+            "item_count": self.item_count,
+            "avg_batch_size": round(self.item_count / self.batch_count, 2) if self.batch_count else 0,
+            "last_batch_size": self.last_batch_size,
+            "last_flush_latency": round(self.last_flush_latency, 3),
+            "max_flush_latency": round(self.max_flush_latency, 3),
+        }
+
+    def post_item(self, text):
+        encoded_text = urllib.parse.quote(text)
+        url = f"{self.server_url}{ADD_ITEM_PATH}?text={encoded_text}"
+        with metrics.timer("psapp_stage_seconds", stage="upload", mode="single"):
+            response = self.session.post(url, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+        response.raise_for_status()
+        return response.status_code
+
+    def post_batch(self, batch):
+        """
+        묶음을 한 번에 전송하고 (HTTP 상태 코드, 실패한 작업 ID 집합)을 반환
+
+        서버가 묶음 경로를 지원하지 않으면 None을 반환한다.
+        """
+        body = json.dumps(
+            {"items": [{"id": job_id, "text": text} for job_id, text, _ in batch]},
+            ensure_ascii=False,
+        ).encode("utf-8")
+        with metrics.timer("psapp_stage_seconds", stage="upload", mode="batch"):
+            response = self.session.post(
+                f"{self.server_url}{BULK_ADD_PATH}",
+                data=gzip.compress(body),
+                headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+                timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+            )
+        if response.status_code in (404, 405, 501):
+            return None
+        response.raise_for_status()
+
+        # 서버가 항목별 결과를 주면 실패한 항목만 골라냄
+        failed = set()
+        try:
+            results = response.json().get("results", [])
+        except ValueError:
+            results = []
+        for result in results:
+            if not result.get("ok", True):
+                failed.add(result.get("id"))
+        return response.status_code, failed
+
+    def send_single(self, job_id, text):
+        try:
+            status_code = self.post_item(text)
+            metrics.inc("psapp_uploads_total", result="ok")
+            self.upload_finished.emit(job_id, status_code)
+        except Exception as e:
+            metrics.inc("psapp_uploads_total", result="error")
+            self.upload_error.emit(job_id, f"요청 중 오류 발생: {e}")
+
+    def flush(self, batch, final=False):
+        """묶음을 보냄. final이면(종료 중) 묶음 전송이 실패해도 다시 보내지 않고 오류로 보고"""
+        if self.bulk_supported and len(batch) > 1:
+            try:
+                outcome = self.post_batch(batch)
+            except Exception as e:
+                self.retry_later(batch, e, final)
+                return
+            self.retry_backoff = RETRY_BACKOFF
+
+            if outcome is None:
+                print("서버가 묶음 전송을 지원하지 않아 단건 전송으로 전환합니다.")
+                self.bulk_supported = False
+            else:
+                status_code, failed = outcome
+                for job_id, text, _ in batch:
+                    if job_id in failed:
+                        self.send_single(job_id, text)
+                    else:
+                        metrics.inc("psapp_uploads_total", result="ok")
+                        self.upload_finished.emit(job_id, status_code)
+                self.record_flush(batch)
+                return
+
+        if len(batch) == 1:
+            # 항목 하나짜리 묶음도 요청 자체가 실패하면 묶음과 같이 나중에 다시 보냄
+            job_id, text, _ = batch[0]
+            try:
+                status_code = self.post_item(text)
+            except Exception as e:
+                self.retry_later(batch, e, final)
+                return
+            self.retry_backoff = RETRY_BACKOFF
+            metrics.inc("psapp_uploads_total", result="ok")
+            self.upload_finished.emit(job_id, status_code)
+            self.record_flush(batch)
+            return
+
+        for job_id, text, _ in batch:
+            self.send_single(job_id, text)
+        self.record_flush(batch)
+
+    def retry_later(self, batch, error, final):
+        """요청 자체가 실패한 묶음을 대기 시간 뒤에 다시 보내도록 보관 (final이면 오류로 보고)"""
+        metrics.inc("psapp_uploads_total", amount=len(batch), result="error")
+        if final:
+            for job_id, _, _ in batch:
+                self.upload_error.emit(job_id, f"요청 중 오류 발생: {error}")
+            return
+        # 항목마다 단건으로 보내 봐야 같은 이유로 실패하므로 묶음째로 나중에 다시 보냄
+        print(f"묶음 전송 실패, {self.retry_backoff:.0f}초 후 다시 보냅니다: {error}")
+        self.retry_batch = batch
+        self.retry_at = time.monotonic() + self.retry_backoff
+        self.retry_backoff = min(self.retry_backoff * 2, MAX_RETRY_BACKOFF)
+
+    def record_flush(self, batch):
+        latency = time.monotonic() - batch[0][2]
+        self.batch_count += 1
+        self.item_count += len(batch)
+        self.last_batch_size = len(batch)
+        self.last_flush_latency = latency
+        self.max_flush_latency = max(self.max_flush_latency, latency)
+        self.batch_flushed.emit(len(batch), latency)
+
+    def collect_batch(self, first):
+        """
+        첫 항목 이후 묶음 창이 닫히거나 최대 개수가 찰 때까지 항목을 모음
+
+        창이 이미 지났어도(재전송 뒤 밀린 항목 등) 큐에 들어와 있는 항목은 함께 보낸다.
+        """
+        batch = [first]
+        deadline = first[2] + self.batch_window
+        stopping = False
+        while len(batch) < self.batch_max_items:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    item = self.upload_queue.get(timeout=remaining)
+                else:
+                    item = self.upload_queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                stopping = True
+                break
+            batch.append(item)
+        return batch, stopping
+
+    def collect_retry(self):
+        """
+        다시 보낼 때까지 기다리는 동안 들어온 항목을 실패한 묶음에 더함
+
+        묶음이 최대 개수에 이르면 더 꺼내지 않고 나머지는 큐에 남겨 다음 묶음으로 보낸다.
+        """
+        batch, self.retry_batch = self.retry_batch, None
+        stopping = False
+        while True:
+            remaining = self.retry_at - time.monotonic()
+            if remaining <= 0:
+                break
+            if len(batch) >= self.batch_max_items:
+                stopping = self.stop_requested.wait(remaining)
+                break
+            try:
+                item = self.upload_queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                stopping = True
+                break
+            batch.append(item)
+        return batch, stopping
+
+    def drain(self):
+        """종료 중: 큐에 남은 항목을 모두 꺼냄"""
+        items = []
+        while True:
+            try:
+                item = self.upload_queue.get_nowait()
+            except queue.Empty:
+                return items
+            if item is not None:
+                items.append(item)
+
+    def run(self):
+        self.session = create_session()
+        try:
+            while True:
+                if self.retry_batch:
+                    batch, stopping = self.collect_retry()
+                else:
+                    item = self.upload_queue.get()
+                    if item is None:
+                        break
+                    batch, stopping = self.collect_batch(item)
+
+                self.flush(batch, final=stopping)
+                if stopping:
+                    # 큐에 남은 항목도 최대 개수씩 나눠 보냄
+                    rest = self.drain()
+                    for start in range(0, len(rest), self.batch_max_items):
+                        self.flush(rest[start:start + self.batch_max_items], final=True)
+                    break
+        finally:
+            self.session.close()
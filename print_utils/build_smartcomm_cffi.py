@@ -0,0 +1,22 @@
+"""
+SmartComm 바인딩 아웃오브라인(ABI) 모듈 빌드 스크립트
+
+선언을 미리 파싱해 구조체 배치까지 계산한 print_utils/_smartcomm_cffi.py를 생성한다.
+컴파일러가 필요 없으며, 생성된 모듈이 있으면 cffi_defs가 자동으로 사용한다.
+wchar_t 크기가 플랫폼마다 다르므로 실제 배포할 플랫폼(Windows)에서 빌드해야 한다.
+
+사용법:
+    python -m print_utils.build_smartcomm_cffi
+"""
+from pathlib import Path
+from cffi import FFI
+from print_utils.smartcomm_cdef import define_bindings
+
+ffibuilder = FFI()
+define_bindings(ffibuilder)
+# 두 번째 인자가 None이면 C 소스 없이 ABI 모드 모듈(.py)만 생성
+ffibuilder.set_source("_smartcomm_cffi", None)
+
+if __name__ == "__main__":
+    output_dir = Path(__file__).parent
+    ffibuilder.emit_python_code(str(output_dir / "_smartcomm_cffi.py"))
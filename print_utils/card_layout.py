@@ -0,0 +1,163 @@
+import json
+from pathlib import Path
+from .cffi_defs import ffi, lib, PAGE_FRONT, PAGE_BACK, PANELID_COLOR, PANELID_BLACK, PANELID_OVERLAY, PANELID_UV
+from .card_template import template_cache
+from .text_fit import fit_font_width
+from metrics import metrics
+
+LAYOUTS_DIR = Path(__file__).parent / ".." / "resources" / "layouts"
+DEFAULT_LAYOUT = "default"
+
+# 필드 하나에 넣을 수 있는 최대 wchar_t 개수 (텍스트 버퍼를 미리 할당)
+MAX_TEXT_LENGTH = 128
+
+# Windows의 wchar_t는 UTF-16 코드 단위라 BMP 밖 글자(이모지 등)는 두 칸을 차지함
+WCHAR_SIZE = ffi.sizeof("wchar_t")
+WCHAR_ENCODING = "utf-16-le" if WCHAR_SIZE == 2 else "utf-32-le"
+
+PAGES = {"front": PAGE_FRONT, "back": PAGE_BACK}
+PANELS = {
+    "color": PANELID_COLOR,
+    "black": PANELID_BLACK,
+    "overlay": PANELID_OVERLAY,
+    "uv": PANELID_UV,
+}
+# DRAWTEXT2INFO.style / align 플래그
+STYLE_FLAGS = {"bold": 0x01, "italic": 0x02, "underline": 0x04, "strikeout": 0x08}
+ALIGN_FLAGS = {"left": 0x00, "center": 0x01, "right": 0x02, "top": 0x00, "vcenter": 0x10, "bottom": 0x20}
+
+def layout_signature(spec):
+    """레이아웃이 그리는 (면, 패널) 목록. 인쇄 시간 추정의 키로 쓴다"""
+    passes = set()
+    for page_spec in spec["pages"]:
+        page = page_spec.get("page", "front")
+        if page_spec.get("template"):
+            # 배경 템플릿은 컬러 패널에 그림 (CardTemplate.draw)
+            passes.add((page, "color"))
+        for field in page_spec.get("fields", []):
+            passes.add((page, field.get("panel", "black")))
+    return tuple(sorted(passes))
+
+def to_flags(value, names):
+    """["bold", ...] 같은 이름 목록이나 숫자를 플래그 값으로 변환"""
+    if isinstance(value, int):
+        return value
+    flags = 0
+    for name in value:
+        flags |= names[name]
+    return flags
+
+
+class TextOp:
+    """
+    미리 할당해 둔 DRAWTEXT2INFO와 텍스트 버퍼로 DrawText2를 호출하는 그리기 명령
+
+    카드마다 바뀌는 것은 텍스트 버퍼 내용과 (맞춤 모드일 때) fontWidth뿐이다.
+    """
+    stage = "draw_text"
+
+    def __init__(self, page, field):
+        self.name = field["name"]
+        self.page = page
+        self.panel = PANELS[field.get("panel", "black")]
+        self.source = field.get("source", "text")
+        self.font = field.get("font", "Pretendard")
+        self.style = to_flags(field.get("style", []), STYLE_FLAGS)
+
+        x, y, width, height = field["box"]
+        self.info = ffi.new("DRAWTEXT2INFO *")
+        self.info.x = x
+        self.info.y = y
+        self.info.cx = width
+        self.info.cy = height
+        self.info.rotate = field.get("rotate", 0)
+        self.info.align = to_flags(field.get("align", ["center", "vcenter"]), ALIGN_FLAGS)
+        self.info.fontHeight = field.get("font_height", 14)
+        self.info.style = self.style
+        self.info.color = field.get("color", 0)
+        self.info.option = field.get("option", 0)
+        self.info.szFaceName = self.font[:31]
+
+        font_width = field.get("font_width", "fit")
+        self.fit = font_width == "fit"
+        self.max_font_width = field.get("max_font_width", 25)
+        self.info.fontWidth = self.max_font_width if self.fit else font_width
+
+        self.text = ffi.new("wchar_t[]", MAX_TEXT_LENGTH + 1)
+
+    def set_text(self, text):
+        # 코드 단위로 잘라 복사 (잘린 서로게이트 쌍의 앞쪽 반은 버림)
+        encoded = text.encode(WCHAR_ENCODING)[:MAX_TEXT_LENGTH * WCHAR_SIZE]
+        text = encoded.decode(WCHAR_ENCODING, errors="ignore")
+        encoded = text.encode(WCHAR_ENCODING)
+        ffi.memmove(self.text, encoded, len(encoded))
+        self.text[len(encoded) // WCHAR_SIZE] = "\0"
+        if self.fit:
+            with metrics.timer("psapp_stage_seconds", stage="fit"):
+                self.info.fontWidth = fit_font_width(
+                    text, self.info.cx, self.font, bool(self.style & STYLE_FLAGS["bold"]), self.max_font_width
+                )
+
+    def draw(self, device_handle):
+        return lib.SmartComm_DrawText2(device_handle, self.page, self.panel, self.info, self.text)
+
+
+class TemplateOp:
+    """페이지 배경 템플릿을 DrawImage 한 번으로 그리는 명령"""
+    stage = "draw_image"
+
+    def __init__(self, page, template_name):
+        self.name = f"배경({template_name})"
+        self.page = page
+        self.template_name = template_name
+
+    def draw(self, device_handle):
+        return template_cache.get(self.template_name).draw(device_handle, self.page)
+
+
+class CompiledLayout:
+    """
+    데이터 파일의 카드 레이아웃을 그리기 명령 목록으로 한 번 컴파일한 것
+
+    구조체와 버퍼를 재사용하므로 인쇄 워커마다 따로 만들어 쓴다.
+    """
+
+    def __init__(self, spec):
+        self.name = spec.get("name", DEFAULT_LAYOUT)
+        self.signature = layout_signature(spec)
+        for template_name, layers in spec.get("templates", {}).items():
+            template_cache.register(template_name, [tuple(layer) for layer in layers])
+
+        self.ops = []
+        self.text_ops = []
+        for page_spec in spec["pages"]:
+            page = PAGES[page_spec.get("page", "front")]
+            if page_spec.get("template"):
+                self.ops.append(TemplateOp(page, page_spec["template"]))
+            for field in page_spec.get("fields", []):
+                op = TextOp(page, field)
+                self.ops.append(op)
+                self.text_ops.append(op)
+
+    def prepare(self, values):
+        """이번 카드의 값으로 텍스트 버퍼만 갱신"""
+        for op in self.text_ops:
+            op.set_text(values.get(op.source, ""))
+
+    def draw(self, device_handle, device_id=""):
+        """모든 명령을 그림. 실패하면 (결과 코드, 명령 이름), 성공하면 (0, None)"""
+        for op in self.ops:
+            with metrics.timer("psapp_stage_seconds", stage=op.stage, device=device_id):
+                result = op.draw(device_handle)
+            if result != 0:
+                return result, op.name
+        return 0, None
+
+
+def load_layout_spec(name=DEFAULT_LAYOUT):
+    path = (LAYOUTS_DIR / f"{name}.json").resolve()
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def compile_layout(name=DEFAULT_LAYOUT):
+    return CompiledLayout(load_layout_spec(name))
@@ -0,0 +1,118 @@
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from PySide6.QtCore import QRectF
+from PySide6.QtGui import QImage, QPainter, QColor
+from .cffi_defs import ffi, lib, PAGE_FRONT, PANELID_COLOR
+
+RESOURCES_DIR = Path(__file__).parent / ".." / "resources"
+
+# 카드 인쇄 영역 크기 (px, 세로 방향)
+CARD_WIDTH = 640
+CARD_HEIGHT = 1024
+
+# 디코딩된 템플릿을 메모리에 유지할 최대 개수
+DEFAULT_CACHE_SIZE = 4
+
+CACHE_DIR = Path(tempfile.gettempdir()) / "psapp_templates"
+
+class CardTemplate:
+    """
+    한 번 래스터화해 둔 카드 배경
+
+    정적 레이어들을 카드 크기의 이미지 하나로 합성해 BMP로 저장해 두고,
+    DrawImage에 넘길 경로 버퍼를 미리 만들어 둔다.
+    """
+
+    def __init__(self, name, image, path):
+        self.name = name
+        self.image = image
+        self.path = path
+        self.path_w = ffi.new("wchar_t[]", str(path))
+        self.rect_area = ffi.new("RECT *")
+
+    def draw(self, device_handle, page=PAGE_FRONT, panel=PANELID_COLOR):
+        """배경을 DrawImage 한 번으로 그림"""
+        return lib.SmartComm_DrawImage(
+            device_handle, page, panel, 0, 0, CARD_WIDTH, CARD_HEIGHT, self.path_w, self.rect_area
+        )
+
+
+class CardTemplateCache:
+    """
+    템플릿 이름 -> CardTemplate LRU 캐시
+
+    템플릿은 resources 폴더의 이미지 레이어 목록 [(파일명, x, y, 폭, 높이), ...]으로
+    등록하고, 처음 쓰일 때 한 번만 래스터화한다. 작업마다 이미지 파일을 다시 찾거나
+    읽지 않는다. 여러 인쇄 워커에서 동시에 사용할 수 있다.
+    """
+
+    def __init__(self, max_size=DEFAULT_CACHE_SIZE, cache_dir=CACHE_DIR):
+        self.max_size = max_size
+        self.cache_dir = Path(cache_dir)
+        self.layers = {}
+        self.templates = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def register(self, name, layers):
+        with self.lock:
+            self.layers[name] = list(layers)
+            self.templates.pop(name, None)
+
+    def get(self, name):
+        with self.lock:
+            template = self.templates.get(name)
+            if template is not None:
+                self.templates.move_to_end(name)
+                self.hits += 1
+                return template
+
+            self.misses += 1
+            template = self.rasterize(name, self.layers[name])
+            self.templates[name] = template
+            while len(self.templates) > self.max_size:
+                self.templates.popitem(last=False)
+            return template
+
+    def rasterize(self, name, layers):
+        image = QImage(CARD_WIDTH, CARD_HEIGHT, QImage.Format.Format_RGB888)
+        image.fill(QColor("white"))
+
+        # 원본 파일이 바뀌면 다른 캐시 파일이 되도록 수정 시각과 크기도 키에 포함
+        sources = []
+        painter = QPainter(image)
+        for filename, x, y, width, height in layers:
+            source = (RESOURCES_DIR / filename).resolve()
+            try:
+                stat = source.stat()
+                sources.append((filename, stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                sources.append((filename, None, None))
+            layer = QImage(str(source))
+            painter.drawImage(QRectF(x, y, width, height), layer)
+        painter.end()
+
+        # 레이어 구성과 원본 파일이 같으면 같은 파일을 재사용
+        digest = hashlib.sha1(repr((layers, sources)).encode("utf-8")).hexdigest()[:12]
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = (self.cache_dir / f"{name}-{digest}.bmp").resolve()
+        if not path.exists():
+            image.save(str(path), "BMP")
+
+        return CardTemplate(name, image, path)
+
+    def stats(self):
+        return {
+            "cached": list(self.templates),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+# 앱 전체에서 공유하는 템플릿 캐시
+template_cache = CardTemplateCache()
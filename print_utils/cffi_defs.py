@@ -1,133 +1,28 @@
+import os
 from pathlib import Path
 from cffi import FFI
+from .smartcomm_cdef import define_bindings
 
-ffi = FFI()
+# 설정하면 미리 빌드한 _smartcomm_cffi 모듈이 있어도 인라인 모드를 사용
+INLINE_ENV = "SMARTCOMM_CFFI_INLINE"
 
-ffi.cdef("""
-#define MAX_SMART_PRINTER 32
-         
-#define SMART_OPENDEVICE_BYID 0
-#define SMART_OPENDEVICE_BYDESC 1
-         
-#define PAGE_FRONT 0
-#define PAGE_BACK 1
-         
-#define PANELID_COLOR 1
-#define PANELID_BLACK 2
-#define PANELID_OVERLAY 4
-#define PANELID_UV 8
+def create_ffi():
+    """
+    미리 빌드한 아웃오브라인 모듈(_smartcomm_cffi)이 있으면 그 ffi를 사용하고,
+    없으면 실행할 때마다 선언을 파싱하는 인라인 모드로 동작
+    """
+    if not os.environ.get(INLINE_ENV):
+        try:
+            from ._smartcomm_cffi import ffi
+            return ffi
+        except ImportError:
+            pass
 
-typedef void* HSMART;
-         
-typedef void* RECT;
+    ffi = FFI()
+    define_bindings(ffi)
+    return ffi
 
-typedef unsigned int DWORD;
-typedef int LONG;
-typedef unsigned short WORD;
-typedef unsigned char BYTE;
-
-typedef struct {
-    wchar_t name[128];
-    wchar_t id[64];
-    wchar_t dev[64];
-    wchar_t desc[256];
-    int pid;
-} SMART_PRINTER_ITEM;
-
-typedef struct {
-    int n;
-    SMART_PRINTER_ITEM item[MAX_SMART_PRINTER];
-} SMART_PRINTER_LIST;
-         
-typedef struct tagBITMAPINFOHEADER {
-    DWORD biSize;
-    LONG biWidth;
-    LONG biHeight;
-    WORD biPlanes;
-    WORD biBitCount;
-    DWORD biCompression;
-    DWORD biSizeImage;
-    LONG biXPelsPerMeter;
-    LONG biYPelsPerMeter;
-    DWORD biClrUsed;
-    DWORD biClrImportant;
-} BITMAPINFOHEADER;
-
-typedef struct tagRGBQUAD {
-    BYTE rgbBlue;
-    BYTE rgbGreen;
-    BYTE rgbRed;
-    BYTE rgbReserved;
-} RGBQUAD;
-
-typedef struct tagBITMAPINFO {
-    BITMAPINFOHEADER bmiHeader;
-    RGBQUAD bmiColors[1];
-} BITMAPINFO;
-
-typedef struct {
-    DWORD side;
-    DWORD orientation;
-    DWORD ribbon;
-    DWORD ribbon_type;
-    DWORD width;
-    DWORD height;
-} SMART_SURFACE_PROPERTIES;
-         
-int SmartComm_GetDeviceList2(SMART_PRINTER_LIST* pDevList);
-int SmartComm_OpenDevice2(HSMART* pHandle, wchar_t* szDevice, int nDevType);
-int SmartComm_DrawImage(HSMART hHandle, unsigned char page, unsigned char panel,
-                        int x, int y, int cx, int cy, wchar_t* szImgPath, RECT* prcArea);
-int SmartComm_GetPreviewBitmap(HSMART hHandle, unsigned char page, BITMAPINFO** const ppbi);
-int SmartComm_Print(HSMART hHandle);
-int SmartComm_CloseDevice(HSMART hHandle);
-int SmartComm_GetStatus(HSMART hHandle, DWORD* pStatus);
-int SmartComm_DrawText(
-    HSMART hHandle, 
-    BYTE page, 
-    BYTE panel, 
-    int x, 
-    int y, 
-    WCHAR* szFontName, 
-    int nFontSize, 
-    BYTE nFontStyle, 
-    WCHAR* szText, 
-    RECT* prcArea
-);
-
-
-typedef struct {
-    int x;
-    int y;
-    int cx;
-    int cy;
-    int rotate;
-    int align;
-    int fontHeight;
-    int fontWidth;
-    int style;
-    unsigned long color;
-    int option;
-    wchar_t szFaceName[32];
-} DRAWTEXT2INFO;
-
-int SmartComm_DrawText2(
-    HSMART hHandle, 
-    BYTE page, 
-    BYTE panel, 
-    DRAWTEXT2INFO* pdt2info, 
-    wchar_t* szText
-);
-         
-int SmartComm_GetRibbonType( 
-    HSMART hHandle,  
-    int* pnRibbonType 
-);
-
-""")
-
-dll_path = Path(__file__).parent / ".." / "resources" / "SmartComm2.dll"
-lib = ffi.dlopen(str(dll_path.resolve()))
+ffi = create_ffi()
 
 MAX_SMART_PRINTER = 32
 SMART_OPENDEVICE_BYID = 0
@@ -137,4 +32,45 @@ PAGE_BACK = 1
 PANELID_COLOR = 1
 PANELID_BLACK = 2
 PANELID_OVERLAY = 4
-PANELID_UV = 8
\ No newline at end of file
+PANELID_UV = 8
+
+# 설정하면 DLL 대신 시뮬레이터를 사용 (값은 지연 시간 프로필 이름, 예: "usb")
+SIMULATOR_ENV = "SMARTCOMM_SIMULATOR"
+SIMULATOR_DEVICES_ENV = "SMARTCOMM_SIM_DEVICES"
+# 설정하면 모든 SmartComm_* 호출을 링 버퍼에 기록 (값이 파일 경로면 종료 시 Chrome trace로 저장)
+TRACE_ENV = "SMARTCOMM_TRACE"
+# 호출별 제한 시간 배율 (기본 1, "0"이면 제한 시간 없이 직접 호출)
+DEADLINE_ENV = "SMARTCOMM_DEADLINE_SCALE"
+
+def load_library():
+    profile = os.environ.get(SIMULATOR_ENV)
+    if profile:
+        from .simulator import SimulatedSmartComm
+        device_count = int(os.environ.get(SIMULATOR_DEVICES_ENV, "1"))
+        return SimulatedSmartComm(ffi, device_count=device_count, profile=profile)
+
+    dll_path = Path(__file__).parent / ".." / "resources" / "SmartComm2.dll"
+    return ffi.dlopen(str(dll_path.resolve()))
+
+def enable_tracing(library):
+    from .ffi_trace import TracingLib
+    tracing_lib = TracingLib(library, ffi)
+
+    trace_path = os.environ.get(TRACE_ENV)
+    if trace_path and trace_path != "1":
+        import atexit
+        atexit.register(tracing_lib.export_chrome_trace, trace_path)
+    return tracing_lib
+
+def enable_deadlines(library):
+    scale = float(os.environ.get(DEADLINE_ENV, "1"))
+    if scale <= 0:
+        return library
+    from .deadline import DeadlineLib
+    return DeadlineLib(library, scale=scale)
+
+lib = load_library()
+if os.environ.get(TRACE_ENV):
+    lib = enable_tracing(lib)
+# 추적은 실제 호출 시간을 기록하도록 제한 시간 래퍼 안쪽에 둠
+lib = enable_deadlines(lib)
@@ -0,0 +1,112 @@
+import threading
+import time
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"  # 백그라운드 탐침 중
+
+# 연속 실패가 이만큼 쌓이면 회로를 엶
+FAILURE_THRESHOLD = 3
+# 회로가 열린 뒤 첫 탐침까지의 간격과 최대 간격 (초, 탐침이 실패할 때마다 두 배)
+PROBE_INTERVAL = 2.0
+MAX_PROBE_INTERVAL = 30.0
+
+# 실패 종류: 제한 시간 초과(느리거나 멈춘 프린터)와 오류 코드(끊기거나 꺼진 프린터)
+KIND_TIMEOUT = "timeout"
+KIND_ERROR = "error"
+
+class CircuitBreaker:
+    """
+    프린터 한 대의 회로 차단기
+
+    연속으로 실패하면 열려서 새 작업이 DLL 제한 시간을 기다리지 않고 바로 돌아가게 하고,
+    상태 모니터가 백그라운드에서 탐침해 성공하면 다시 닫힌다.
+    상태가 바뀔 때마다 on_change(장치 ID, 상태, 이유)를 호출한다 (호출한 스레드에서).
+    """
+
+    def __init__(self, name="", failure_threshold=FAILURE_THRESHOLD, on_change=None):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.on_change = on_change
+        self.condition = threading.Condition()
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.last_reason = None
+        self.last_kind = None
+        self.opened_at = None
+        self.probe_interval = PROBE_INTERVAL
+        self.next_probe_at = 0.0
+        self.open_count = 0
+        self.probe_count = 0
+
+    def allow(self):
+        """새 작업을 보내도 되는지 (닫혀 있을 때만)"""
+        return self.state == STATE_CLOSED
+
+    def wait_closed(self, timeout):
+        """회로가 닫히거나 timeout이 지날 때까지 기다림. 닫혀 있으면 True"""
+        with self.condition:
+            if self.state != STATE_CLOSED:
+                self.condition.wait(timeout)
+            return self.state == STATE_CLOSED
+
+    def record_success(self):
+        with self.condition:
+            self.failures = 0
+            if self.state == STATE_CLOSED:
+                return
+            self.state = STATE_CLOSED
+            self.opened_at = None
+            self.probe_interval = PROBE_INTERVAL
+            self.condition.notify_all()
+        self.notify("복구됨")
+
+    def record_failure(self, reason, kind=KIND_ERROR):
+        with self.condition:
+            self.failures += 1
+            self.last_reason = reason
+            self.last_kind = kind
+            if self.state == STATE_HALF_OPEN:
+                # 탐침 실패: 다음 탐침까지 간격을 늘림
+                self.state = STATE_OPEN
+                self.probe_interval = min(self.probe_interval * 2, MAX_PROBE_INTERVAL)
+                self.next_probe_at = time.monotonic() + self.probe_interval
+                return
+            if self.state == STATE_OPEN or self.failures < self.failure_threshold:
+                return
+            self.state = STATE_OPEN
+            self.opened_at = time.monotonic()
+            self.open_count += 1
+            self.next_probe_at = self.opened_at + self.probe_interval
+        self.notify(f"{kind}: {reason}")
+
+    def probe_due(self):
+        return self.state == STATE_OPEN and time.monotonic() >= self.next_probe_at
+
+    def seconds_until_probe(self):
+        if self.state != STATE_OPEN:
+            return None
+        return max(0.0, self.next_probe_at - time.monotonic())
+
+    def begin_probe(self):
+        with self.condition:
+            if self.state != STATE_OPEN:
+                return False
+            self.state = STATE_HALF_OPEN
+            self.probe_count += 1
+            return True
+
+    def notify(self, reason):
+        if self.on_change:
+            self.on_change(self.name, self.state, reason)
+
+    def stats(self):
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "last_kind": self.last_kind,
+            "last_reason": self.last_reason,
+            "open_for": round(time.monotonic() - self.opened_at, 1) if self.opened_at else 0.0,
+            "opens": self.open_count,
+            "probes": self.probe_count,
+        }
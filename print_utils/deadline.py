@@ -0,0 +1,161 @@
+"""
+SmartComm_* 호출마다 제한 시간을 두는 lib 래퍼
+
+DLL 호출은 중간에 취소할 수 없으므로, 호출한 스레드마다 전용 보조 스레드를 하나 두고
+그 스레드에서 호출한 뒤 제한 시간만큼만 기다린다. 시간을 넘기면 DEADLINE_EXCEEDED를
+반환하고 멈춘 보조 스레드는 버린다 (다음 호출은 새 보조 스레드에서 실행).
+보조 스레드는 데몬 스레드이므로 DLL 안에서 멈춘 채 버려져도 프로세스 종료를 막지 않는다.
+같은 워커의 호출은 항상 같은 보조 스레드에서 순서대로 실행된다.
+
+버린 스레드는 DLL 안에 남아 있으므로, 그 호출이 끝날 때까지 같은 핸들로 들어오는 호출은
+DLL에 넘기지 않고 바로 DEADLINE_EXCEEDED를 반환한다 (닫기만 허용). 세션은 이 결과를 받으면
+핸들을 닫고 새로 연다.
+"""
+import queue
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from metrics import metrics
+
+# 앱에서 정한 결과 코드: 제한 시간 안에 DLL이 반환하지 않음 (SDK 오류 코드와 겹치지 않는 값)
+DEADLINE_EXCEEDED = -1000
+
+# 함수별 제한 시간 (초). 없는 함수는 기본값을 사용
+DEFAULT_DEADLINE = 5.0
+CALL_DEADLINES = {
+    "SmartComm_GetDeviceList2": 10.0,
+    "SmartComm_OpenDevice2": 10.0,
+    "SmartComm_CloseDevice": 5.0,
+    "SmartComm_GetStatus": 3.0,
+    "SmartComm_GetRibbonType": 3.0,
+    "SmartComm_Print": 90.0,
+}
+
+
+class CallWorker:
+    """
+    큐로 받은 호출을 순서대로 실행하는 데몬 보조 스레드
+
+    ThreadPoolExecutor의 작업 스레드는 인터프리터 종료 때 join되므로, 멈춘 호출이 남아
+    있으면 앱과 프린터 서비스가 끝나지 않는다. 그래서 데몬 스레드를 직접 둔다.
+    """
+
+    def __init__(self, name):
+        self.calls = queue.SimpleQueue()
+        self.thread = threading.Thread(target=self.run, name=name, daemon=True)
+        self.thread.start()
+
+    def submit(self, func, *args):
+        future = Future()
+        self.calls.put((future, func, args))
+        return future
+
+    def shutdown(self):
+        """지금 실행 중인 호출이 끝나면 스레드를 끝냄 (기다리지 않음)"""
+        self.calls.put(None)
+
+    def run(self):
+        while True:
+            call = self.calls.get()
+            if call is None:
+                return
+            future, func, args = call
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(func(*args))
+            except BaseException as e:
+                future.set_exception(e)
+
+
+class DeadlineLib:
+    """lib의 SmartComm_* 함수를 제한 시간이 있는 호출로 감싸고 나머지 속성은 그대로 넘김"""
+
+    def __init__(self, lib, deadlines=None, scale=1.0):
+        self._lib = lib
+        self._deadlines = dict(CALL_DEADLINES)
+        self._deadlines.update(deadlines or {})
+        self._scale = scale
+        self._local = threading.local()
+        self._wrappers = {}
+        self._stuck_lock = threading.Lock()
+        self._stuck = {}  # 제한 시간을 넘긴 호출이 아직 쓰고 있는 핸들 -> 함수 이름
+        self.exceeded_count = 0
+        self.abandoned_threads = 0
+        self.refused_count = 0
+
+    def __getattr__(self, name):
+        target = getattr(self._lib, name)
+        if not name.startswith("SmartComm_") or not callable(target):
+            return target
+
+        wrapper = self._wrappers.get(name)
+        if wrapper is None:
+            wrapper = self._wrap(name, target)
+            self._wrappers[name] = wrapper
+        return wrapper
+
+    def deadline(self, name):
+        return self._deadlines.get(name, DEFAULT_DEADLINE) * self._scale
+
+    def _executor(self):
+        executor = getattr(self._local, "executor", None)
+        if executor is None:
+            executor = CallWorker(f"smartcomm-{threading.current_thread().name}")
+            self._local.executor = executor
+        return executor
+
+    def _abandon(self, name, future, handle):
+        """멈춘 보조 스레드를 버림 (스레드는 DLL이 반환하면 스스로 끝나고 핸들 표시를 지움)"""
+        executor = self._local.executor
+        self._local.executor = None
+        executor.shutdown()
+        self.abandoned_threads += 1
+        metrics.set("psapp_smartcomm_abandoned_threads", self.abandoned_threads)
+
+        if handle is None:
+            return
+        with self._stuck_lock:
+            self._stuck[handle] = name
+        future.add_done_callback(lambda _: self._unstick(handle))
+
+    def _unstick(self, handle):
+        with self._stuck_lock:
+            self._stuck.pop(handle, None)
+
+    def _is_stuck(self, handle):
+        with self._stuck_lock:
+            return handle in self._stuck
+
+    def _wrap(self, name, func):
+        # 첫 인자가 HSMART 핸들인 함수만 핸들별로 막음 (열기/목록 조회는 출력 포인터를 받음)
+        takes_handle = name not in ("SmartComm_OpenDevice2", "SmartComm_GetDeviceList2")
+        closes_handle = name == "SmartComm_CloseDevice"
+
+        def call(*args):
+            handle = args[0] if takes_handle and args else None
+            if handle is not None and not closes_handle and self._is_stuck(handle):
+                # 멈춘 호출과 같은 핸들로 DLL에 동시에 들어가지 않음
+                self.refused_count += 1
+                metrics.inc("psapp_deadline_refused_total", func=name)
+                return DEADLINE_EXCEEDED
+
+            future = self._executor().submit(func, *args)
+            try:
+                return future.result(timeout=self.deadline(name))
+            except FutureTimeoutError:
+                self.exceeded_count += 1
+                metrics.inc("psapp_deadline_exceeded_total", func=name)
+                self._abandon(name, future, handle)
+                return DEADLINE_EXCEEDED
+        call.__name__ = name
+        return call
+
+    def stats(self):
+        with self._stuck_lock:
+            stuck = sorted(set(self._stuck.values()))
+        return {
+            "exceeded": self.exceeded_count,
+            "abandoned_threads": self.abandoned_threads,
+            "refused": self.refused_count,
+            "stuck_calls": stuck,
+        }
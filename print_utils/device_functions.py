@@ -1,13 +1,23 @@
-from .cffi_defs import ffi, lib
+from .cffi_defs import ffi, lib, SMART_OPENDEVICE_BYID, MAX_SMART_PRINTER
+from .deadline import DEADLINE_EXCEEDED
 from pathlib import Path
 import ctypes
+import json
+import os
+import threading
+import time
+import weakref
+from metrics import metrics
+from functools import lru_cache
+from .circuit_breaker import CircuitBreaker
 
 # 연결된 프린터 목록을 가져오는 함수
 def get_device_list():
     # SMART_PRINTER_LIST 구조체 메모리 할당
     printer_list = ffi.new("SMART_PRINTER_LIST *")
     # DLL의 SmartComm_GetDeviceList2 함수를 호출하여 프린터 목록을 채움
-    result = lib.SmartComm_GetDeviceList2(printer_list)
+    with metrics.timer("psapp_stage_seconds", stage="enumerate"):
+        result = lib.SmartComm_GetDeviceList2(printer_list)
     return result, printer_list
 
 # 프린터 리스트에서 특정 인덱스에 해당하는 프린터의 ID를 반환하는 함수
@@ -19,20 +29,25 @@ def open_device(device_id, open_device_by):
     # HSMART 핸들용 메모리 할당
     device_handle = ffi.new("HSMART *")
     # DLL의 SmartComm_OpenDevice2 함수를 호출하여 장치를 열고 핸들을 받아옴
-    result = lib.SmartComm_OpenDevice2(device_handle, device_id, open_device_by)
+    with metrics.timer("psapp_stage_seconds", stage="open", device=device_id):
+        result = lib.SmartComm_OpenDevice2(device_handle, device_id, open_device_by)
     return result, device_handle[0]
 
+# resources 폴더 내 파일의 절대 경로를 DLL용 wchar_t 배열로 반환하는 함수
+@lru_cache(maxsize=64)
+def resolve_resource_path(filename):
+    # 현재 파일의 경로를 기준으로 resources 폴더 내의 파일 경로 생성
+    path = Path(__file__).parent / ".." / "resources" / filename
+    return ffi.new("wchar_t[]", str(path.resolve()))
+
 # 프린터에 이미지를 출력하기 위한 함수
 def draw_image(device_handle, page, panel, x, y, cx, cy, image_filename):
     # Page = 0 : 앞면, 1 : 뒷면
     # panel = 컬러,레진,오버레이 어느 영역에 인쇄할지
     # cx,cy는 px단위, 0인 경우 원래 크기를 사용
     
-    # 현재 파일의 경로를 기준으로 resources 폴더 내의 이미지 파일 경로 생성
-    image_path = Path(__file__).parent / ".." / "resources" / image_filename
-    image_path_str = str(image_path.resolve())
-    # wchar_t 배열로 이미지 경로를 변환 (DLL 호출을 위해)
-    image = ffi.new("wchar_t[]", image_path_str)
+    # resources 폴더 내의 이미지 경로 (wchar_t 배열, 파일명별로 한 번만 만듦)
+    image = resolve_resource_path(image_filename)
     # 출력 영역 정보 저장을 위한 RECT 구조체 메모리 할당
     rect_area = ffi.new("RECT *")
     # DLL의 SmartComm_DrawImage 함수를 호출하여 지정 영역에 이미지를 그림
@@ -54,7 +69,14 @@ def print_image(device_handle):
 
 # 열려있는 프린터 장치의 연결을 종료하는 함수
 def close_device(device_handle):
-    lib.SmartComm_CloseDevice(device_handle)
+    with metrics.timer("psapp_stage_seconds", stage="close"):
+        lib.SmartComm_CloseDevice(device_handle)
+
+# SmartComm_GetStatus의 원래 상태 값을 반환하는 함수
+def read_printer_status(device_handle):
+    status = ffi.new("DWORD *")
+    result = lib.SmartComm_GetStatus(device_handle, status)
+    return result, status[0]
 
 def get_printer_status(device_handle):
     """
@@ -188,3 +210,331 @@ def get_ribbon_type(device_handle):
     ribbon_type = ffi.new("int *")
     result = lib.SmartComm_GetRibbonType(device_handle, ribbon_type)
     return result, ribbon_type[0]
+
+
+# 마지막으로 열기에 성공한 장치 ID를 보관하는 파일 (재시작 후 목록 조회 없이 바로 열기)
+DEVICE_STATE_PATH = "printer_state.json"
+
+class DeviceCache:
+    """
+    장치 목록 조회(USB 열거) 결과를 재사용하는 캐시
+
+    마지막으로 열기에 성공한 장치 ID를 상태 파일에 저장해 두었다가 다음 실행 때
+    목록 조회 없이 바로 연다. 열기에 실패하거나 핫플러그 이벤트가 오면
+    그때만 전체 목록을 다시 조회한다. SMART_PRINTER_LIST 버퍼는 하나를 재사용한다.
+    """
+
+    def __init__(self, path=DEVICE_STATE_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.printer_list = None
+        self.device_ids = None  # 인덱스 순 장치 ID 목록 (모르면 None)
+        self.stale = False  # 핫플러그 이후 아직 다시 조회하지 않음
+        self.enumeration_count = 0
+        # 장치 ID를 고르는 세션들 (두 세션이 같은 프린터를 열지 않도록)
+        self.sessions = weakref.WeakSet()
+        self.claim_lock = threading.Lock()
+
+    def load(self):
+        """상태 파일의 장치 ID 목록 (없거나 읽을 수 없으면 빈 목록)"""
+        with self.lock:
+            if self.device_ids is None:
+                try:
+                    with open(self.path, encoding="utf-8") as f:
+                        self.device_ids = unique_ids(json.load(f)["device_ids"])
+                except (OSError, ValueError, KeyError, TypeError):
+                    self.device_ids = []
+            return list(self.device_ids)
+
+    def save(self):
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"device_ids": self.device_ids, "updated_at": time.time()}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"프린터 상태 파일 저장 실패: {e}")
+
+    def enumerate(self):
+        """전체 장치 목록을 조회해 캐시와 상태 파일을 갱신. (결과 코드, 장치 ID 목록)"""
+        with self.lock:
+            if self.printer_list is None:
+                self.printer_list = ffi.new("SMART_PRINTER_LIST *")
+            self.enumeration_count += 1
+            metrics.inc("psapp_enumerations_total")
+            with metrics.timer("psapp_stage_seconds", stage="enumerate"):
+                result = lib.SmartComm_GetDeviceList2(self.printer_list)
+            if result != 0:
+                return result, []
+
+            count = min(self.printer_list.n, MAX_SMART_PRINTER)
+            # 버퍼를 다시 쓰므로 문자열로 복사해 둠
+            self.device_ids = [ffi.string(self.printer_list.item[i].id) for i in range(count)]
+            self.stale = False
+            self.save()
+            return 0, list(self.device_ids)
+
+    def remember(self, index, device_id):
+        """열기에 성공한 장치 ID를 기록 (바뀐 경우에만 파일에 씀, 같은 ID는 한 자리에만)"""
+        with self.lock:
+            ids = list(self.device_ids or [])
+            if index < len(ids) and ids[index] == device_id:
+                return
+            while len(ids) <= index:
+                ids.append(None)
+            # 다른 자리에 남은 같은 ID는 지난 기록이므로 비움
+            ids = [None if other == device_id else other for other in ids]
+            ids[index] = device_id
+            self.device_ids = ids
+            self.save()
+
+    def register(self, session):
+        self.sessions.add(session)
+
+    def choose(self, session, device_ids):
+        """
+        session이 열 장치 ID를 고름 (다른 세션이 쓰는 ID는 제외). 없으면 None
+
+        세션의 인덱스 자리의 장치를 먼저 고르고, 그 장치를 다른 세션이 쓰고 있으면
+        아무도 쓰지 않는 첫 장치를 고른다. 고른 ID는 세션에 바로 기록해 동시에 여는
+        다른 세션이 같은 장치를 고르지 않게 한다.
+        """
+        with self.claim_lock:
+            claimed = {other.device_id for other in self.sessions if other is not session and other.device_id}
+            free = [device_id for device_id in device_ids if device_id not in claimed]
+            if session.device_index < len(device_ids) and device_ids[session.device_index] in free:
+                session.device_id = device_ids[session.device_index]
+            elif free:
+                session.device_id = free[0]
+            else:
+                session.device_id = None
+            return session.device_id
+
+    def invalidate(self):
+        """핫플러그 이벤트: 다음 열기 때 목록을 다시 조회하도록 표시"""
+        with self.lock:
+            self.stale = True
+
+    def stats(self):
+        return {
+            "device_ids": list(self.device_ids or []),
+            "stale": self.stale,
+            "enumerations": self.enumeration_count,
+        }
+
+
+def unique_ids(device_ids):
+    """같은 ID가 두 번 나오면 뒤의 것을 비움 (자리 순서는 유지)"""
+    seen = set()
+    ids = []
+    for device_id in device_ids:
+        if device_id in seen:
+            device_id = None
+        if device_id:
+            seen.add(device_id)
+        ids.append(device_id)
+    return ids
+
+
+# 프로세스 전체에서 공유하는 장치 캐시
+device_cache = DeviceCache()
+
+
+class PrinterSession:
+    """
+    HSMART 핸들을 작업 간에 재사용하는 장기 프린터 세션
+
+    매 카드마다 장치 목록 조회/열기/닫기를 반복하지 않고, 한 번 연 핸들을
+    유지한다. 재사용한 핸들로 호출이 실패하면 핸들이 끊긴 것으로 보고
+    장치를 다시 열어 한 번 재시도한다.
+    """
+
+    def __init__(self, device_index=0, device_id=None, pinned=None):
+        self.device_index = device_index
+        self.device_id = device_id
+        # 장치 ID를 지정해 만든 세션은 다른 장치로 바뀌지 않도록 ID를 고정
+        # (상태 파일에서 읽은 ID처럼 열기에 실패하면 다시 조회해도 되는 경우는 pinned=False)
+        self.pinned = device_id is not None if pinned is None else pinned
+        self.handle = None
+        # 파이프라인 인쇄에서 다음 카드를 미리 그리는 두 번째 핸들 (같은 장치)
+        self.spare_handle = None
+        self.lock = threading.RLock()
+
+        # 상태 모니터가 갱신하는 최근 상태 (PrinterStatus, 아직 없으면 None)
+        self.status = None
+        # 연속 실패 시 새 작업을 막고 백그라운드 탐침으로 복구를 확인하는 차단기
+        self.breaker = CircuitBreaker(str(device_id or ""))
+
+        # 절감 효과 확인용 카운터
+        self.open_count = 0
+        self.reuse_count = 0
+        self.reopen_count = 0
+        device_cache.register(self)
+
+    def acquire(self):
+        """열린 핸들을 반환 (없으면 장치를 찾아 연다)"""
+        with self.lock:
+            if self.handle is not None:
+                self.reuse_count += 1
+                return 0, self.handle
+            return self._open()
+
+    def _open(self):
+        if self.device_id is None or (device_cache.stale and not self.pinned):
+            result, device_ids = device_cache.enumerate()
+            if result != 0:
+                return result, None
+            if self.device_id not in device_ids:
+                # 다른 세션이 이미 쓰는 프린터는 고르지 않음 (두 세션이 한 프린터를 열지 않도록)
+                if device_cache.choose(self, device_ids) is None:
+                    return -1, None
+
+        result, handle = open_device(self.device_id, SMART_OPENDEVICE_BYID)
+        if result != 0:
+            # 장치 ID가 바뀌었을 수 있으므로 다음 시도 때 다시 조회
+            if not self.pinned:
+                self.device_id = None
+            return result, None
+
+        self.handle = handle
+        self.open_count += 1
+        self.breaker.name = str(self.device_id)
+        device_cache.remember(self.device_index, self.device_id)
+        return 0, handle
+
+    def acquire_spare(self):
+        """
+        같은 장치에 두 번째 핸들을 열어 반환 (이미 있으면 재사용)
+
+        주 핸들이 열려 있을 때만 연다. 한 핸들로 카드를 인쇄하는 동안
+        다른 핸들에 다음 카드를 그리는 파이프라인 인쇄에서 쓴다.
+        """
+        with self.lock:
+            if self.spare_handle is not None:
+                return 0, self.spare_handle
+            if self.handle is None:
+                return -1, None
+            result, handle = open_device(self.device_id, SMART_OPENDEVICE_BYID)
+            if result != 0:
+                return result, None
+            self.spare_handle = handle
+            self.open_count += 1
+            return 0, handle
+
+    def swap_spare(self):
+        """다음 카드를 그려 둔 두 번째 핸들을 주 핸들로 바꿈"""
+        with self.lock:
+            self.handle, self.spare_handle = self.spare_handle, self.handle
+
+    def release_spare(self):
+        """두 번째 핸들을 닫음 (그려 둔 카드도 함께 버려짐)"""
+        with self.lock:
+            if self.spare_handle is not None:
+                try:
+                    close_device(self.spare_handle)
+                except Exception:
+                    pass
+                self.spare_handle = None
+
+    def invalidate(self):
+        """끊긴 핸들을 닫고 버림 (다음 acquire 때 다시 연다)"""
+        with self.lock:
+            self.release_spare()
+            if self.handle is not None:
+                try:
+                    close_device(self.handle)
+                except Exception:
+                    pass
+                self.handle = None
+
+    def discard(self):
+        """
+        DLL이 멈춘 핸들을 닫고 장치를 새로 엶 (세션을 다시 시작)
+
+        멈춘 호출은 아직 DLL 안에 있으므로, 닫기 호출도 제한 시간 안에서만 기다린다.
+        그 호출이 끝날 때까지 옛 핸들로는 더 호출하지 않고 새 핸들로 계속한다.
+        새로 열지 못하면 다음 acquire 때 다시 시도한다. (열기 결과 코드, 핸들)을 반환한다.
+        """
+        with self.lock:
+            self.reconnect()
+            return self.acquire()
+
+    def reconnect(self):
+        """재사용한 핸들이 끊긴 것으로 보고 닫음 (다음 acquire 때 장치를 다시 찾아 연다)"""
+        with self.lock:
+            self.invalidate()
+            if not self.pinned:
+                self.device_id = None
+            self.reopen_count += 1
+
+    def is_stale_result(self, result):
+        """재사용한 핸들에서 나온 오류 코드가 핸들 재연결이 필요한 것인지 판단"""
+        # 제한 시간 초과는 다시 열어도 같은 DLL 호출에서 멈추므로 재시도하지 않음
+        if result == DEADLINE_EXCEEDED:
+            return False
+        # SDK는 끊긴 핸들 전용 코드를 따로 두지 않으므로 실패는 모두 재연결 대상으로 본다
+        return result != 0
+
+    def run(self, job, may_retry=None):
+        """
+        job(handle)을 실행하고 결과 코드를 반환
+
+        재사용한 핸들에서 실패하면 장치를 다시 열어 한 번만 재시도한다. 단 may_retry()가
+        False를 반환하면(이미 인쇄 명령을 보내 카드가 나왔을 수 있으면) 다시 실행하지 않는다.
+        실패하면 핸들을 닫아 다음 작업은 빈 카드에서 시작한다.
+        """
+        with self.lock:
+            reused = self.handle is not None
+            result, handle = self.acquire()
+            if result != 0:
+                return result
+
+            result = job(handle)
+            retry_allowed = may_retry is None or may_retry()
+            if reused and retry_allowed and self.is_stale_result(result):
+                self.reconnect()
+                result, handle = self.acquire()
+                if result != 0:
+                    return result
+                result = job(handle)
+            if result == DEADLINE_EXCEEDED:
+                self.discard()
+            elif result != 0:
+                # 그리다 만 카드가 다음 작업에 섞이지 않도록 핸들을 닫음
+                self.invalidate()
+            return result
+
+    def close(self):
+        self.invalidate()
+
+    def stats(self):
+        return {
+            "device_id": self.device_id,
+            "open_count": self.open_count,
+            "reuse_count": self.reuse_count,
+            "reopen_count": self.reopen_count,
+            "breaker": self.breaker.stats(),
+        }
+
+
+def discover_sessions():
+    """
+    연결된 모든 프린터에 대해 PrinterSession 목록을 만드는 함수
+
+    상태 파일에 지난번 장치 ID가 있으면 목록 조회 없이 그 장치들로 세션을 만든다
+    (열기에 실패하면 그때 조회). 없으면 목록을 조회하고, 조회에 실패하거나
+    프린터가 없으면 기본 세션 하나를 반환한다 (첫 작업에서 장치 열기 오류로 보고된다).
+    """
+    # 비어 있는 자리도 인덱스로 세어 각 세션이 상태 파일의 자기 자리를 유지하게 함
+    device_ids = device_cache.load()
+    if any(device_ids):
+        return [
+            PrinterSession(device_index=index, device_id=device_id, pinned=False)
+            for index, device_id in enumerate(device_ids)
+            if device_id
+        ]
+
+    result, device_ids = device_cache.enumerate()
+    if result != 0 or not device_ids:
+        return [PrinterSession()]
+    return [PrinterSession(device_index=index, device_id=device_id) for index, device_id in enumerate(device_ids)]
@@ -0,0 +1,109 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+
+DEFAULT_CAPACITY = 10000
+MAX_ARG_LENGTH = 64
+
+def summarize_arg(ffi, value):
+    """인자 하나를 짧은 문자열로 요약 (버퍼 내용은 문자열일 때만)"""
+    if isinstance(value, ffi.CData):
+        ctype = ffi.typeof(value)
+        if ctype.kind == "array" and ctype.item.cname == "wchar_t":
+            text = ffi.string(value)
+        elif ctype.kind == "pointer" and value == ffi.NULL:
+            text = "NULL"
+        else:
+            text = f"<{ctype.cname}>"
+    else:
+        text = repr(value)
+    return text if len(text) <= MAX_ARG_LENGTH else text[:MAX_ARG_LENGTH] + "…"
+
+
+class TracingLib:
+    """
+    SmartComm lib을 감싸 모든 SmartComm_* 호출을 링 버퍼에 기록하는 래퍼
+
+    함수, 인자 요약, 반환 코드, 스레드, 시작/종료 시각을 남기며
+    Chrome trace-event JSON(chrome://tracing, Perfetto)으로 내보낼 수 있다.
+    """
+
+    def __init__(self, lib, ffi, capacity=DEFAULT_CAPACITY):
+        self._lib = lib
+        self._ffi = ffi
+        self._events = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter_ns()
+        self._wrappers = {}
+
+    def __getattr__(self, name):
+        target = getattr(self._lib, name)
+        if not name.startswith("SmartComm_") or not callable(target):
+            return target
+
+        wrapper = self._wrappers.get(name)
+        if wrapper is None:
+            wrapper = self._wrap(name, target)
+            self._wrappers[name] = wrapper
+        return wrapper
+
+    def _wrap(self, name, func):
+        def traced(*args):
+            started = time.perf_counter_ns()
+            result = None
+            try:
+                result = func(*args)
+                return result
+            finally:
+                ended = time.perf_counter_ns()
+                thread = threading.current_thread()
+                event = (
+                    name,
+                    [summarize_arg(self._ffi, arg) for arg in args],
+                    result,
+                    thread.ident,
+                    thread.name,
+                    started - self._origin,
+                    ended - self._origin,
+                )
+                with self._lock:
+                    self._events.append(event)
+        traced.__name__ = name
+        return traced
+
+    def events(self):
+        with self._lock:
+            return list(self._events)
+
+    def clear(self):
+        with self._lock:
+            self._events.clear()
+
+    def chrome_trace(self):
+        """Chrome trace-event 형식의 dict"""
+        pid = os.getpid()
+        trace_events = []
+        thread_names = {}
+        for name, args, result, tid, thread_name, started, ended in self.events():
+            thread_names[tid] = thread_name
+            trace_events.append({
+                "name": name,
+                "cat": "smartcomm",
+                "ph": "X",
+                "ts": started / 1000,
+                "dur": (ended - started) / 1000,
+                "pid": pid,
+                "tid": tid,
+                "args": {"args": args, "result": result},
+            })
+        for tid, thread_name in thread_names.items():
+            trace_events.append({
+                "name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": thread_name},
+            })
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f, ensure_ascii=False)
@@ -0,0 +1,53 @@
+"""
+USB 장치 연결/해제(핫플러그) 알림을 받아 장치 캐시를 무효화
+
+Windows에서만 동작한다. 보이지 않는 최상위 창을 하나 만들어 WM_DEVICECHANGE
+브로드캐스트를 받고, 장치가 붙거나 빠지면 device_cache.invalidate()와 콜백을 호출한다.
+그 외 플랫폼에서는 아무것도 하지 않는다.
+"""
+import sys
+from PySide6.QtCore import QAbstractNativeEventFilter, QCoreApplication
+from .device_functions import device_cache
+
+WM_DEVICECHANGE = 0x0219
+DBT_DEVICEARRIVAL = 0x8000
+DBT_DEVICEREMOVECOMPLETE = 0x8004
+DBT_DEVNODES_CHANGED = 0x0007
+HOTPLUG_EVENTS = (DBT_DEVICEARRIVAL, DBT_DEVICEREMOVECOMPLETE, DBT_DEVNODES_CHANGED)
+
+
+class HotplugFilter(QAbstractNativeEventFilter):
+    def __init__(self, on_change=None):
+        super().__init__()
+        self.on_change = on_change
+        self.event_count = 0
+
+    def nativeEventFilter(self, event_type, message):
+        if event_type in (b"windows_generic_MSG", "windows_generic_MSG"):
+            from ctypes import wintypes
+            msg = wintypes.MSG.from_address(int(message))
+            if msg.message == WM_DEVICECHANGE and msg.wParam in HOTPLUG_EVENTS:
+                self.event_count += 1
+                device_cache.invalidate()
+                if self.on_change:
+                    self.on_change()
+        return False, 0
+
+
+_listener = None
+
+def install_hotplug_listener(on_change=None):
+    """핫플러그 감지를 설치 (Windows가 아니거나 Qt 앱이 없으면 None)"""
+    global _listener
+    app = QCoreApplication.instance()
+    if sys.platform != "win32" or app is None:
+        return None
+    if _listener is None:
+        from PySide6.QtGui import QWindow
+        # 브로드캐스트는 최상위 창에만 오므로 표시하지 않는 창의 네이티브 핸들을 만듦
+        window = QWindow()
+        window.winId()
+        event_filter = HotplugFilter(on_change)
+        app.installNativeEventFilter(event_filter)
+        _listener = (window, event_filter)
+    return _listener[1]
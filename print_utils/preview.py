@@ -0,0 +1,55 @@
+from PySide6.QtGui import QImage
+from .cffi_defs import ffi
+
+BI_BITFIELDS = 3
+
+# 비트 수별 QImage 형식 (DIB는 BGR 순서)
+DIB_FORMATS = {
+    24: QImage.Format.Format_BGR888,
+    32: QImage.Format.Format_RGB32,
+}
+
+class CardPreview:
+    """
+    SDK가 돌려준 DIB를 복사해 둔 미리보기
+
+    image는 이 객체가 소유한 메모리이므로, 인쇄 워커가 같은 핸들로 인쇄하거나
+    핸들을 닫아 SDK 메모리가 해제되어도 GUI에서 안전하게 그릴 수 있다.
+    화면에 옮겨 그린 뒤 release()로 복사본을 놓는다.
+    bottom_up이면 행이 아래에서 위 순서로 저장되어 있으므로 그릴 때 뒤집어야 한다.
+    """
+
+    def __init__(self, job_id, image, bottom_up):
+        self.job_id = job_id
+        self.image = image
+        self.bottom_up = bottom_up
+
+    def release(self):
+        self.image = None
+
+
+def copy_preview_bitmap(job_id, bitmap_info):
+    """
+    BITMAPINFO*의 픽셀을 QImage로 한 번 복사해 CardPreview를 반환 (카드 한 장에 약 2MB)
+
+    지원하지 않는 형식이면 None을 반환한다.
+    """
+    header = bitmap_info.bmiHeader
+    image_format = DIB_FORMATS.get(header.biBitCount)
+    if image_format is None:
+        return None
+
+    width = header.biWidth
+    height = abs(header.biHeight)
+    # DIB 행은 4바이트 단위로 정렬됨
+    stride = ((width * header.biBitCount + 31) // 32) * 4
+
+    offset = header.biSize
+    if header.biCompression == BI_BITFIELDS:
+        offset += 3 * ffi.sizeof("DWORD")  # RGB 마스크
+    pixels = ffi.cast("unsigned char *", bitmap_info) + offset
+    buffer = ffi.buffer(pixels, stride * height)
+
+    # SDK 메모리를 감싼 QImage는 이 함수 안에서만 쓰고, 밖으로는 복사본만 내보냄
+    image = QImage(buffer, width, height, stride, image_format).copy()
+    return CardPreview(job_id, image, header.biHeight > 0)
@@ -0,0 +1,136 @@
+"""
+SmartComm_Print 실측 시간으로 카드 인쇄 시간을 배우는 추정 모델
+
+프린터별로 최근 인쇄 시간을 롤링 분위수로 보관해 대기 중인 작업의 완료 시각을
+예측한다. SmartComm_Print 한 번이 카드의 모든 면/패널을 인쇄하므로 패널별 시간을
+따로 잴 수는 없다. 그래서 두 가지를 함께 기록한다.
+
+- 카드 구성((면, 패널) 목록)별 카드 한 장의 시간
+- 카드 시간을 기본 패널 비중으로 나눈 (면, 패널)별 시간
+
+처음 보는 구성은 (면, 패널)별 시간을 더해 추정한다. 기록은 워커 스레드에서,
+조회는 GUI 스레드에서 하며, 잠금은 정렬된 표본 목록을 갱신하는 동안만 잡는다.
+"""
+import bisect
+import threading
+from collections import deque
+
+# 분위수를 계산할 최근 표본 수 (키마다)
+WINDOW = 64
+
+# 예상 완료 시각에 쓰는 분위수와 보수적인 상한 분위수
+ETA_QUANTILE = 0.5
+UPPER_QUANTILE = 0.9
+
+# 실측이 없을 때 쓰는 패널 한 번 인쇄 시간 (초)과 카드 이송/배출 시간
+DEFAULT_PASS_SECONDS = {"color": 12.0, "black": 4.0, "overlay": 3.0, "uv": 3.0}
+DEFAULT_FEED_SECONDS = 2.0
+# 아직 인쇄한 적 없는 레이아웃의 구성 (기본 레이아웃: 앞면 검정 패널)
+DEFAULT_SIGNATURE = (("front", "black"),)
+
+def pass_prior(page_panel):
+    return DEFAULT_PASS_SECONDS.get(page_panel[1], DEFAULT_PASS_SECONDS["black"])
+
+def prior_seconds(signature):
+    return DEFAULT_FEED_SECONDS + sum(pass_prior(page_panel) for page_panel in signature)
+
+
+class RollingQuantile:
+    """최근 window개 표본의 분위수 (정렬된 목록을 유지하므로 조회는 상수 시간)"""
+
+    def __init__(self, window=WINDOW):
+        self.samples = deque()
+        self.ordered = []
+        self.window = window
+
+    def add(self, value):
+        if len(self.samples) == self.window:
+            oldest = self.samples.popleft()
+            del self.ordered[bisect.bisect_left(self.ordered, oldest)]
+        self.samples.append(value)
+        bisect.insort(self.ordered, value)
+
+    def quantile(self, q):
+        if not self.ordered:
+            return None
+        return self.ordered[round(q * (len(self.ordered) - 1))]
+
+    def __len__(self):
+        return len(self.ordered)
+
+
+class PrintEstimator:
+    """
+    프린터/카드 구성/(면, 패널)별 인쇄 시간 롤링 분위수
+
+    키에 장치 ID 대신 None을 쓰면 모든 프린터를 합친 값이다.
+    추정은 (프린터, 구성) → (전체, 구성) → (프린터, 패널 합) → (전체, 패널 합) → 기본값 순으로 찾는다.
+    """
+
+    def __init__(self, window=WINDOW):
+        self.window = window
+        self.lock = threading.Lock()
+        self.cards = {}  # (장치 ID 또는 None, 구성) -> RollingQuantile
+        self.passes = {}  # (장치 ID 또는 None, (면, 패널)) -> RollingQuantile
+        self.layout_signatures = {}  # 레이아웃 이름 -> 구성 (워커가 인쇄하면서 알려 줌)
+        self.last_signature = DEFAULT_SIGNATURE
+        self.sample_count = 0
+
+    def _add(self, table, key, value):
+        quantiles = table.get(key)
+        if quantiles is None:
+            quantiles = table[key] = RollingQuantile(self.window)
+        quantiles.add(value)
+
+    def record(self, device_id, signature, seconds, layout_name=None):
+        """카드 한 장의 SmartComm_Print 시간을 기록 (워커 스레드)"""
+        total_prior = sum(pass_prior(page_panel) for page_panel in signature) or 1.0
+        with self.lock:
+            self.sample_count += 1
+            self.last_signature = signature
+            if layout_name is not None:
+                self.layout_signatures[layout_name] = signature
+            for owner in (device_id, None):
+                self._add(self.cards, (owner, signature), seconds)
+                for page_panel in signature:
+                    self._add(self.passes, (owner, page_panel), seconds * pass_prior(page_panel) / total_prior)
+
+    def estimate(self, device_id, signature, q=ETA_QUANTILE):
+        """이 구성의 카드를 이 프린터에서 인쇄하는 데 걸릴 시간(초)"""
+        with self.lock:
+            for owner in (device_id, None):
+                quantiles = self.cards.get((owner, signature))
+                if quantiles:
+                    return quantiles.quantile(q)
+            for owner in (device_id, None):
+                parts = [self.passes.get((owner, page_panel)) for page_panel in signature]
+                if signature and all(parts):
+                    return sum(part.quantile(q) for part in parts)
+        return prior_seconds(signature)
+
+    def estimate_layout(self, device_id, layout_name, q=ETA_QUANTILE):
+        """레이아웃 이름으로 추정 (아직 인쇄한 적 없는 레이아웃은 마지막으로 인쇄한 카드 구성으로 봄)"""
+        with self.lock:
+            signature = self.layout_signatures.get(layout_name, self.last_signature)
+        return self.estimate(device_id, signature, q)
+
+    def stats(self):
+        with self.lock:
+            return {
+                "samples": self.sample_count,
+                "cards": [
+                    {
+                        "device_id": device_id,
+                        "signature": "+".join(f"{page}:{panel}" for page, panel in signature),
+                        "count": len(quantiles),
+                        "p50": round(quantiles.quantile(ETA_QUANTILE), 3),
+                        "p90": round(quantiles.quantile(UPPER_QUANTILE), 3),
+                    }
+                    for (device_id, signature), quantiles in self.cards.items()
+                    if device_id is not None
+                ],
+            }
+
+
+# 프로세스 전체에서 공유하는 추정 모델
+print_estimator = PrintEstimator()
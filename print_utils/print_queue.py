@@ -0,0 +1,240 @@
+import itertools
+import queue
+import time
+from PySide6.QtCore import QObject, Signal
+from .device_functions import discover_sessions, device_cache
+from .hotplug import install_hotplug_listener
+from .pt import PrinterThread
+from .card_layout import DEFAULT_LAYOUT
+from .print_estimator import print_estimator
+from .text_fit import get_advance_table
+from .status_monitor import StatusMonitor
+from .circuit_breaker import STATE_OPEN, STATE_CLOSED
+from metrics import metrics
+
+# 기본 대기열 깊이 (이보다 많이 쌓이면 새 작업을 거부)
+DEFAULT_QUEUE_DEPTH = 20
+
+# 워커 종료 신호 (모든 작업 ID보다 뒤에 정렬됨)
+STOP_JOB = (float("inf"), None)
+
+class PrintJob:
+    """대기열에 들어가는 인쇄 작업 하나"""
+
+    def __init__(self, job_id, text, layout=None):
+        self.job_id = job_id
+        self.text = text
+        self.layout = layout  # 카드 레이아웃 이름 (없으면 기본 레이아웃)
+        self.submitted_at = time.monotonic()
+        self.attempts = 0
+
+
+class PrintQueue(QObject):
+    """
+    크기가 제한된 FIFO 인쇄 대기열
+
+    연결된 프린터마다 장기 실행 PrinterThread를 하나씩 두고, 유휴 상태인 워커가
+    대기열에서 가장 오래된 작업을 가져간다. 연속으로 실패한 프린터는 회로 차단기가 열려
+    탐침으로 복구될 때까지 작업을 받지 않고, 그 작업은 대기열 맨 앞으로 되돌아간다.
+    작업별 완료/오류 시그널과 대기열 상태(깊이, 가장 오래 기다린 시간)를 내보낸다.
+    """
+    job_started = Signal(int, float)  # 작업 ID, 대기 시간(초)
+    job_finished = Signal(int)
+    job_error = Signal(int, str)
+    # 작업 ID, 이유 (PrintServiceClient와 같은 인터페이스. 이 대기열은 받을 수 없으면
+    # submit이 바로 None을 반환하므로 보내지 않음)
+    job_deferred = Signal(int, str)
+    queue_changed = Signal(int, float)  # 대기 중인 작업 수, 가장 오래 기다린 시간(초)
+    printer_failed = Signal(str, str)  # 장치 ID, 오류 메시지 (회로가 열림)
+    breaker_changed = Signal(str, str, str)  # 장치 ID, 상태(closed/open/half_open), 이유
+    preview_ready = Signal(object)  # CardPreview
+    printer_status_changed = Signal(object)  # PrinterStatus
+
+    def __init__(self, max_depth=DEFAULT_QUEUE_DEPTH, sessions=None, previews=False, pipeline=None):
+        super().__init__()
+        self.max_depth = max_depth
+        # 작업 ID 순으로 꺼내므로 되돌린 작업이 맨 앞에 선다
+        self.job_queue = queue.PriorityQueue()
+        self.job_ids = itertools.count(1)
+        self.pending = {}  # 작업 ID -> PrintJob (대기 중 또는 인쇄 중)
+        self.last_wait = 0.0
+
+        if sessions is None:
+            sessions = discover_sessions()
+
+        # 글자 폭 표는 GUI 스레드에서 미리 만들어 둠
+        get_advance_table("Pretendard", bold=True)
+
+        self.breaker_changed.connect(self.on_breaker_state)
+        self.workers = []
+        for session in sessions:
+            session.breaker.on_change = self.on_breaker_changed
+            worker = PrinterThread(self.job_queue, session, dispatcher=self, pipeline=pipeline)
+            worker.preview_enabled = previews
+            worker.job_started.connect(self.on_job_started)
+            worker.job_finished.connect(self.on_job_finished)
+            worker.job_error.connect(self.on_job_error)
+            worker.preview_ready.connect(self.preview_ready)
+            self.workers.append(worker)
+
+        # 프린터 상태는 별도 스레드가 조회해 캐시 (작업 경로에서는 DLL을 호출하지 않음)
+        self.sessions = list(sessions)
+        self.status_monitor = StatusMonitor(self.sessions, is_busy=lambda: bool(self.pending))
+        self.status_monitor.status_changed.connect(self.on_status_changed)
+        for worker in self.workers:
+            worker.status_sampler = self.status_monitor.sample
+
+        # 프린터를 뽑거나 꽂으면 장치 캐시를 무효화하고 상태를 바로 다시 조회
+        install_hotplug_listener(on_change=self.status_monitor.wake)
+
+    def start(self):
+        for worker in self.workers:
+            if not worker.isRunning():
+                worker.start()
+        if not self.status_monitor.isRunning():
+            self.status_monitor.start()
+
+    def stop(self, timeout_ms=5000):
+        """대기 중인 작업을 마친 뒤 워커를 종료"""
+        running = [worker for worker in self.workers if worker.isRunning()]
+        for worker in running:
+            # 회로가 열려 작업을 기다리는 워커도 빠져나오도록 (남은 작업은 스풀에 남음)
+            worker.stopping = True
+            self.job_queue.put(STOP_JOB)
+        for worker in running:
+            worker.wait(timeout_ms)
+        self.status_monitor.stop(timeout_ms)
+
+    def worker_available(self, worker):
+        status = worker.session.status
+        return worker.session.breaker.allow() and (status is None or status.ok)
+
+    def other_printer_available(self, worker):
+        """실패한 워커 말고 작업을 받을 수 있는 프린터가 있는지 (워커 스레드에서 호출)"""
+        return any(self.worker_available(other) for other in self.workers if other is not worker)
+
+    def available(self):
+        """캐시된 상태와 회로 차단기로 볼 때 작업을 받을 수 있는 프린터가 있는지"""
+        return any(self.worker_available(worker) for worker in self.workers)
+
+    def submit(self, text, job_id=None, layout=None):
+        """작업을 대기열에 추가하고 작업 ID를 반환. 대기열이 가득 차면 None"""
+        if self.depth() >= self.max_depth:
+            return None
+
+        if job_id is None:
+            job_id = next(self.job_ids)
+        job = PrintJob(job_id, text, layout)
+        self.pending[job_id] = job
+        self.job_queue.put((job_id, job))
+        self.status_monitor.wake()
+        self.emit_queue_changed()
+        return job_id
+
+    def depth(self):
+        """아직 인쇄를 시작하지 않은 작업 수"""
+        return self.job_queue.qsize()
+
+    def oldest_wait(self):
+        """가장 오래 기다린 작업의 대기 시간(초)"""
+        if not self.pending:
+            return 0.0
+        oldest = min(job.submitted_at for job in self.pending.values())
+        return time.monotonic() - oldest
+
+    def estimates(self):
+        """
+        대기 중이거나 인쇄 중인 작업별 예상 남은 시간(초) (GUI 스레드, DLL 호출 없음)
+
+        워커가 알려 준 인쇄 중인 카드의 남은 시간에서 시작해, 대기열 순서대로 가장 먼저
+        비는 프린터에 작업을 하나씩 배정하며 그 프린터의 추정 시간을 더한다. 작업마다
+        프린터 수만큼만 비교하므로 작업당 상수 시간이다. 받을 수 있는 프린터가 없으면
+        인쇄 중인 작업만 예측한다.
+        """
+        now = time.monotonic()
+        estimates = {}
+        free_in = {}  # 워커 -> 비기까지 남은 시간(초)
+        for worker in self.workers:
+            printing = worker.printing
+            remaining = 0.0
+            if printing is not None:
+                job_id, started_at, expected = printing
+                remaining = max(0.0, expected - (now - started_at))
+                estimates[job_id] = remaining
+            if self.worker_available(worker):
+                free_in[worker] = remaining
+
+        if free_in:
+            # 대기열은 작업 ID 순으로 꺼내므로 같은 순서로 배정
+            for job_id in sorted(self.pending):
+                if job_id in estimates:
+                    continue
+                worker = min(free_in, key=free_in.get)
+                device_id = str(worker.session.device_id)
+                layout = self.pending[job_id].layout or DEFAULT_LAYOUT
+                free_in[worker] += print_estimator.estimate_layout(device_id, layout)
+                estimates[job_id] = free_in[worker]
+        return estimates
+
+    def estimate(self, job_id):
+        """작업이 끝나기까지 예상 남은 시간(초). 예측할 수 없으면 None"""
+        return self.estimates().get(job_id)
+
+    def stats(self):
+        return {
+            "depth": self.depth(),
+            "in_flight": len(self.pending),
+            "max_depth": self.max_depth,
+            "oldest_wait": round(self.oldest_wait(), 3),
+            "last_wait": round(self.last_wait, 3),
+            "discovery": device_cache.stats(),
+            "estimator": print_estimator.stats(),
+            "printers": [
+                {
+                    "device_id": str(worker.session.device_id),
+                    "active": self.worker_available(worker),
+                    "breaker": worker.session.breaker.stats(),
+                    "printed": worker.printed_count,
+                    "pipelined": worker.pipelined_count,
+                    "status": worker.session.status.as_dict() if worker.session.status else None,
+                }
+                for worker in self.workers
+            ],
+        }
+
+    def emit_queue_changed(self):
+        self.queue_changed.emit(self.depth(), self.oldest_wait())
+
+    def on_job_started(self, job_id, wait):
+        self.last_wait = wait
+        self.job_started.emit(job_id, wait)
+        self.emit_queue_changed()
+
+    def on_job_finished(self, job_id):
+        self.pending.pop(job_id, None)
+        self.job_finished.emit(job_id)
+        self.emit_queue_changed()
+
+    def on_job_error(self, job_id, error_message):
+        self.pending.pop(job_id, None)
+        self.job_error.emit(job_id, error_message)
+        self.emit_queue_changed()
+
+    def on_status_changed(self, status):
+        state = "정상" if status.ok else f"이상 (결과 {status.result}, 리본 결과 {status.ribbon_result})"
+        print(f"프린터 {status.device_id} 상태: {state}")
+        self.printer_status_changed.emit(status)
+
+    def on_breaker_changed(self, device_id, state, reason):
+        """회로 상태 변경 (워커/상태 모니터 스레드에서 호출, 시그널은 GUI 스레드로 전달됨)"""
+        metrics.inc("psapp_breaker_transitions_total", device=device_id, state=state)
+        if state == STATE_OPEN:
+            print(f"프린터 {device_id} 회로 열림, 복구될 때까지 작업을 보내지 않습니다: {reason}")
+            self.printer_failed.emit(device_id, reason)
+        elif state == STATE_CLOSED:
+            print(f"프린터 {device_id} 회로 닫힘: {reason}")
+        self.breaker_changed.emit(device_id, state, reason)
+
+    def on_breaker_state(self, device_id, state, reason):
+        # GUI 스레드에서 실행 (다른 연결보다 먼저 연결해 가용 여부가 먼저 알려지도록)
+        self.emit_queue_changed()
@@ -0,0 +1,258 @@
+"""
+SmartComm 장치 계층을 소유하는 별도 프린터 서비스 프로세스
+
+키오스크 UI들은 로컬 소켓(service_protocol)으로 작업을 보내고 결과를 받는다.
+DLL이 멈추거나 죽어도 UI 프로세스는 영향을 받지 않으며, UI 쪽
+PrintServiceClient가 서비스를 다시 띄운다. 한 호스트의 여러 UI가 같은 서비스를
+공유하고, 연결된 UI도 남은 작업도 없이 일정 시간이 지나면 스스로 종료한다.
+
+사용법:
+    python -m print_utils.printer_service
+"""
+import itertools
+import os
+import sys
+from PySide6.QtCore import QCoreApplication, QDir, QLockFile, QObject, QTimer
+from PySide6.QtNetwork import QLocalServer, QLocalSocket
+from .service_protocol import SERVICE_NAME, FrameReader, encode, encode_preview
+import metrics
+
+# 연결된 UI도 남은 작업도 없을 때 종료하기까지 기다리는 시간 (밀리초)
+IDLE_EXIT_MS = 60_000
+
+# 서비스 프로세스의 지표 엔드포인트 포트 (UI 프로세스와 겹치지 않게)
+SERVICE_METRICS_PORT_ENV = "PSAPP_SERVICE_METRICS_PORT"
+DEFAULT_SERVICE_METRICS_PORT = 9465
+SERVICE_METRICS_DUMP_PATH = "metrics_service.prom"
+
+def service_running(name=SERVICE_NAME, timeout_ms=500):
+    """같은 이름의 서비스가 이미 응답하는지"""
+    probe = QLocalSocket()
+    probe.connectToServer(name)
+    running = probe.waitForConnected(timeout_ms)
+    probe.abort()
+    return running
+
+
+class PrinterService(QObject):
+    """
+    PrintQueue 하나를 여러 UI 연결에 나눠 주는 로컬 서버
+
+    UI가 보낸 작업 ID는 서비스 내부 ID로 바꿔 대기열에 넣고,
+    결과는 그 작업을 보낸 연결에만 돌려준다. 대기열/프린터 상태는 모든 연결에 알린다.
+    """
+
+    def __init__(self, name=SERVICE_NAME):
+        super().__init__()
+        self.name = name
+        self.server = QLocalServer(self)
+        self.server.newConnection.connect(self.on_new_connection)
+        self.clients = {}  # 소켓 -> FrameReader
+        self.jobs = {}  # 서비스 작업 ID -> (소켓, UI 작업 ID)
+        self.job_ids = itertools.count(1)
+        self.print_queue = None
+
+        self.idle_timer = QTimer(self)
+        self.idle_timer.setSingleShot(True)
+        self.idle_timer.setInterval(IDLE_EXIT_MS)
+        self.idle_timer.timeout.connect(self.on_idle)
+
+    def start(self):
+        """소켓을 열고 장치 계층을 초기화. 소켓을 열 수 없으면 False"""
+        # 이전 프로세스가 남긴 소켓 파일 정리 (이미 실행 중인지는 호출 전에 확인)
+        QLocalServer.removeServer(self.name)
+        if not self.server.listen(self.name):
+            print(f"프린터 서비스 소켓을 열 수 없습니다: {self.server.errorString()}")
+            return False
+
+        # DLL은 이 프로세스에서만 불러옴
+        from .print_queue import PrintQueue
+        self.print_queue = PrintQueue(previews=True)
+        self.print_queue.job_started.connect(self.on_job_started)
+        self.print_queue.job_finished.connect(self.on_job_finished)
+        self.print_queue.job_error.connect(self.on_job_error)
+        self.print_queue.queue_changed.connect(self.on_queue_changed)
+        self.print_queue.printer_failed.connect(self.on_printer_failed)
+        self.print_queue.printer_status_changed.connect(self.on_status_changed)
+        self.print_queue.breaker_changed.connect(self.on_breaker_changed)
+        self.print_queue.preview_ready.connect(self.on_preview_ready)
+        self.print_queue.start()
+
+        print(f"프린터 서비스 시작 (PID {os.getpid()}, {self.name})")
+        self.idle_timer.start()
+        return True
+
+    def stop(self):
+        self.server.close()
+        if self.print_queue:
+            self.print_queue.stop()
+
+    def on_new_connection(self):
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            self.clients[socket] = FrameReader()
+            socket.readyRead.connect(lambda socket=socket: self.on_ready_read(socket))
+            socket.disconnected.connect(lambda socket=socket: self.on_disconnected(socket))
+            self.idle_timer.stop()
+            self.send(socket, {"op": "hello", "pid": os.getpid()})
+            self.send(socket, self.queue_message(socket))
+
+    def on_disconnected(self, socket):
+        self.clients.pop(socket, None)
+        # 끊긴 UI의 작업은 계속 인쇄하되 결과는 버림
+        for job_id, (owner, client_job_id) in list(self.jobs.items()):
+            if owner is socket:
+                self.jobs[job_id] = (None, client_job_id)
+        socket.deleteLater()
+        if not self.clients:
+            self.idle_timer.start()
+
+    def on_idle(self):
+        if self.clients:
+            return
+        if self.print_queue and self.print_queue.pending:
+            self.idle_timer.start()
+            return
+        print("연결된 UI가 없어 프린터 서비스를 종료합니다.")
+        self.stop()
+        QCoreApplication.quit()
+
+    def on_ready_read(self, socket):
+        reader = self.clients.get(socket)
+        if reader is None:
+            return
+        try:
+            messages = reader.feed(bytes(socket.readAll().data()))
+        except ValueError as e:
+            print(f"잘못된 메시지로 연결을 끊습니다: {e}")
+            socket.abort()
+            return
+        for message in messages:
+            self.handle(socket, message)
+
+    def handle(self, socket, message):
+        op = message.get("op")
+        if op == "submit":
+            self.submit(socket, message)
+        elif op == "ping":
+            self.send(socket, {"op": "pong"})
+
+    def submit(self, socket, message):
+        client_job_id = message["id"]
+        if not self.print_queue.available():
+            self.defer(socket, client_job_id, "프린터 사용 불가")
+            return
+
+        job_id = next(self.job_ids)
+        self.jobs[job_id] = (socket, client_job_id)
+        if self.print_queue.submit(message["text"], job_id, message.get("layout")) is None:
+            del self.jobs[job_id]
+            self.defer(socket, client_job_id, "인쇄 대기열 가득 참")
+
+    def defer(self, socket, client_job_id, reason):
+        """지금 받을 수 없는 작업을 돌려보내고, UI가 언제 다시 보낼지 알도록 최신 대기열 상태를 보냄"""
+        self.send(socket, {"op": "deferred", "id": client_job_id, "reason": reason})
+        self.send(socket, self.queue_message(socket))
+
+    def send(self, socket, message):
+        if socket is not None and socket.state() == QLocalSocket.LocalSocketState.ConnectedState:
+            socket.write(encode(message))
+
+    def broadcast(self, message):
+        data = encode(message)
+        for socket in self.clients:
+            socket.write(data)
+
+    def reply(self, job_id, message, done=False):
+        """작업을 보낸 UI에 그 UI의 작업 ID로 결과 전달"""
+        entry = self.jobs.pop(job_id, None) if done else self.jobs.get(job_id)
+        if entry is None:
+            return
+        socket, client_job_id = entry
+        self.send(socket, dict(message, id=client_job_id))
+
+    def queue_message(self, socket=None):
+        """대기열 상태 메시지 (socket을 주면 그 UI가 보낸 작업의 예상 남은 시간을 UI 작업 ID로 포함)"""
+        if self.print_queue is None:
+            return {"op": "queue", "depth": 0, "wait": 0.0, "available": False, "stats": {}, "eta": {}}
+        estimates = self.print_queue.estimates()
+        return {
+            "op": "queue",
+            "depth": self.print_queue.depth(),
+            "wait": self.print_queue.oldest_wait(),
+            # 프린터가 있고 대기열에 자리가 있을 때만 받을 수 있음 (UI는 아니면 작업을 보관)
+            "available": self.print_queue.available() and self.print_queue.depth() < self.print_queue.max_depth,
+            "stats": self.print_queue.stats(),
+            "eta": {
+                str(client_job_id): round(estimates[job_id], 1)
+                for job_id, (owner, client_job_id) in self.jobs.items()
+                if owner is socket and job_id in estimates
+            },
+        }
+
+    def broadcast_queue(self):
+        for socket in self.clients:
+            self.send(socket, self.queue_message(socket))
+
+    def on_job_started(self, job_id, wait):
+        self.reply(job_id, {"op": "start", "wait": wait})
+
+    def on_job_finished(self, job_id):
+        self.reply(job_id, {"op": "done"}, done=True)
+
+    def on_job_error(self, job_id, error_message):
+        self.reply(job_id, {"op": "error", "msg": error_message}, done=True)
+
+    def on_preview_ready(self, preview):
+        """워커가 복사해 둔 미리보기를 압축해 그 작업을 보낸 UI에만 보냄"""
+        try:
+            entry = self.jobs.get(preview.job_id)
+            if entry is None or entry[0] is None:
+                return
+            encoded = encode_preview(preview.image, preview.bottom_up)
+            if encoded is None:
+                return
+            image_format, data = encoded
+            self.reply(preview.job_id, {"op": "preview", "format": image_format, "data": data})
+        finally:
+            preview.release()
+
+    def on_queue_changed(self, depth, oldest_wait):
+        self.broadcast_queue()
+
+    def on_printer_failed(self, device_id, error_message):
+        self.broadcast({"op": "failed", "device": device_id, "msg": error_message})
+
+    def on_breaker_changed(self, device_id, state, reason):
+        self.broadcast({"op": "breaker", "device": device_id, "state": state, "reason": reason})
+
+    def on_status_changed(self, status):
+        self.broadcast({"op": "status", "status": status.as_dict()})
+        self.broadcast_queue()
+
+
+def main():
+    # 글자 폭 측정과 템플릿 래스터화에 QGuiApplication이 필요 (창은 만들지 않음)
+    if sys.platform != "win32":
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtGui import QGuiApplication
+    app = QGuiApplication(sys.argv[:1])
+
+    # 여러 UI가 동시에 서비스를 띄워도 하나만 남도록 잠금 파일로 직렬화
+    # (잠금을 가진 프로세스가 죽으면 QLockFile이 오래된 잠금으로 보고 회수)
+    lock = QLockFile(QDir(QDir.tempPath()).filePath(f"{SERVICE_NAME}.lock"))
+    if not lock.tryLock(0) or service_running():
+        print("프린터 서비스가 이미 실행 중입니다.")
+        return 0
+
+    service = PrinterService()
+    if not service.start():
+        return 1
+
+    port = int(os.environ.get(SERVICE_METRICS_PORT_ENV, DEFAULT_SERVICE_METRICS_PORT))
+    metrics.start_exporter(port=port, dump_path=SERVICE_METRICS_DUMP_PATH)
+    return app.exec()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,101 +1,369 @@
+import os
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
 from PySide6.QtCore import QThread, Signal
-from PySide6.QtGui import QFont, QFontMetrics
-from .device_functions import get_device_list, get_device_id, open_device, print_image, close_device
-from .cffi_defs import ffi, lib, SMART_OPENDEVICE_BYID, PAGE_FRONT, PANELID_BLACK
+from .device_functions import PrinterSession, print_image, get_preview_bitmap
+from .cffi_defs import ffi, PAGE_FRONT
+from .preview import copy_preview_bitmap
+from metrics import metrics
+from .card_layout import compile_layout, DEFAULT_LAYOUT
+from .circuit_breaker import KIND_ERROR, KIND_TIMEOUT
+from .deadline import DEADLINE_EXCEEDED
+from .print_estimator import print_estimator
+from .status_monitor import FAST_POLL_INTERVAL
+
+# 회로가 열려 있는 동안 종료 요청을 확인하는 간격 (초)
+BREAKER_WAIT = 0.5
+
+# 작업 하나를 인쇄 시도하는 최대 횟수 (회로가 열려 대기열로 되돌린 경우 포함)
+MAX_JOB_ATTEMPTS = 3
+
+# 설정하면 대기열이 밀려 있을 때 카드 N을 인쇄하는 동안 카드 N+1을 두 번째 핸들에 미리 그림
+# (SDK가 같은 장치의 핸들 두 개를 각각의 카드로 다루는 환경에서만 켬)
+PIPELINE_ENV = "PSAPP_PRINT_PIPELINE"
+
+def pipeline_enabled():
+    return os.environ.get(PIPELINE_ENV, "") not in ("", "0")
+
+# 앱 전체에서 공유하는 프린터 세션 (핸들을 카드마다 다시 열지 않음)
+printer_session = PrinterSession()
 
 class PrinterThread(QThread):
-    finished = Signal()
-    error = Signal(str)
+    """
+    작업 큐를 계속 비우는 장기 실행 인쇄 워커 (프린터 한 대당 하나)
+
+    카드마다 스레드를 새로 만들지 않고, 큐에서 (작업 ID, 작업)을 하나씩 꺼내 인쇄한다.
+    작업이 None이면 종료한다. 세션의 회로 차단기가 열려 있는 동안에는 작업을 꺼내지 않고
+    (작업은 대기열에 남음) 상태 모니터의 탐침이 회로를 닫을 때까지 기다린다.
+
+    파이프라인 모드에서는 대기열이 밀려 있는 동안 핸들 두 개를 번갈아 쓰며, 한 핸들로
+    카드를 인쇄하는 사이 작성 스레드가 다른 핸들에 다음 카드(앞면/뒷면)를 그린다.
+    """
+    job_started = Signal(int, float)  # 작업 ID, 큐 대기 시간(초)
+    job_finished = Signal(int)
+    job_error = Signal(int, str)
+    preview_ready = Signal(object)  # CardPreview (인쇄 전 앞면 미리보기)
 
-    def __init__(self, file_name=None):
+    def __init__(self, job_queue, session=None, dispatcher=None, pipeline=None):
         super().__init__()
-        self.file_name = file_name
-        self.text = "Hello, World!"  # 기본 텍스트 설정
+        self.job_queue = job_queue
+        self.text = ""
+        self.layouts = {}  # 레이아웃 이름 -> CompiledLayout (워커 전용)
+        self.layout = None
+        self.layout_name = DEFAULT_LAYOUT
+        self.session = session or printer_session
+        self.dispatcher = dispatcher
+        self.printed_count = 0
+        self.job_id = None
+        self.preview_enabled = False  # 미리보기를 표시할 화면이 있을 때만 켬 (카드마다 비트맵 복사)
+        self.last_result = 0
+        self.print_issued = False  # 이번 작업에서 SmartComm_Print를 호출했는지
+        self.stopping = False
+        self.pipeline_enabled = pipeline_enabled() if pipeline is None else pipeline
+        self.composer = None  # 다음 카드를 그리는 작성 스레드 (파이프라인을 처음 쓸 때 만듦)
+        self.pipelined_count = 0  # 앞 카드가 인쇄되는 동안 미리 그려 둔 카드 수
+        # 인쇄 중인 카드 (작업 ID, 시작 시각, 예상 시간). GUI 스레드가 완료 예측에 읽음
+        self.printing = None
+        # 인쇄 중인 세션의 상태를 조회해 기록하는 함수 (PrintQueue가 상태 모니터의 sample을 넣어 줌)
+        self.status_sampler = None
 
-    def calculate_appropriate_font_width(self, text, max_width=208):
-        if not text:
-            return 25
-        if len(text) * 25 < max_width:
-            font_width = 25
-        else:
-            font_width = max(1, int(max_width / len(text)) + 4)
+    def get_layout(self, name):
+        """이 워커가 쓸 컴파일된 레이아웃 (이름별로 한 번만 컴파일)"""
+        layout = self.layouts.get(name)
+        if layout is None:
+            layout = compile_layout(name)
+            self.layouts[name] = layout
+        return layout
 
-        uppercase_count = sum(1 for c in text if c.isupper())
-        uppercase_ratio = uppercase_count / len(text) if text else 0
+    def draw_card(self, device_handle):
+        """카드 한 장을 그리고 인쇄. 실패 시 오류 메시지를 self.failure에 남긴다"""
+        self.print_issued = False
+        result, self.failure = self.compose(device_handle, self.layout, self.job_id)
+        if result != 0:
+            return result
+        result, self.failure = self.print_card(device_handle, self.layout_name, self.job_id)
+        return result
 
-        if uppercase_ratio >= 0.5:
-            font_width = max(1, font_width - 1)
-        if uppercase_ratio >= 0.8:
-            font_width = max(1, font_width - 1)
+    def compose(self, device_handle, layout, job_id):
+        """준비한 레이아웃을 핸들에 그리기만 함 (인쇄 전). (결과 코드, 실패 메시지)"""
+        device_id = str(self.session.device_id)
+        result, failed_op = layout.draw(device_handle, device_id)
+        if result != 0:
+            return result, f"{failed_op} 그리기 실패"
 
-        return font_width
+        if self.preview_enabled:
+            self.emit_preview(device_handle, job_id)
+        return 0, None
 
-    def run(self):
+    def compose_job(self, device_handle, job):
+        """(작성 스레드) 작업의 레이아웃을 준비해 핸들에 그림. 예외가 나면 결과 코드는 None"""
+        try:
+            layout = self.get_layout(job.layout or DEFAULT_LAYOUT)
+            layout.prepare({"text": job.text})
+            return self.compose(device_handle, layout, job.job_id)
+        except Exception as e:
+            return None, f"인쇄 중 오류 발생: {str(e)}"
+
+    def print_card(self, device_handle, layout_name, job_id):
+        """핸들에 그려 둔 카드를 인쇄하고 걸린 시간을 추정 모델에 기록. (결과 코드, 실패 메시지)"""
+        device_id = str(self.session.device_id)
+        layout = self.get_layout(layout_name)
+        started_at = time.monotonic()
+        # 이 시점부터의 실패는 카드가 나왔을 수 있으므로 다시 인쇄하거나 다른 프린터로 넘기지 않음
+        self.print_issued = True
+        self.printing = (job_id, started_at, print_estimator.estimate(device_id, layout.signature))
+        try:
+            with metrics.timer("psapp_stage_seconds", stage="print", device=device_id):
+                result = print_image(device_handle)
+        finally:
+            self.printing = None
+        if result != 0:
+            return result, "이미지 인쇄 실패"
+        print_estimator.record(device_id, layout.signature, time.monotonic() - started_at, layout_name)
+        self.sample_status()
+        return 0, None
+
+    def sample_status(self):
+        """상태 모니터는 인쇄 중인 세션을 건너뛰므로, 캐시된 상태가 오래됐으면 인쇄 경로에서 조회"""
+        if self.status_sampler is None:
+            return
+        status = self.session.status
+        if status is not None and time.time() - status.timestamp < FAST_POLL_INTERVAL:
+            return
         try:
-            result, printer_list = get_device_list()
+            self.status_sampler(self.session)
+        except Exception as e:
+            print(f"프린터 상태 조회 실패 ({self.session.device_id}): {e}")
+
+    def emit_preview(self, device_handle, job_id):
+        """그리기가 끝난 앞면의 미리보기를 복사해 GUI로 보냄 (실패해도 인쇄는 계속)"""
+        # 복사가 끝나면 SDK 메모리는 더 참조하지 않으므로 바로 인쇄하거나 핸들을 닫아도 됨
+        result, bitmap_info = get_preview_bitmap(device_handle, PAGE_FRONT)
+        if result != 0 or bitmap_info == ffi.NULL:
+            return
+
+        preview = copy_preview_bitmap(job_id, bitmap_info)
+        if preview is not None:
+            self.preview_ready.emit(preview)
+
+    def print_job(self, job):
+        """작업 하나를 인쇄. 성공하면 None, 실패하면 오류 메시지를 반환"""
+        self.text = job.text
+        self.job_id = job.job_id
+        self.print_issued = False
+
+        # 상태 모니터가 이상을 보고한 프린터는 DLL 호출 없이 바로 실패 처리
+        status = self.session.status
+        if status is not None and not status.ok:
+            # 이전 작업의 결과 코드가 남아 있으면 finish_job이 이 실패를 잘못 분류함
+            self.last_result = status.failed_result
+            return f"프린터 상태 이상 (결과 {status.failed_result})"
+
+        try:
+            self.layout_name = job.layout or DEFAULT_LAYOUT
+            self.layout = self.get_layout(self.layout_name)
+            self.layout.prepare({"text": job.text})
+
+            self.failure = "장치 열기 실패"
+            # 인쇄 명령을 보낸 뒤의 실패는 카드가 나왔을 수 있으므로 다시 인쇄하지 않음
+            result = self.session.run(self.draw_card, may_retry=lambda: not self.print_issued)
+            self.last_result = result
+            if result == DEADLINE_EXCEEDED:
+                return f"{self.failure or '장치 열기 실패'} (응답 시간 초과)"
             if result != 0:
-                self.error.emit("프린터 목록 가져오기 실패")
-                return
+                return self.failure or "장치 열기 실패"
+            return None
+
+        except Exception as e:
+            self.last_result = None
+            return f"인쇄 중 오류 발생: {str(e)}"
+
+    def requeue(self, job):
+        self.job_queue.put((job.job_id, job))
 
-            device_index = 0
-            device_id = get_device_id(printer_list, device_index)
+    def ready(self):
+        """작업을 꺼내도 되는지 (회로가 닫혀 있고 캐시된 상태가 이상이 아닐 때)"""
+        status = self.session.status
+        return self.session.breaker.allow() and (status is None or status.ok)
 
-            result, device_handle = open_device(device_id, SMART_OPENDEVICE_BYID)
+    def run(self):
+        # 첫 작업 전에 장치를 미리 열어 둠
+        result, _ = self.session.acquire()
+        if result != 0:
+            kind = KIND_TIMEOUT if result == DEADLINE_EXCEEDED else KIND_ERROR
+            self.session.breaker.record_failure(f"장치 열기 실패 (결과 {result})", kind)
+
+        breaker = self.session.breaker
+        while not self.stopping:
+            # 회로가 열렸거나 상태 모니터가 이상(리본 없음 등)을 보고한 동안에는 작업을 꺼내지 않음
+            # (작업은 대기열에 남아 다른 프린터가 가져가거나 복구된 뒤 인쇄됨)
+            if not breaker.allow():
+                breaker.wait_closed(BREAKER_WAIT)
+                continue
+            if not self.ready():
+                time.sleep(BREAKER_WAIT)
+                continue
+
+            _, job = self.job_queue.get()
+            if job is None:
+                break
+            if not self.ready():
+                # 기다리는 동안 회로가 열렸거나 상태가 나빠졌으면 작업을 되돌림
+                self.requeue(job)
+                continue
+
+            if self.pipeline_enabled and self.job_queue.qsize() > 0:
+                self.run_batch(job)
+            else:
+                self.start_job(job)
+                self.finish_job(job, self.print_job(job))
+
+        if self.composer is not None:
+            self.composer.shutdown(wait=True)
+            self.composer = None
+
+    def start_job(self, job):
+        self.job_started.emit(job.job_id, time.monotonic() - job.submitted_at)
+        job.attempts += 1
+
+    def finish_job(self, job, error_message):
+        """인쇄 결과를 회로 차단기와 시그널에 반영 (실패한 작업은 되돌리거나 오류로 보고)"""
+        breaker = self.session.breaker
+        metrics.inc(
+            "psapp_jobs_total",
+            device=str(self.session.device_id),
+            result="ok" if error_message is None else "error",
+        )
+        if error_message is None:
+            breaker.record_success()
+            self.printed_count += 1
+            self.job_finished.emit(job.job_id)
+            return
+
+        # 예외(레이아웃 오류 등)는 프린터 문제가 아니므로 차단기에 반영하지 않음
+        if self.last_result is not None:
+            kind = KIND_TIMEOUT if self.last_result == DEADLINE_EXCEEDED else KIND_ERROR
+            breaker.record_failure(error_message, kind)
+
+        # 인쇄 명령을 보낸 뒤의 실패(시간 초과 포함)는 카드가 이미 나왔을 수 있으므로
+        # 다른 프린터로 넘기지 않고 오류로 보고함 (열기/그리기/상태 단계의 실패만 되돌림)
+        if self.print_issued:
+            self.job_error.emit(job.job_id, error_message)
+            return
+
+        # 회로가 열렸거나 다른 프린터가 받을 수 있으면 작업을 대기열로 되돌림
+        can_retry = not breaker.allow() or (
+            self.dispatcher is not None and self.dispatcher.other_printer_available(self)
+        )
+        if can_retry and job.attempts < MAX_JOB_ATTEMPTS and self.last_result is not None:
+            self.requeue(job)
+            return
+
+        self.job_error.emit(job.job_id, error_message)
+
+    # --- 파이프라인 인쇄 ---
+
+    def open_pipeline(self):
+        """주 핸들과 두 번째 핸들을 준비. 두 번째 핸들을 열 수 없으면 이 워커의 파이프라인을 끔"""
+        status = self.session.status
+        if status is not None and not status.ok:
+            return False
+        result, _ = self.session.acquire()
+        if result != 0:
+            return False
+        result, _ = self.session.acquire_spare()
+        if result != 0:
+            print(f"프린터 {self.session.device_id}에 두 번째 핸들을 열 수 없어 파이프라인 없이 인쇄합니다 (결과 {result})")
+            self.pipeline_enabled = False
+            return False
+        if self.composer is None:
+            self.composer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="psapp-compose")
+        return True
+
+    def take_next(self):
+        """앞 카드를 인쇄하는 동안 미리 그릴 다음 작업 (없거나 종료 중이거나 프린터 이상이면 None)"""
+        if self.stopping or not self.session.breaker.allow():
+            return None
+        status = self.session.status
+        if status is not None and not status.ok:
+            return None
+        try:
+            entry = self.job_queue.get_nowait()
+        except queue.Empty:
+            return None
+        if entry[1] is None:
+            # 종료 신호는 대기열에 그대로 둠
+            self.job_queue.put(entry)
+            return None
+        return entry[1]
+
+    def recover(self, job, result):
+        """
+        파이프라인에서 인쇄 명령이 실패한 작업의 핸들을 정리하고 오류 메시지를 반환
+
+        일반 경로와 같이 인쇄 명령을 보낸 뒤의 실패는 다시 인쇄하지 않는다
+        (카드가 이미 나왔을 수 있음). 다음 작업은 새로 연 핸들에서 시작한다.
+        """
+        self.last_result = result
+        if result == DEADLINE_EXCEEDED:
+            self.session.discard()
+            return "이미지 인쇄 실패 (응답 시간 초과)"
+        self.session.reconnect()
+        return "이미지 인쇄 실패"
+
+    def run_batch(self, job):
+        """
+        대기열이 밀려 있을 때 카드 N을 인쇄하는 동안 카드 N+1을 두 번째 핸들에 미리 그림
+
+        세션 잠금을 잡은 채 두 핸들을 번갈아 쓴다. 두 번째 핸들을 열 수 없거나
+        그리기가 실패하면 그 작업은 반쯤 그린 핸들을 닫고 일반 경로(print_job)로 처리하며,
+        대기열이 비면 파이프라인을 끝낸다.
+        """
+        session = self.session
+        with session.lock:
+            if not self.open_pipeline():
+                self.start_job(job)
+                self.finish_job(job, self.print_job(job))
+                return
+
+            self.start_job(job)
+            result, _ = self.compose_job(session.handle, job)
             if result != 0:
-                self.error.emit("장치 열기 실패")
+                session.invalidate()
+                self.finish_job(job, self.print_job(job))
                 return
 
-            try:
-                font_name = "Pretendard"
-                font_size = 14
-                font_width = self.calculate_appropriate_font_width(self.text)
-
-                def draw_text_at(y_pos):
-                    draw_info = ffi.new("DRAWTEXT2INFO*")
-                    draw_info.x = 220
-                    draw_info.y = y_pos
-                    draw_info.cx = 208
-                    draw_info.cy = 100
-                    draw_info.rotate = 0
-                    draw_info.align = 0x01 | 0x10  # 가운데 정렬
-                    draw_info.fontHeight = font_size
-                    draw_info.fontWidth = font_width
-                    draw_info.style = 0x01  # FONT_BOLD
-                    draw_info.color = 0x000000
-                    draw_info.option = 0  # TEXT_NOFIT
-
-                    font_encoded = font_name.encode("utf-16-le")
-                    ffi.memmove(draw_info.szFaceName, font_encoded, min(len(font_encoded), 64))
-
-                    text_w = ffi.new("wchar_t[]", self.text)
-                    result = lib.SmartComm_DrawText2(
-                        device_handle,
-                        PAGE_FRONT,
-                        PANELID_BLACK,  # 흑백 패널
-                        draw_info,
-                        text_w
-                    )
-                    return result
-
-                # 첫 번째 줄 출력
-                if draw_text_at(413) != 0:
-                    self.error.emit("첫 번째 텍스트 그리기 실패")
-                    return
+            while True:
+                next_job = self.take_next()
+                composing = None
+                if next_job is not None:
+                    self.start_job(next_job)
+                    composing = self.composer.submit(self.compose_job, session.spare_handle, next_job)
 
-                # 두 번째 줄 출력
-                if draw_text_at(476) != 0:
-                    self.error.emit("두 번째 텍스트 그리기 실패")
-                    return
+                result, _ = self.print_card(session.handle, job.layout or DEFAULT_LAYOUT, job.job_id)
+                # 두 번째 핸들을 닫거나 바꾸기 전에 다음 카드 그리기가 끝나기를 기다림
+                composed = composing.result() if composing is not None else None
 
-                result = print_image(device_handle)
                 if result != 0:
-                    self.error.emit("이미지 인쇄 실패")
+                    if next_job is not None:
+                        # 닫힐 핸들에 그렸으므로 인쇄 시도로 세지 않고 대기열로 되돌림
+                        next_job.attempts -= 1
+                        self.requeue(next_job)
+                    self.finish_job(job, self.recover(job, result))
                     return
 
-                self.finished.emit()
+                self.last_result = 0
+                self.finish_job(job, None)
+                if next_job is None:
+                    return
 
-            finally:
-                close_device(device_handle)
+                compose_result, _ = composed
+                if compose_result != 0:
+                    session.release_spare()
+                    self.finish_job(next_job, self.print_job(next_job))
+                    return
 
-        except Exception as e:
-            self.error.emit(f"인쇄 중 오류 발생: {str(e)}")
+                session.swap_spare()
+                self.pipelined_count += 1
+                job = next_job
@@ -0,0 +1,361 @@
+"""
+프린터 서비스 프로세스의 UI 쪽 클라이언트
+
+PrintQueue와 같은 시그널과 메서드(submit, available, stats, stop ...)를 제공하므로
+InputScreen은 어느 쪽을 쓰는지 신경 쓰지 않는다. 이 모듈은 cffi/DLL을 불러오지 않는다.
+"""
+import itertools
+import os
+import signal
+import subprocess
+import sys
+import time
+from PySide6.QtCore import QObject, QTimer, Signal
+from PySide6.QtNetwork import QLocalSocket
+from .service_protocol import SERVICE_NAME, SERVICE_FLAG, FrameReader, encode, decode_preview
+from metrics import metrics
+
+# 설정하면 서비스 프로세스 없이 GUI 프로세스 안에서 직접 인쇄 (이전 방식)
+IN_PROCESS_ENV = "PSAPP_PRINT_IN_PROCESS"
+
+# 기본 대기열 깊이 (PrintQueue와 같음, 서비스에 보내기 전 UI 쪽 한도)
+DEFAULT_QUEUE_DEPTH = 20
+
+RECONNECT_INTERVAL_MS = 500
+HEARTBEAT_INTERVAL_MS = 2000
+# 이 시간 동안 응답이 없으면 서비스가 멈춘 것으로 보고 다시 띄움 (초)
+HEARTBEAT_TIMEOUT = 10.0
+# 인쇄를 시작한 작업이 이 시간 안에 끝나지 않으면 DLL이 멈춘 것으로 봄 (초)
+JOB_TIMEOUT = 120.0
+# 서비스를 다시 띄우는 최소 간격 (초)
+SPAWN_INTERVAL = 5.0
+
+# 인쇄를 시작한 뒤 서비스 연결이 끊긴 작업의 오류 메시지 (스풀에 남아 확인 대상이 됨)
+INTERRUPTED_MESSAGE = "인쇄 중 프린터 서비스 연결이 끊겨 결과를 알 수 없음 (카드가 나왔을 수 있음, 확인 필요)"
+
+SERVICE_LOG_PATH = "printer_service.log"
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def in_process_printing():
+    return bool(os.environ.get(IN_PROCESS_ENV))
+
+def service_command():
+    """서비스 프로세스 실행 명령 (배포 실행 파일이면 자기 자신을 서비스 모드로)"""
+    if getattr(sys, "frozen", False):
+        return [sys.executable, SERVICE_FLAG]
+    return [sys.executable, "-m", "print_utils.printer_service"]
+
+def spawn_service():
+    """UI와 수명이 분리된 서비스 프로세스를 띄우고 PID를 반환"""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [PACKAGE_ROOT, env.get("PYTHONPATH")]))
+    options = {}
+    if sys.platform == "win32":
+        options["creationflags"] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        options["start_new_session"] = True
+
+    with open(SERVICE_LOG_PATH, "ab") as log:
+        process = subprocess.Popen(
+            service_command(), stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT,
+            env=env, close_fds=True, **options
+        )
+    metrics.inc("psapp_service_spawns_total")
+    return process.pid
+
+def ensure_service(name=SERVICE_NAME, timeout_ms=500):
+    """서비스가 응답하지 않으면 띄움 (시작 직후 백그라운드 스레드에서 미리 호출)"""
+    probe = QLocalSocket()
+    probe.connectToServer(name)
+    if probe.waitForConnected(timeout_ms):
+        probe.abort()
+        return None
+    return spawn_service()
+
+
+class RemotePreview:
+    """서비스가 보낸 미리보기 (CardPreview와 같은 속성, 위아래는 서비스가 바로잡아 보냄)"""
+
+    def __init__(self, job_id, image):
+        self.job_id = job_id
+        self.image = image
+        self.bottom_up = False
+
+    def release(self):
+        self.image = None
+
+
+class PendingJob:
+    """서비스에 보냈거나 보낼 작업 하나"""
+
+    def __init__(self, job_id, text, layout=None):
+        self.job_id = job_id
+        self.text = text
+        self.layout = layout
+        self.submitted_at = time.monotonic()
+        self.sent = False
+        self.started_at = None  # 서비스에서 인쇄를 시작한 시각
+
+
+class PrintServiceClient(QObject):
+    """
+    로컬 소켓으로 프린터 서비스에 작업을 보내는 PrintQueue 대용
+
+    서비스가 없거나 죽으면 다시 띄우고 다시 연결한다. 연결이 끊긴 동안 제출한 작업과
+    인쇄를 시작하기 전에 연결이 끊긴 작업은 다시 연결되면 다시 보낸다. 인쇄를 시작한 뒤
+    결과를 받지 못한 작업은 카드가 나왔을 수 있으므로 다시 보내지 않고 오류로 보고한다.
+    하트비트가 끊기거나 인쇄 중인 작업이 JOB_TIMEOUT을 넘기면 서비스를 강제 종료하고
+    다시 띄운다. GUI 스레드에서는 소켓 입출력만 하고 DLL은 건드리지 않는다.
+    """
+    job_started = Signal(int, float)
+    job_finished = Signal(int)
+    job_error = Signal(int, str)
+    job_deferred = Signal(int, str)  # 작업 ID, 이유 (서비스가 지금 받을 수 없어 돌려보냄, 실패 아님)
+    queue_changed = Signal(int, float)  # 대기 중인 작업 수, 가장 오래 기다린 시간(초)
+    printer_failed = Signal(str, str)  # 장치 ID, 오류 메시지
+    breaker_changed = Signal(str, str, str)  # 장치 ID, 상태, 이유
+    preview_ready = Signal(object)  # RemotePreview (서비스가 압축해 보낸 인쇄 전 앞면 미리보기)
+    printer_status_changed = Signal(object)  # PrinterStatus.as_dict()
+
+    def __init__(self, max_depth=DEFAULT_QUEUE_DEPTH, name=SERVICE_NAME):
+        super().__init__()
+        self.max_depth = max_depth
+        self.name = name
+        self.job_ids = itertools.count(1)
+        self.pending = {}  # 작업 ID -> PendingJob
+        self.reader = FrameReader()
+
+        self.service_pid = None
+        self.remote_depth = 0
+        self.remote_wait = 0.0
+        self.remote_available = None  # 아직 모르면 None (작업을 받아 두었다가 보냄)
+        self.remote_stats = {}
+        # 서비스가 알려 준 작업별 예상 남은 시간(초)과 받은 시각
+        self.remote_eta = {}
+        self.eta_received_at = time.monotonic()
+        self.last_wait = 0.0
+        self.last_pong = time.monotonic()
+        self.last_spawn = 0.0
+        self.spawn_count = 0
+        self.stopping = False
+
+        self.socket = QLocalSocket(self)
+        self.socket.connected.connect(self.on_connected)
+        self.socket.disconnected.connect(self.on_disconnected)
+        self.socket.readyRead.connect(self.on_ready_read)
+        self.socket.errorOccurred.connect(self.on_socket_error)
+
+        self.reconnect_timer = QTimer(self)
+        self.reconnect_timer.setSingleShot(True)
+        self.reconnect_timer.setInterval(RECONNECT_INTERVAL_MS)
+        self.reconnect_timer.timeout.connect(self.connect_service)
+
+        self.heartbeat_timer = QTimer(self)
+        self.heartbeat_timer.setInterval(HEARTBEAT_INTERVAL_MS)
+        self.heartbeat_timer.timeout.connect(self.check_service)
+
+    def start(self):
+        self.stopping = False
+        self.connect_service()
+        self.heartbeat_timer.start()
+
+    def stop(self, timeout_ms=5000):
+        """연결만 닫음 (서비스는 남은 작업을 마저 인쇄한 뒤 스스로 종료)"""
+        self.stopping = True
+        self.heartbeat_timer.stop()
+        self.reconnect_timer.stop()
+        if self.socket.state() == QLocalSocket.LocalSocketState.ConnectedState:
+            self.socket.flush()
+            self.socket.disconnectFromServer()
+
+    def connected(self):
+        return self.socket.state() == QLocalSocket.LocalSocketState.ConnectedState
+
+    def connect_service(self):
+        if self.stopping or self.socket.state() != QLocalSocket.LocalSocketState.UnconnectedState:
+            return
+        self.socket.connectToServer(self.name)
+
+    def spawn(self):
+        now = time.monotonic()
+        if now - self.last_spawn < SPAWN_INTERVAL:
+            return
+        self.last_spawn = now
+        try:
+            pid = spawn_service()
+        except OSError as e:
+            print(f"프린터 서비스를 시작할 수 없습니다: {e}")
+            return
+        self.spawn_count += 1
+        print(f"프린터 서비스 시작 (PID {pid})")
+
+    def restart_service(self, reason):
+        """응답하지 않는 서비스를 강제 종료 (다시 띄우는 것은 재연결 과정에서)"""
+        print(f"프린터 서비스를 다시 시작합니다: {reason}")
+        metrics.inc("psapp_service_kills_total")
+        if self.service_pid:
+            try:
+                os.kill(self.service_pid, signal.SIGTERM)
+            except OSError:
+                pass
+            self.service_pid = None
+        self.socket.abort()
+        self.last_spawn = 0.0
+
+    def check_service(self):
+        """하트비트 전송과 멈춤 감지 (GUI 스레드 타이머)"""
+        if not self.connected():
+            return
+        now = time.monotonic()
+        if now - self.last_pong > HEARTBEAT_TIMEOUT:
+            self.restart_service(f"{HEARTBEAT_TIMEOUT:.0f}초 동안 응답 없음")
+            return
+        for job in self.pending.values():
+            if job.started_at is not None and now - job.started_at > JOB_TIMEOUT:
+                self.restart_service(f"작업 {job.job_id}가 {JOB_TIMEOUT:.0f}초 넘게 끝나지 않음")
+                return
+        self.send({"op": "ping"})
+
+    def on_socket_error(self, error):
+        if self.stopping:
+            return
+        if error in (
+            QLocalSocket.LocalSocketError.ServerNotFoundError,
+            QLocalSocket.LocalSocketError.ConnectionRefusedError,
+        ):
+            self.spawn()
+        # 오류 시그널 시점에는 아직 연결 중 상태일 수 있으므로 상태와 관계없이 재시도 예약
+        if not self.reconnect_timer.isActive():
+            self.reconnect_timer.start()
+
+    def on_connected(self):
+        self.reader.clear()
+        self.last_pong = time.monotonic()
+        # 끊긴 동안 쌓였거나 인쇄를 시작하기 전에 끊긴 작업을 순서대로 다시 보냄
+        for job_id in sorted(self.pending):
+            self.send_job(self.pending[job_id])
+
+    def on_disconnected(self):
+        self.remote_available = None
+        self.remote_eta = {}
+        self.service_pid = None
+        # 인쇄를 시작한 뒤 끊긴 작업은 중복 카드가 나오지 않도록 다시 보내지 않고 확인 대상으로 보고
+        for job_id in sorted(self.pending):
+            if self.pending[job_id].started_at is not None:
+                del self.pending[job_id]
+                metrics.inc("psapp_jobs_unknown_total")
+                self.job_error.emit(job_id, INTERRUPTED_MESSAGE)
+        for job in self.pending.values():
+            job.sent = False
+        if not self.stopping:
+            print("프린터 서비스 연결이 끊겼습니다. 다시 연결합니다.")
+            self.reconnect_timer.start()
+
+    def on_ready_read(self):
+        try:
+            messages = self.reader.feed(bytes(self.socket.readAll().data()))
+        except ValueError as e:
+            self.restart_service(str(e))
+            return
+        for message in messages:
+            self.handle(message)
+
+    def handle(self, message):
+        op = message.get("op")
+        self.last_pong = time.monotonic()
+        if op == "hello":
+            self.service_pid = message["pid"]
+        elif op == "queue":
+            self.remote_depth = message["depth"]
+            self.remote_wait = message["wait"]
+            self.remote_available = message["available"]
+            self.remote_stats = message["stats"]
+            self.remote_eta = {int(job_id): seconds for job_id, seconds in message.get("eta", {}).items()}
+            self.eta_received_at = time.monotonic()
+            self.emit_queue_changed()
+        elif op == "start":
+            job = self.pending.get(message["id"])
+            if job is not None:
+                job.started_at = time.monotonic()
+                self.last_wait = message["wait"]
+                self.job_started.emit(job.job_id, message["wait"])
+        elif op == "done":
+            if self.pending.pop(message["id"], None) is not None:
+                self.job_finished.emit(message["id"])
+        elif op == "error":
+            if self.pending.pop(message["id"], None) is not None:
+                self.job_error.emit(message["id"], message["msg"])
+        elif op == "deferred":
+            # 서비스가 곧 보낼 대기열 상태를 받을 때까지는 받을 수 없는 것으로 봄
+            self.remote_available = False
+            if self.pending.pop(message["id"], None) is not None:
+                self.job_deferred.emit(message["id"], message["reason"])
+        elif op == "failed":
+            print(f"프린터 {message['device']} 회로 열림, 복구될 때까지 작업을 보내지 않습니다: {message['msg']}")
+            self.printer_failed.emit(message["device"], message["msg"])
+        elif op == "status":
+            self.printer_status_changed.emit(message["status"])
+        elif op == "breaker":
+            self.breaker_changed.emit(message["device"], message["state"], message["reason"])
+        elif op == "preview":
+            if message["id"] in self.pending:
+                image = decode_preview(message["format"], message["data"])
+                if image is not None:
+                    self.preview_ready.emit(RemotePreview(message["id"], image))
+
+    def send(self, message):
+        if self.connected():
+            self.socket.write(encode(message))
+
+    def send_job(self, job):
+        if not self.connected():
+            return
+        self.send({"op": "submit", "id": job.job_id, "text": job.text, "layout": job.layout})
+        job.sent = True
+
+    def available(self):
+        """서비스가 알려 준 상태로 볼 때 작업을 받을 수 있는 프린터가 있는지"""
+        return self.remote_available is not False
+
+    def submit(self, text, job_id=None, layout=None):
+        """작업을 서비스에 보내고 작업 ID를 반환. UI 쪽 한도를 넘으면 None"""
+        if len(self.pending) >= self.max_depth:
+            return None
+        if job_id is None:
+            job_id = next(self.job_ids)
+        job = PendingJob(job_id, text, layout)
+        self.pending[job_id] = job
+        self.send_job(job)
+        self.emit_queue_changed()
+        return job_id
+
+    def estimate(self, job_id):
+        """서비스가 예측한 작업의 남은 시간(초). 아직 서비스에 보내지 못했거나 모르면 None"""
+        seconds = self.remote_eta.get(job_id)
+        if seconds is None or job_id not in self.pending:
+            return None
+        return max(0.0, seconds - (time.monotonic() - self.eta_received_at))
+
+    def depth(self):
+        """아직 인쇄를 시작하지 않은 작업 수 (서비스 대기열 + 보내지 못한 작업)"""
+        return self.remote_depth + sum(1 for job in self.pending.values() if not job.sent)
+
+    def oldest_wait(self):
+        if not self.pending:
+            return 0.0
+        oldest = min(job.submitted_at for job in self.pending.values())
+        return time.monotonic() - oldest
+
+    def stats(self):
+        return dict(
+            self.remote_stats,
+            in_flight=len(self.pending),
+            service={
+                "connected": self.connected(),
+                "pid": self.service_pid,
+                "spawns": self.spawn_count,
+            },
+        )
+
+    def emit_queue_changed(self):
+        self.queue_changed.emit(self.depth(), self.oldest_wait())
@@ -0,0 +1,101 @@
+"""
+프린터 서비스 프로세스와 키오스크 UI 사이의 로컬 IPC 메시지 형식
+
+QLocalServer/QLocalSocket(Windows는 named pipe, 그 외는 Unix 소켓) 위에서
+4바이트 길이(빅엔디언) + 공백 없는 JSON 한 덩어리를 메시지 하나로 주고받는다.
+이 모듈은 cffi/DLL을 불러오지 않으므로 GUI 프로세스에서 import해도 된다.
+
+UI → 서비스: submit(id, text, layout), ping
+서비스 → UI: hello(pid), start(id, wait), done(id), error(id, msg),
+             queue(depth, wait, available, stats, eta), failed(device, msg), status(status),
+             breaker(device, state, reason), preview(id, format, data), deferred(id, reason), pong
+
+deferred는 서비스가 지금 받을 수 없는 작업(프린터 없음, 대기열 가득 참)을 돌려보내는 것으로,
+실패가 아니므로 UI는 작업을 보관했다가 프린터가 복구되면 다시 보낸다.
+
+preview는 인쇄 전 앞면 미리보기를 위아래를 바로잡아 압축한 뒤 base64로 담으며,
+그 작업을 보낸 UI에만 보낸다.
+"""
+import base64
+import json
+import os
+import struct
+from PySide6.QtCore import QBuffer, QIODevice, Qt
+from PySide6.QtGui import QImage
+
+# 서버 이름 (벤치마크처럼 실제 키오스크 서비스와 분리할 때 환경 변수로 바꿈)
+SERVICE_NAME_ENV = "PSAPP_PRINTER_SERVICE"
+SERVICE_NAME = os.environ.get(SERVICE_NAME_ENV, "psapp-printer")
+
+# 배포 실행 파일에서 서비스 모드로 실행할 때 쓰는 인자
+SERVICE_FLAG = "--printer-service"
+
+HEADER = struct.Struct(">I")
+MAX_MESSAGE_SIZE = 1 << 20
+
+# 미리보기 압축 형식 (JPEG 플러그인이 없으면 PNG)과 메시지 한도 안에 들도록 둔 크기 상한
+# (base64로 담으면 4/3배가 됨)
+PREVIEW_FORMATS = (("JPG", 85), ("PNG", -1))
+MAX_PREVIEW_BYTES = MAX_MESSAGE_SIZE // 2
+MIN_PREVIEW_WIDTH = 64
+
+def encode(message):
+    body = json.dumps(message, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return HEADER.pack(len(body)) + body
+
+def encode_preview(image, bottom_up):
+    """
+    미리보기 QImage를 (형식, base64 문자열)로 압축
+
+    아래에서 위로 저장된 이미지는 뒤집어 보내고, MAX_PREVIEW_BYTES를 넘으면 절반씩 줄인다.
+    압축할 수 없으면 None을 반환한다.
+    """
+    if bottom_up:
+        image = image.mirrored(False, True)
+    for image_format, quality in PREVIEW_FORMATS:
+        scaled = image
+        while scaled.width() >= MIN_PREVIEW_WIDTH:
+            buffer = QBuffer()
+            buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+            if not scaled.save(buffer, image_format, quality):
+                break
+            data = bytes(buffer.data())
+            if len(data) <= MAX_PREVIEW_BYTES:
+                return image_format, base64.b64encode(data).decode("ascii")
+            scaled = scaled.scaled(
+                scaled.width() // 2, scaled.height() // 2,
+                Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation,
+            )
+    return None
+
+def decode_preview(image_format, data):
+    """encode_preview가 만든 문자열을 QImage로 (읽을 수 없으면 None)"""
+    image = QImage()
+    if not image.loadFromData(base64.b64decode(data), image_format):
+        return None
+    return image
+
+
+class FrameReader:
+    """소켓에서 읽은 바이트를 모아 완성된 메시지만 꺼내 주는 버퍼"""
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def feed(self, data):
+        """새 데이터를 추가하고 완성된 메시지 목록을 반환"""
+        self.buffer += data
+        messages = []
+        while len(self.buffer) >= HEADER.size:
+            (length,) = HEADER.unpack_from(self.buffer)
+            if length > MAX_MESSAGE_SIZE:
+                raise ValueError(f"메시지가 너무 큽니다 ({length}바이트)")
+            end = HEADER.size + length
+            if len(self.buffer) < end:
+                break
+            messages.append(json.loads(bytes(self.buffer[HEADER.size:end])))
+            del self.buffer[:end]
+        return messages
+
+    def clear(self):
+        self.buffer.clear()
@@ -0,0 +1,250 @@
+import os
+import threading
+import time
+
+# 호출별 지연 시간 프로필 (초). 없는 함수는 지연 없음
+LATENCY_PROFILES = {
+    "instant": {},
+    # USB 연결 카드 프린터의 대략적인 수치
+    "usb": {
+        "SmartComm_GetDeviceList2": 0.35,
+        "SmartComm_OpenDevice2": 0.25,
+        "SmartComm_CloseDevice": 0.05,
+        "SmartComm_DrawText2": 0.01,
+        "SmartComm_DrawText": 0.01,
+        "SmartComm_DrawImage": 0.04,
+        "SmartComm_GetPreviewBitmap": 0.02,
+        "SmartComm_Print": 8.0,
+        "SmartComm_GetStatus": 0.01,
+        "SmartComm_GetRibbonType": 0.01,
+    },
+    # 벤치마크용으로 인쇄 시간만 줄인 프로필
+    "fast": {
+        "SmartComm_GetDeviceList2": 0.035,
+        "SmartComm_OpenDevice2": 0.025,
+        "SmartComm_CloseDevice": 0.005,
+        "SmartComm_DrawText2": 0.001,
+        "SmartComm_DrawImage": 0.004,
+        "SmartComm_Print": 0.08,
+    },
+}
+
+# 미리보기 비트맵 크기 (CR80 카드, 300dpi)
+PREVIEW_WIDTH = 1012
+PREVIEW_HEIGHT = 638
+
+class SimulatedDevice:
+    """가상 프린터 한 대의 상태"""
+
+    def __init__(self, index):
+        self.index = index
+        self.id = f"SIM{index:02d}"
+        self.name = f"Simulated Printer {index}"
+        self.desc = f"SmartComm simulator device {index}"
+        self.pid = 0x5000 + index
+        self.status = 0
+        self.ribbon_type = 1
+        self.lock = threading.Lock()
+        self.mechanism = threading.Lock()  # 인쇄 기구는 한 번에 카드 한 장만 처리
+        self.printed = []  # 인쇄된 카드별 명령 목록
+        self.preview = None
+
+
+class SimulatedSmartComm:
+    """
+    SmartComm2.dll과 같은 SmartComm_* 시그니처를 가진 순수 Python 대체 lib
+
+    프린터 없이 인쇄 경로를 실행/측정할 수 있도록 가상 장치 여러 대와
+    호출별 지연 시간, 오류 코드 주입을 지원한다. 인자는 실제 DLL과 같은
+    cffi 객체를 받는다.
+    """
+
+    def __init__(self, ffi, device_count=1, profile="instant", latencies=None):
+        self.ffi = ffi
+        self.devices = [SimulatedDevice(i) for i in range(device_count)]
+        self.latencies = dict(LATENCY_PROFILES[profile])
+        self.latencies.update(latencies or {})
+        self.errors = {}  # (함수 이름, 장치 ID 또는 None) -> [오류 코드, ...]
+        self.handles = {}  # 핸들 값 -> SimulatedDevice
+        # 핸들 값 -> 현재 카드에 그려진 명령 (SDK처럼 핸들마다 따로 그리므로 같은 장치에
+        # 핸들을 두 개 열어 한쪽에서 인쇄하는 동안 다른 쪽에 다음 카드를 그릴 수 있다)
+        self.canvases = {}
+        self.next_handle = 1
+        self.lock = threading.Lock()
+        self.call_counts = {}
+
+    # --- 설정 ---
+
+    def set_latency(self, func_name, seconds):
+        self.latencies[func_name] = seconds
+
+    def inject_error(self, func_name, code, times=1, device_id=None):
+        """func_name의 다음 times번 호출이 code를 반환하도록 설정"""
+        with self.lock:
+            self.errors.setdefault((func_name, device_id), []).extend([code] * times)
+
+    # --- 내부 도우미 ---
+
+    def _enter(self, func_name, device=None, delay=True):
+        """호출 횟수를 세고 지연을 적용한 뒤, 주입된 오류 코드가 있으면 반환"""
+        with self.lock:
+            self.call_counts[func_name] = self.call_counts.get(func_name, 0) + 1
+            code = 0
+            for key in ((func_name, device.id if device else None), (func_name, None)):
+                pending = self.errors.get(key)
+                if pending:
+                    code = pending.pop(0)
+                    break
+        if delay:
+            self._sleep(func_name)
+        return code
+
+    def _sleep(self, func_name):
+        delay = self.latencies.get(func_name, 0)
+        if delay:
+            time.sleep(delay)
+
+    def _handle_value(self, handle):
+        return int(self.ffi.cast("uintptr_t", handle))
+
+    def _device(self, handle):
+        return self.handles.get(self._handle_value(handle))
+
+    # --- SmartComm API ---
+
+    def SmartComm_GetDeviceList2(self, pDevList):
+        code = self._enter("SmartComm_GetDeviceList2")
+        if code:
+            return code
+        pDevList.n = len(self.devices)
+        for i, device in enumerate(self.devices):
+            item = pDevList.item[i]
+            item.name = device.name
+            item.id = device.id
+            item.dev = device.id
+            item.desc = device.desc
+            item.pid = device.pid
+        return 0
+
+    def SmartComm_OpenDevice2(self, pHandle, szDevice, nDevType):
+        device_key = szDevice if isinstance(szDevice, str) else self.ffi.string(szDevice)
+        device = next(
+            (d for d in self.devices if device_key in (d.id, d.desc)), None
+        )
+        code = self._enter("SmartComm_OpenDevice2", device)
+        if code:
+            return code
+        if device is None:
+            return -1
+        with self.lock:
+            handle_value = self.next_handle
+            self.next_handle += 1
+            self.handles[handle_value] = device
+            self.canvases[handle_value] = []
+        pHandle[0] = self.ffi.cast("HSMART", handle_value)
+        return 0
+
+    def SmartComm_CloseDevice(self, hHandle):
+        device = self._device(hHandle)
+        code = self._enter("SmartComm_CloseDevice", device)
+        with self.lock:
+            handle_value = self._handle_value(hHandle)
+            self.handles.pop(handle_value, None)
+            self.canvases.pop(handle_value, None)
+        return code
+
+    def _draw(self, func_name, hHandle, op):
+        device = self._device(hHandle)
+        code = self._enter(func_name, device)
+        if code:
+            return code
+        if device is None:
+            return -1
+        with self.lock:
+            self.canvases[self._handle_value(hHandle)].append(op)
+        return 0
+
+    def SmartComm_DrawText2(self, hHandle, page, panel, pdt2info, szText):
+        op = (
+            "text", page, panel, pdt2info.x, pdt2info.y, pdt2info.fontWidth,
+            self.ffi.string(pdt2info.szFaceName), self.ffi.string(szText),
+        )
+        return self._draw("SmartComm_DrawText2", hHandle, op)
+
+    def SmartComm_DrawText(self, hHandle, page, panel, x, y, szFontName, nFontSize, nFontStyle, szText, prcArea):
+        op = ("text", page, panel, x, y, nFontSize, self.ffi.string(szFontName), self.ffi.string(szText))
+        return self._draw("SmartComm_DrawText", hHandle, op)
+
+    def SmartComm_DrawImage(self, hHandle, page, panel, x, y, cx, cy, szImgPath, prcArea):
+        image_path = self.ffi.string(szImgPath)
+        if not os.path.exists(image_path):
+            return -2
+        op = ("image", page, panel, x, y, cx, cy, image_path)
+        return self._draw("SmartComm_DrawImage", hHandle, op)
+
+    def SmartComm_Print(self, hHandle):
+        device = self._device(hHandle)
+        code = self._enter("SmartComm_Print", device, delay=False)
+        if device is None:
+            self._sleep("SmartComm_Print")
+            return code or -1
+        # 같은 장치의 다른 핸들이 인쇄 중이면 기구가 빌 때까지 기다림
+        with device.mechanism:
+            self._sleep("SmartComm_Print")
+        if code:
+            return code
+        with self.lock:
+            ops = self.canvases[self._handle_value(hHandle)]
+            self.canvases[self._handle_value(hHandle)] = []
+        with device.lock:
+            device.printed.append(ops)
+        return 0
+
+    def SmartComm_GetStatus(self, hHandle, pStatus):
+        device = self._device(hHandle)
+        code = self._enter("SmartComm_GetStatus", device)
+        if code:
+            return code
+        if device is None:
+            return -1
+        pStatus[0] = device.status
+        return 0
+
+    def SmartComm_GetRibbonType(self, hHandle, pnRibbonType):
+        device = self._device(hHandle)
+        code = self._enter("SmartComm_GetRibbonType", device)
+        if code:
+            return code
+        if device is None:
+            return -1
+        pnRibbonType[0] = device.ribbon_type
+        return 0
+
+    def SmartComm_GetPreviewBitmap(self, hHandle, page, ppbi):
+        device = self._device(hHandle)
+        code = self._enter("SmartComm_GetPreviewBitmap", device)
+        if code:
+            return code
+        if device is None:
+            return -1
+
+        # 흰색 24비트 bottom-up DIB (SDK와 같은 메모리 배치)
+        header_size = self.ffi.sizeof("BITMAPINFOHEADER")
+        stride = (PREVIEW_WIDTH * 3 + 3) & ~3
+        buffer = self.ffi.new("unsigned char[]", header_size + stride * PREVIEW_HEIGHT)
+        self.ffi.memmove(buffer + header_size, b"\xff" * (stride * PREVIEW_HEIGHT), stride * PREVIEW_HEIGHT)
+
+        bitmap_info = self.ffi.cast("BITMAPINFO *", buffer)
+        header = bitmap_info.bmiHeader
+        header.biSize = header_size
+        header.biWidth = PREVIEW_WIDTH
+        header.biHeight = PREVIEW_HEIGHT
+        header.biPlanes = 1
+        header.biBitCount = 24
+        header.biCompression = 0
+        header.biSizeImage = stride * PREVIEW_HEIGHT
+
+        # SDK처럼 다음 호출 전까지 메모리를 장치가 소유
+        device.preview = buffer
+        ppbi[0] = bitmap_info
+        return 0
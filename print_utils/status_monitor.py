@@ -0,0 +1,164 @@
+import threading
+import time
+from PySide6.QtCore import QThread, Signal
+from .device_functions import read_printer_status, get_ribbon_type
+from .circuit_breaker import KIND_ERROR, KIND_TIMEOUT
+from .deadline import DEADLINE_EXCEEDED
+
+# 인쇄 중/유휴 상태의 폴링 간격 (초)
+FAST_POLL_INTERVAL = 1.0
+SLOW_POLL_INTERVAL = 10.0
+
+class PrinterStatus:
+    """한 시점의 프린터 상태 (변경하지 않고 새 객체로 교체)"""
+
+    def __init__(self, device_id, result, status, ribbon_result, ribbon_type, busy=False):
+        self.device_id = device_id
+        self.result = result
+        self.status = status
+        self.ribbon_result = ribbon_result
+        self.ribbon_type = ribbon_type
+        self.busy = busy  # 인쇄 중에 워커가 인쇄 경로에서 조회한 상태
+        self.timestamp = time.time()
+
+    @property
+    def ok(self):
+        # SDK는 상태 비트의 의미를 공개하지 않으므로 호출 성공 여부로 판단
+        return self.result == 0 and self.ribbon_result == 0
+
+    @property
+    def failed_result(self):
+        """실패한 호출(상태 조회 또는 리본 조회)의 결과 코드 (정상이면 0)"""
+        return self.result if self.result != 0 else self.ribbon_result
+
+    def key(self):
+        """변경 여부 비교용 값"""
+        return (self.ok, self.status, self.ribbon_type)
+
+    def as_dict(self):
+        return {
+            "device_id": self.device_id,
+            "ok": self.ok,
+            "result": self.result,
+            "status": self.status,
+            "ribbon_type": self.ribbon_type,
+            "busy": self.busy,
+            "timestamp": self.timestamp,
+        }
+
+
+class StatusMonitor(QThread):
+    """
+    프린터 상태를 주기적으로 조회해 각 세션의 session.status에 캐시하는 스레드
+
+    인쇄 대기열에 작업이 있으면 빠르게, 없으면 느리게 조회한다.
+    인쇄 중인 세션은 핸들을 건드리지 않고 건너뛰며, 대신 워커가 카드를 인쇄한 뒤
+    sample()로 조회해 기록한다 (작업이 계속 밀려 있어도 상태가 갱신됨).
+    상태가 바뀌면 status_changed를 보낸다. 조회 실패는 세션의 회로 차단기에 반영하고,
+    회로가 열린 세션은 탐침 시각이 될 때만 장치를 다시 열어 보고 성공하면 회로를 닫는다.
+    """
+    status_changed = Signal(object)  # PrinterStatus
+
+    def __init__(self, sessions, is_busy=None):
+        super().__init__()
+        self.sessions = sessions
+        self.is_busy = is_busy or (lambda: False)
+        self.stop_event = threading.Event()
+        self.wake_event = threading.Event()
+        self.poll_count = 0
+
+    def stop(self, timeout_ms=5000):
+        self.stop_event.set()
+        self.wake_event.set()
+        if self.isRunning():
+            self.wait(timeout_ms)
+
+    def wake(self):
+        """다음 조회를 바로 하도록 깨움 (작업이 들어왔을 때)"""
+        self.wake_event.set()
+
+    def poll(self, session):
+        breaker = session.breaker
+        if not breaker.allow() and not breaker.probe_due():
+            return None
+        # 인쇄 중인 세션의 핸들은 건드리지 않음
+        if not session.lock.acquire(blocking=False):
+            return None
+        try:
+            probing = breaker.begin_probe()
+            if probing:
+                # 탐침은 끊긴 핸들 대신 장치를 새로 열어 확인
+                # (멈춘 핸들도 닫기는 제한 시간 안에서만 기다리므로 같은 방법으로 닫음)
+                session.invalidate()
+            status = self.read_status(session)
+            # 리본 조회까지 성공해야 정상 (리본이 없는 프린터로 회로를 닫지 않음)
+            if status.ok:
+                if probing:
+                    breaker.record_success()
+            else:
+                kind = KIND_TIMEOUT if status.failed_result == DEADLINE_EXCEEDED else KIND_ERROR
+                breaker.record_failure(f"상태 조회 실패 (결과 {status.failed_result})", kind)
+            return status
+        finally:
+            session.lock.release()
+
+    def sample(self, session):
+        """
+        (인쇄 워커, 세션 잠금을 잡은 채) 인쇄 중인 프린터의 상태를 조회해 기록
+
+        인쇄 경로에서는 핸들을 닫거나 다시 열지 않고 읽기만 한다. 실패한 상태가 기록되면
+        워커가 다음 작업을 꺼내지 않으므로, 회로 차단기와 핸들 정리는 세션이 풀린 뒤
+        poll()이 맡는다.
+        """
+        result, status = read_printer_status(session.handle)
+        ribbon_result, ribbon_type = 0, 0
+        if result != DEADLINE_EXCEEDED:
+            ribbon_result, ribbon_type = get_ribbon_type(session.handle)
+        self.record(session, PrinterStatus(str(session.device_id), result, status, ribbon_result, ribbon_type, busy=True))
+
+    def record(self, session, status):
+        """세션의 상태를 바꾸고, 바뀌었으면 status_changed를 보냄 (어느 스레드에서든)"""
+        previous = session.status
+        session.status = status
+        self.poll_count += 1
+        if previous is None or previous.key() != status.key():
+            self.status_changed.emit(status)
+
+    def read_status(self, session):
+        if session.handle is None:
+            result, _ = session.acquire()
+            if result != 0:
+                return PrinterStatus(str(session.device_id), result, 0, result, 0)
+        result, status = read_printer_status(session.handle)
+        if result == DEADLINE_EXCEEDED:
+            # 멈춘 핸들을 닫고 새로 열어 다음 조회와 인쇄는 새 핸들로 함
+            session.discard()
+            return PrinterStatus(str(session.device_id), result, status, result, 0)
+        ribbon_result, ribbon_type = get_ribbon_type(session.handle)
+        if result != 0:
+            # 핸들이 끊겼을 수 있으므로 다음 조회 때 다시 연다
+            session.invalidate()
+        return PrinterStatus(str(session.device_id), result, status, ribbon_result, ribbon_type)
+
+    def run(self):
+        while not self.stop_event.is_set():
+            for session in self.sessions:
+                try:
+                    status = self.poll(session)
+                except Exception as e:
+                    print(f"프린터 상태 조회 실패 ({session.device_id}): {e}")
+                    continue
+                if status is not None:
+                    self.record(session, status)
+
+            # 작업이 있거나, 아직 상태를 모르거나, 실패가 쌓이는 중이면 빠르게 조회
+            # (끊긴 프린터를 손님이 기다리기 전에 차단)
+            unsettled = any(session.status is None or session.breaker.failures for session in self.sessions)
+            interval = FAST_POLL_INTERVAL if self.is_busy() or unsettled else SLOW_POLL_INTERVAL
+            # 회로가 열린 세션이 있으면 다음 탐침 시각에 맞춰 깸
+            for session in self.sessions:
+                until_probe = session.breaker.seconds_until_probe()
+                if until_probe is not None:
+                    interval = min(interval, until_probe)
+            self.wake_event.wait(interval)
+            self.wake_event.clear()
@@ -0,0 +1,80 @@
+import threading
+from functools import lru_cache
+from PySide6.QtGui import QFont, QFontMetricsF
+
+# 글리프 폭을 측정할 기준 픽셀 크기 (클수록 반올림 오차가 작음)
+REFERENCE_PIXEL_SIZE = 100
+
+# 기준 크기에서 미리 측정해 둘 문자 (나머지는 처음 쓰일 때 측정)
+PRELOAD_CHARS = "".join(chr(c) for c in range(0x20, 0x7F))
+
+class GlyphAdvanceTable:
+    """
+    기준 크기에서 측정한 글리프별 가로 폭 표
+
+    SmartComm_DrawText2의 fontWidth는 GDI LOGFONT의 평균 문자 폭이므로,
+    글리프 폭은 fontWidth에 정비례한다. 기준 크기에서 한 번 측정해 두면
+    어떤 fontWidth에서의 문자열 폭도 곱셈 한 번으로 계산할 수 있다.
+    QPainter 없이 동작하므로 인쇄 워커 스레드에서 호출해도 된다.
+    """
+
+    def __init__(self, family, bold=False):
+        self.family = family
+        self.bold = bold
+        font = QFont(family)
+        font.setPixelSize(REFERENCE_PIXEL_SIZE)
+        font.setBold(bold)
+        self.metrics = QFontMetricsF(font)
+        self.average_width = self.metrics.averageCharWidth() or REFERENCE_PIXEL_SIZE / 2
+        self.lock = threading.Lock()
+        self.advances = {char: self.metrics.horizontalAdvance(char) for char in PRELOAD_CHARS}
+
+    def advance(self, char):
+        width = self.advances.get(char)
+        if width is None:
+            with self.lock:
+                width = self.metrics.horizontalAdvance(char)
+                self.advances[char] = width
+        return width
+
+    def text_width(self, text):
+        """기준 크기에서의 문자열 폭"""
+        return sum(self.advance(char) for char in text)
+
+    def width_at(self, text, font_width):
+        """fontWidth가 font_width일 때의 예상 문자열 폭(px)"""
+        return self.text_width(text) * font_width / self.average_width
+
+
+_tables = {}
+_tables_lock = threading.Lock()
+
+def get_advance_table(family, bold=False):
+    """(폰트, 굵기)별 글리프 폭 표를 한 번만 만들어 재사용"""
+    key = (family, bold)
+    table = _tables.get(key)
+    if table is None:
+        with _tables_lock:
+            table = _tables.get(key)
+            if table is None:
+                table = GlyphAdvanceTable(family, bold)
+                _tables[key] = table
+    return table
+
+@lru_cache(maxsize=1024)
+def fit_font_width(text, box_width, family="Pretendard", bold=True, max_font_width=25, min_font_width=1):
+    """
+    text가 box_width(px) 안에 들어가는 가장 큰 fontWidth를 반환
+
+    글리프 폭이 fontWidth에 비례하므로 반복 없이 한 번에 계산한다.
+    """
+    if not text:
+        return max_font_width
+
+    table = get_advance_table(family, bold)
+    text_width = table.text_width(text)
+    if text_width <= 0:
+        return max_font_width
+
+    font_width = int(box_width * table.average_width / text_width)
+    return max(min_font_width, min(max_font_width, font_width))
@@ -0,0 +1,33 @@
+from PySide6.QtWidgets import QLabel
+from PySide6.QtGui import QPixmap, QPainter, QTransform
+from PySide6.QtCore import Qt, QRect
+
+class CardPreviewLabel(QLabel):
+    """인쇄 전 카드 미리보기를 표시하는 라벨"""
+
+    def show_preview(self, preview):
+        """미리보기 복사본을 라벨 크기로 한 번에 옮겨 그리고 놓아 줌"""
+        try:
+            pixmap = QPixmap(self.size())
+            pixmap.fill(Qt.GlobalColor.transparent)
+
+            # 비율을 유지한 채 라벨 가운데에 배치
+            image_size = preview.image.size().scaled(self.size(), Qt.AspectRatioMode.KeepAspectRatio)
+            target = QRect(
+                (self.width() - image_size.width()) // 2,
+                (self.height() - image_size.height()) // 2,
+                image_size.width(),
+                image_size.height(),
+            )
+
+            painter = QPainter(pixmap)
+            painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+            if preview.bottom_up:
+                # 아래에서 위로 저장된 DIB는 다시 복사하지 않고 그릴 때 뒤집음
+                painter.setTransform(QTransform(1, 0, 0, -1, 0, 2 * target.y() + target.height()))
+            painter.drawImage(target, preview.image)
+            painter.end()
+
+            self.setPixmap(pixmap)
+        finally:
+            preview.release()
@@ -1,5 +1,9 @@
+import math
+import time
 from PySide6.QtWidgets import QWidget, QLabel, QPushButton
-from PySide6.QtGui import QPixmap
+from PySide6.QtCore import Qt, QTimer
+from screens.image_cache import background_cache
+from screens.card_preview import CardPreviewLabel
 
 class CompleteScreen(QWidget):
     def __init__(self, stack, screen_size, main_window):
@@ -11,14 +15,62 @@ class CompleteScreen(QWidget):
 
     def setupUI(self):
         self.setupBackground()
+        self.addCardPreview()
+        self.addEtaLabel()
         self.addCloseButton()
     
     def setupBackground(self):
-        pixmap = QPixmap("resources/complete.jpg")  # 이미지 로드
+        # 화면 크기로 미리 축소한 이미지를 사용 (다시 그릴 때 확대/축소하지 않음)
         background_label = QLabel(self)
-        background_label.setPixmap(pixmap)
-        background_label.setScaledContents(True)  # QLabel 크기에 맞게 이미지 조정
         background_label.resize(*self.screen_size)  # 전체 화면 크기로 설정
+        background_cache.apply(background_label, "resources/complete.jpg", self.screen_size)
+
+    def addCardPreview(self):
+        """인쇄 전 카드 미리보기 영역 (미리보기가 오면 표시)"""
+        width, height = self.screen_size
+        self.card_preview = CardPreviewLabel(self)
+        self.card_preview.setGeometry(int(width * 0.35), int(height * 0.55), int(width * 0.3), int(height * 0.35))
+        self.card_preview.hide()
+
+    def show_preview(self, preview):
+        self.card_preview.show_preview(preview)
+        self.card_preview.show()
+
+    def addEtaLabel(self):
+        """카드가 나오기까지 예상 남은 시간 (인쇄 대기열이 예측하면 표시)"""
+        width, height = self.screen_size
+        self.eta_label = QLabel(self)
+        self.eta_label.setGeometry(int(width * 0.25), int(height * 0.91), int(width * 0.5), int(height * 0.06))
+        self.eta_label.setAlignment(Qt.AlignCenter)
+        self.eta_label.setStyleSheet("background-color: transparent; color: black; font-size: 40px;")
+        self.eta_label.hide()
+
+        # 새 예측을 받을 때까지 1초마다 남은 시간을 줄여 표시
+        self.eta_deadline = None
+        self.eta_timer = QTimer(self)
+        self.eta_timer.setInterval(1000)
+        self.eta_timer.timeout.connect(self.refresh_eta)
+
+    def show_eta(self, seconds):
+        """예상 남은 시간(초)을 표시. None이면 숨김"""
+        if seconds is None:
+            self.eta_timer.stop()
+            self.eta_label.hide()
+            return
+        self.eta_deadline = time.monotonic() + seconds
+        self.refresh_eta()
+        self.eta_label.show()
+        if not self.eta_timer.isActive():
+            self.eta_timer.start()
+
+    def refresh_eta(self):
+        remaining = math.ceil(self.eta_deadline - time.monotonic())
+        if remaining <= 0:
+            self.eta_label.setText("곧 카드가 나옵니다")
+        elif remaining < 60:
+            self.eta_label.setText(f"약 {remaining}초 후 카드가 나옵니다")
+        else:
+            self.eta_label.setText(f"약 {remaining // 60}분 {remaining % 60}초 후 카드가 나옵니다")
 
     def addCloseButton(self):
         """오른쪽 상단에 닫기 버튼 추가"""
@@ -41,4 +93,6 @@ class CompleteScreen(QWidget):
         self.close_button.clicked.connect(self.main_window.closeApplication)
 
     def mousePressEvent(self, event):
+        self.card_preview.hide()
+        self.show_eta(None)
         self.stack.setCurrentIndex(0)
\ No newline at end of file
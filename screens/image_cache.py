@@ -0,0 +1,98 @@
+import os
+import threading
+from PySide6.QtCore import QObject, QSize, QThreadPool, Signal
+from PySide6.QtGui import QImage, QImageReader, QPixmap
+
+class ScaledImageCache(QObject):
+    """
+    (이미지 경로, 목표 크기) -> 미리 축소한 QPixmap 캐시
+
+    원본 JPEG를 QImageReader.setScaledSize로 목표 해상도에서 바로 디코딩하므로
+    QLabel이 다시 그릴 때마다 원본을 확대/축소하지 않는다.
+    디코딩은 QThreadPool에서 하고, QPixmap 변환은 GUI 스레드에서 한다.
+    persist_dir를 주면 축소한 이미지를 디스크에도 저장해 다음 실행 때 재사용한다.
+    """
+    image_ready = Signal(str, int, int, QImage)
+
+    def __init__(self, persist_dir=None):
+        super().__init__()
+        self.persist_dir = persist_dir
+        self.pixmaps = {}
+        self.waiting = {}  # 키 -> 이미지를 기다리는 QLabel 목록
+        self.lock = threading.Lock()
+        self.image_ready.connect(self.on_image_ready)
+
+    def persisted_path(self, path, width, height):
+        if not self.persist_dir:
+            return None
+        stat = os.stat(path)
+        stem = os.path.splitext(os.path.basename(path))[0]
+        return os.path.join(self.persist_dir, f"{stem}-{width}x{height}-{stat.st_mtime_ns}.bmp")
+
+    def decode(self, path, width, height):
+        """목표 크기로 디코딩한 QImage를 반환 (어느 스레드에서나 호출 가능)"""
+        cached_path = self.persisted_path(path, width, height)
+        if cached_path and os.path.exists(cached_path):
+            image = QImage(cached_path)
+            if not image.isNull():
+                return image
+
+        reader = QImageReader(path)
+        reader.setScaledSize(QSize(width, height))
+        image = reader.read()
+
+        if cached_path and not image.isNull():
+            os.makedirs(self.persist_dir, exist_ok=True)
+            image.save(cached_path, "BMP")
+        return image
+
+    def prefetch(self, path, size):
+        """백그라운드에서 미리 디코딩해 캐시에 넣음"""
+        width, height = size
+        key = (path, width, height)
+        with self.lock:
+            if key in self.pixmaps or key in self.waiting:
+                return
+            self.waiting[key] = []
+        QThreadPool.globalInstance().start(
+            lambda: self.image_ready.emit(path, width, height, self.decode(path, width, height))
+        )
+
+    def apply(self, label, path, size, blocking=False):
+        """
+        label에 축소된 배경을 지정
+
+        캐시에 있으면 바로 지정하고, 없으면 백그라운드 디코딩이 끝난 뒤 지정한다.
+        blocking이면 현재 스레드에서 바로 디코딩한다 (첫 화면용).
+        """
+        width, height = size
+        key = (path, width, height)
+        pixmap = self.pixmaps.get(key)
+        if pixmap is not None:
+            label.setPixmap(pixmap)
+            return
+
+        if blocking:
+            self.on_image_ready(path, width, height, self.decode(path, width, height))
+            label.setPixmap(self.pixmaps[key])
+            return
+
+        self.prefetch(path, size)
+        with self.lock:
+            if key in self.waiting:
+                self.waiting[key].append(label)
+                return
+        label.setPixmap(self.pixmaps[key])
+
+    def on_image_ready(self, path, width, height, image):
+        key = (path, width, height)
+        pixmap = QPixmap.fromImage(image)
+        with self.lock:
+            self.pixmaps[key] = pixmap
+            labels = self.waiting.pop(key, [])
+        for label in labels:
+            label.setPixmap(pixmap)
+
+
+# 앱 전체에서 공유하는 배경 이미지 캐시
+background_cache = ScaledImageCache()
@@ -1,10 +1,22 @@
 from PySide6.QtWidgets import QWidget, QLabel, QPushButton, QLineEdit, QApplication
-from PySide6.QtGui import QPixmap
 from PySide6.QtCore import QRect, Qt, QTimer
-import requests
-import urllib.parse
-from print_utils.printer_thread import PrinterThread
+from screens.image_cache import background_cache
+from screens.lazy_stack import LazyStack
+from print_utils.service_client import PrintServiceClient, in_process_printing
+from net_utils.upload_thread import UploadThread
 from virtual_keyboard import VirtualKeyboard
+from spool import JobSpool
+from metrics import metrics
+
+# 완료 화면 인덱스 (미리보기 표시용)
+COMPLETE_SCREEN_INDEX = 3
+
+def create_print_queue():
+    """기본은 별도 프린터 서비스 프로세스, 설정하면 이 프로세스 안의 인쇄 대기열"""
+    if in_process_printing():
+        from print_utils.print_queue import PrintQueue
+        return PrintQueue(previews=True)
+    return PrintServiceClient()
 
 class InputScreen(QWidget):
     def __init__(self, stack, screen_size, main_window):
@@ -17,9 +29,34 @@ class InputScreen(QWidget):
         self.original_image_size = (2736, 1824)
         self.original_input_area = QRect(844, 884, 1889-844, 1129-884)
         
-        # 프린터 스레드 관련 변수 초기화
-        self.printer_thread = None
-        self.is_printing = False
+        # 작업 스풀 (비정상 종료 후에도 이름과 진행 상태를 보존)
+        self.spool = JobSpool()
+        self.spool.compact()
+
+        # 인쇄 대기열 (DLL은 프린터 서비스 프로세스에서만 호출)
+        self.print_queue = create_print_queue()
+        self.print_queue.job_started.connect(self.on_print_started)
+        self.print_queue.job_finished.connect(self.on_print_finished)
+        self.print_queue.job_error.connect(self.on_print_error)
+        self.print_queue.job_deferred.connect(self.on_print_deferred)
+        self.print_queue.queue_changed.connect(self.on_queue_changed)
+        self.print_queue.preview_ready.connect(self.on_preview_ready)
+        self.print_queue.breaker_changed.connect(self.on_breaker_changed)
+        self.print_queue.printer_status_changed.connect(self.retry_parked_jobs)
+        self.last_job_id = None
+        # 프린터를 쓸 수 없거나 재개할 때 대기열이 가득 찬 작업 (작업 ID -> 이름, 스풀에는 미완료로 남음)
+        self.parked_jobs = {}
+        self.print_queue.start()
+
+        # 서버 전송 워커 (GUI 스레드를 막지 않도록 별도 스레드에서 전송)
+        self.upload_thread = UploadThread()
+        self.upload_thread.upload_finished.connect(self.on_upload_finished)
+        self.upload_thread.upload_error.connect(self.on_upload_error)
+        self.upload_thread.batch_flushed.connect(self.on_batch_flushed)
+        self.upload_thread.start()
+
+        # 지난 실행에서 끝나지 않은 작업 재개
+        self.resume_unfinished_jobs()
         
         # 가상 키보드 변수 초기화
         self.virtual_keyboard = None
@@ -32,11 +69,10 @@ class InputScreen(QWidget):
         self.addLineEdit()
 
     def setupBackground(self):
-        pixmap = QPixmap("resources/input.jpg")  # 이미지 로드
+        # 화면 크기로 미리 축소한 이미지를 사용 (다시 그릴 때 확대/축소하지 않음)
         background_label = QLabel(self)
-        background_label.setPixmap(pixmap)
-        background_label.setScaledContents(True)  # QLabel 크기에 맞게 이미지 조정
         background_label.resize(*self.screen_size)  # 전체 화면 크기로 설정
+        background_cache.apply(background_label, "resources/input.jpg", self.screen_size)
 
     def addCloseButton(self):
         """오른쪽 상단에 닫기 버튼 추가"""
@@ -114,55 +150,144 @@ class InputScreen(QWidget):
         self.virtual_keyboard.show()
         
     def send_text_to_server(self):
-        """엔터 키를 누르면 서버에 텍스트 전송하고 프린트"""
+        """엔터 키를 누르면 프린트하고 서버에 텍스트 전송"""
         text = self.line_edit.text()
         if text:
             # 가상 키보드가 있으면 숨기기
             if self.virtual_keyboard:
                 self.virtual_keyboard.hide()
             
-            # 서버에 텍스트 전송
-            encoded_text = urllib.parse.quote(text)
-            url = f"https://port-0-monitor-server-m47pn82w3295ead8.sel4.cloudtype.app/items/add_test/?text={encoded_text}"
-            try:
-                response = requests.post(url)
-                print(f"서버 응답: {response.status_code}")
-                
-                # 프린트 작업 시작
-                self.print_text(text)
-                
-                self.line_edit.clear()
-                self.stack.setCurrentIndex(3)
-            except Exception as e:
-                print(f"요청 중 오류 발생: {e}")
-                
-    def print_text(self, text):
-        """텍스트를 프린터로 인쇄"""
-        # 이미 인쇄 중인 경우 중복 실행 방지
-        if self.is_printing:
-            print("이미 인쇄 중입니다. 잠시 후 다시 시도하세요.")
-            return
+            # 스풀에 먼저 기록한 뒤 프린트 작업 시작 (네트워크를 기다리지 않음)
+            job_id = self.spool.add(text)
+            self.last_job_id = job_id
+            self.print_text(text, job_id)
             
-        self.is_printing = True
-        
-        # PrinterThread 인스턴스 생성
-        self.printer_thread = PrinterThread()
-        # PrinterThread 클래스 수정이 필요하면 여기서 텍스트 설정
-        self.printer_thread.text = text + "'s"
-        
-        # 완료 및 에러 시그널 연결
-        self.printer_thread.finished.connect(self.on_print_finished)
-        self.printer_thread.error.connect(self.on_print_error)
-        
-        # 스레드 시작
-        self.printer_thread.start()
+            # 서버 전송은 백그라운드에서 처리
+            self.upload_thread.submit(job_id, text)
+            
+            self.line_edit.clear()
+            self.stack.setCurrentIndex(COMPLETE_SCREEN_INDEX)
+            self.update_eta()
+                
+    def print_text(self, text, job_id):
+        """
+        텍스트를 인쇄 대기열에 추가
+
+        프린터를 쓸 수 없거나 대기열이 가득 차면 실패로 두지 않고 보관했다가(스풀에는 미완료로
+        남음) 자리가 나면 넣는다. 손님은 이미 완료 화면으로 넘어가므로 카드는 결국 인쇄되어야 한다.
+        """
+        if not self.print_queue.available():
+            # DLL 제한 시간을 기다리지 않고 바로 보관, 프린터가 복구되면 인쇄
+            print(f"사용할 수 있는 프린터가 없어 작업 {job_id}를 보관합니다. 복구되면 인쇄합니다.")
+            self.parked_jobs[job_id] = text
+            return None
+        if self.print_queue.submit(text + "'s", job_id) is None:
+            print(f"인쇄 대기열이 가득 차 작업 {job_id}를 보관합니다. 자리가 나면 인쇄합니다.")
+            self.parked_jobs[job_id] = text
+            return None
+        return job_id
+
+    def retry_parked_jobs(self, *_):
+        """프린터가 다시 작업을 받을 수 있거나 대기열에 자리가 나면 보관한 작업을 순서대로 넣음"""
+        while self.parked_jobs and self.print_queue.available():
+            job_id = min(self.parked_jobs)
+            text = self.parked_jobs.pop(job_id)
+            if self.print_queue.submit(text + "'s", job_id) is None:
+                self.parked_jobs[job_id] = text
+                break
+
+    def on_breaker_changed(self, device_id, state, reason):
+        """프린터 회로가 닫히면(복구) 보관한 작업을 다시 보냄"""
+        self.retry_parked_jobs()
+
+    def resume_unfinished_jobs(self):
+        """스풀에 남아 있는 미완료 인쇄/전송 작업을 다시 대기열에 넣음"""
+        for job_id, text, interrupted in self.spool.unfinished_prints():
+            if interrupted:
+                # 인쇄 중 종료되어 카드가 이미 나왔을 수 있음: 스풀과 지표에 표시하고 다시 인쇄
+                print(f"인쇄 도중 종료된 작업 다시 인쇄 (작업 {job_id}, 중복 카드 가능)")
+                self.spool.mark_reprinting(job_id)
+                metrics.inc("psapp_reprints_total")
+            else:
+                print(f"미완료 인쇄 작업 재개 (작업 {job_id})")
+            # 대기열 한도를 넘는 작업은 보관했다가 자리가 나면 넣음
+            self.print_text(text, job_id)
+        for job_id, text in self.spool.unfinished_uploads():
+            self.upload_thread.submit(job_id, text)
         
-    def on_print_finished(self):
+    def on_print_started(self, job_id, wait):
+        self.spool.mark_print_started(job_id)
+
+    def on_print_finished(self, job_id):
         """인쇄 완료 처리"""
-        self.is_printing = False
-        print("인쇄가 완료되었습니다.")
+        self.spool.mark_printed(job_id, True)
+        print(f"인쇄가 완료되었습니다. (작업 {job_id})")
+        self.retry_parked_jobs()
         
-    def on_print_error(self, error_message):
+    def on_print_error(self, job_id, error_message):
         """인쇄 오류 처리"""
-        self.is_printing = False
-        print(f"인쇄 오류: {error_message}")
\ No newline at end of file
+        self.spool.mark_printed(job_id, False, error_message)
+        print(f"인쇄 오류 (작업 {job_id}): {error_message}")
+        self.retry_parked_jobs()
+
+    def on_print_deferred(self, job_id, reason):
+        """프린터 서비스가 지금 받을 수 없어 돌려보낸 작업을 보관 (스풀에는 미완료로 남음)"""
+        text = self.spool.text(job_id)
+        if text is None:
+            return
+        print(f"작업 {job_id}를 보관합니다 ({reason}). 프린터가 복구되면 인쇄합니다.")
+        self.parked_jobs[job_id] = text
+
+    def on_preview_ready(self, preview):
+        """방금 입력한 손님의 카드 미리보기를 완료 화면에 표시"""
+        if preview.job_id != self.last_job_id:
+            preview.release()
+            return
+        complete_screen = self.complete_screen(build=True)
+        if complete_screen is None:
+            preview.release()
+            return
+        complete_screen.show_preview(preview)
+
+    def complete_screen(self, build=False):
+        """
+        완료 화면을 반환 (LazyStack이 아닌 일반 QStackedWidget에서도 동작)
+
+        아직 만들어지지 않았으면 build일 때 LazyStack에서 만들고, 아니면 None을 반환한다.
+        """
+        if build and isinstance(self.stack, LazyStack):
+            return self.stack.page(COMPLETE_SCREEN_INDEX)
+        widget = self.stack.widget(COMPLETE_SCREEN_INDEX)
+        # LazyStack의 자리 표시용 빈 위젯은 완료 화면이 아님
+        return widget if hasattr(widget, "show_preview") else None
+
+    def on_queue_changed(self, depth, oldest_wait):
+        """인쇄 대기열 상태를 지표로 내보냄 (console=False 빌드에서도 /metrics와 metrics.prom으로 확인)"""
+        metrics.set("psapp_print_queue_depth", depth)
+        metrics.set("psapp_print_queue_oldest_wait_seconds", round(oldest_wait, 3))
+        print(f"인쇄 대기열: {depth}건 대기, 최장 대기 {oldest_wait:.1f}초")
+        self.update_eta()
+        # 프린터 서비스는 상태 변경 뒤 대기열 메시지로 사용 가능 여부를 알려 주므로 여기서도 재시도
+        if self.parked_jobs:
+            QTimer.singleShot(0, self.retry_parked_jobs)
+
+    def update_eta(self):
+        """방금 입력한 손님의 카드가 나오기까지 예상 시간을 완료 화면에 표시 (끝났거나 모르면 숨김)"""
+        complete_screen = self.complete_screen()
+        if complete_screen is None or self.last_job_id is None:
+            return
+        complete_screen.show_eta(self.print_queue.estimate(self.last_job_id))
+
+    def on_upload_finished(self, job_id, status_code):
+        """서버 전송 완료 처리"""
+        self.spool.mark_uploaded(job_id, True)
+        print(f"서버 응답: {status_code} (작업 {job_id})")
+
+    def on_upload_error(self, job_id, error_message):
+        """서버 전송 오류 처리"""
+        self.spool.mark_uploaded(job_id, False, error_message)
+        print(f"서버 전송 오류 (작업 {job_id}): {error_message}")
+
+    def on_batch_flushed(self, batch_size, latency):
+        """묶음 전송 지표 표시"""
+        print(f"서버 묶음 전송: {batch_size}건, {latency:.2f}초 ({self.upload_thread.stats()})")
@@ -0,0 +1,47 @@
+from PySide6.QtWidgets import QStackedWidget, QWidget
+from PySide6.QtCore import QTimer
+
+class LazyStack(QStackedWidget):
+    """
+    화면을 팩토리로 등록해 두고 처음 표시될 때 생성하는 QStackedWidget
+
+    현재 화면이 보이는 동안 흐름상 다음 화면을 이벤트 루프 유휴 시간에 미리 만든다.
+    """
+
+    def __init__(self, screen_size, main_window):
+        super().__init__()
+        self.screen_size = screen_size
+        self.main_window = main_window
+        self.factories = []
+        self.screens = {}  # 인덱스 -> 생성된 화면
+
+    def register(self, factory):
+        """화면 팩토리를 등록하고, 자리 표시용 빈 위젯을 넣어 둠"""
+        self.factories.append(factory)
+        self.addWidget(QWidget())
+        return len(self.factories) - 1
+
+    def page(self, index):
+        """index의 화면을 반환 (아직 없으면 생성). QWidget.screen()과 겹치지 않는 이름을 씀"""
+        screen = self.screens.get(index)
+        if screen is None:
+            screen = self.factories[index](self, self.screen_size, self.main_window)
+            placeholder = self.widget(index)
+            self.insertWidget(index, screen)
+            self.removeWidget(placeholder)
+            placeholder.deleteLater()
+            self.screens[index] = screen
+        return screen
+
+    def built_screen(self, index):
+        """이미 생성된 화면만 반환 (없으면 None)"""
+        return self.screens.get(index)
+
+    def setCurrentIndex(self, index):
+        self.page(index)
+        super().setCurrentIndex(index)
+        self.prefetch((index + 1) % len(self.factories))
+
+    def prefetch(self, index):
+        if index not in self.screens:
+            QTimer.singleShot(0, lambda: self.page(index))
@@ -1,5 +1,5 @@
 from PySide6.QtWidgets import QWidget, QLabel, QPushButton
-from PySide6.QtGui import QPixmap
+from screens.image_cache import background_cache
 
 class MainScreen(QWidget):
     def __init__(self, stack, screen_size, main_window):
@@ -14,11 +14,10 @@ class MainScreen(QWidget):
         self.addCloseButton()
         
     def setupBackground(self):
-        pixmap = QPixmap("resources/main.jpg")  # 이미지 로드
+        # 화면 크기로 미리 축소한 이미지를 사용 (다시 그릴 때 확대/축소하지 않음)
         background_label = QLabel(self)
-        background_label.setPixmap(pixmap)
-        background_label.setScaledContents(True)  # QLabel 크기에 맞게 이미지 조정
         background_label.resize(*self.screen_size)  # 전체 화면 크기로 설정
+        background_cache.apply(background_label, "resources/main.jpg", self.screen_size)
 
     def addCloseButton(self):
         """오른쪽 상단에 닫기 버튼 추가"""
@@ -1,6 +1,6 @@
 from PySide6.QtWidgets import QWidget, QLabel, QPushButton
-from PySide6.QtGui import QPixmap
 from PySide6.QtCore import QRect
+from screens.image_cache import background_cache
 import os
 
 class SplashScreen(QWidget):
@@ -22,11 +22,10 @@ class SplashScreen(QWidget):
 
     def setupBackground(self):
         # main.py에서 이미 chdir을 실행했으므로 단순 상대 경로 사용
-        pixmap = QPixmap("resources/splash.jpg")  # 이미지 로드
+        # 화면 크기로 미리 축소한 이미지를 사용 (다시 그릴 때 확대/축소하지 않음)
         background_label = QLabel(self)
-        background_label.setPixmap(pixmap)
-        background_label.setScaledContents(True)  # QLabel 크기에 맞게 이미지 조정
         background_label.resize(*self.screen_size)  # 전체 화면 크기로 설정
+        background_cache.apply(background_label, "resources/splash.jpg", self.screen_size, blocking=True)
 
     def addCloseButton(self):
         """오른쪽 상단에 닫기 버튼 추가"""
@@ -0,0 +1,136 @@
+import sqlite3
+import time
+
+DEFAULT_SPOOL_PATH = "spool.db"
+
+# 완료된 작업을 보관하는 기간 (초)
+KEEP_SECONDS = 7 * 24 * 60 * 60
+# 서버 전송에 실패한 작업을 다시 보내 보는 기간 (초). 지나면 정리한다
+FAILED_UPLOAD_KEEP_SECONDS = 30 * 24 * 60 * 60
+# 이만큼 작업이 추가될 때마다 자동 정리
+COMPACT_EVERY = 500
+
+STATE_PENDING = "pending"
+STATE_PRINTING = "printing"  # 인쇄를 시작했지만 결과를 받지 못함 (카드가 나왔을 수 있음)
+STATE_DONE = "done"
+STATE_FAILED = "failed"
+
+# 인쇄 도중 종료되어 다시 인쇄한 작업에 남기는 표시
+REPRINT_NOTE = "인쇄 중 종료되어 다시 인쇄함 (중복 카드 가능)"
+
+class JobSpool:
+    """
+    입력된 이름과 인쇄/전송 상태를 디스크에 남기는 작업 스풀 (SQLite WAL)
+
+    앱이 비정상 종료되어도 이름이 사라지지 않도록 제출 즉시 기록하고,
+    다음 실행 때 끝나지 않은 인쇄/전송을 다시 처리할 수 있게 한다.
+    GUI 스레드에서만 사용한다.
+    """
+
+    def __init__(self, path=DEFAULT_SPOOL_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # 정전에도 커밋된 작업이 남도록 매 커밋마다 fsync
+        self.conn.execute("PRAGMA synchronous=FULL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                text TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                print_state TEXT NOT NULL DEFAULT 'pending',
+                upload_state TEXT NOT NULL DEFAULT 'pending',
+                last_error TEXT
+            )
+        """)
+        self.conn.commit()
+        self.added_since_compact = 0
+
+    def add(self, text):
+        """새 작업을 기록하고 작업 ID를 반환"""
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO jobs (text, created_at) VALUES (?, ?)", (text, time.time())
+            )
+        self.added_since_compact += 1
+        if self.added_since_compact >= COMPACT_EVERY:
+            self.compact()
+        return cursor.lastrowid
+
+    def mark_printed(self, job_id, ok, error=None):
+        self._set_state("print_state", job_id, ok, error)
+
+    def mark_print_started(self, job_id):
+        """프린터가 작업을 가져감 (이후 비정상 종료되면 카드가 이미 나왔을 수 있음)"""
+        with self.conn:
+            self.conn.execute(
+                "UPDATE jobs SET print_state = ? WHERE id = ? AND print_state = ?",
+                (STATE_PRINTING, job_id, STATE_PENDING),
+            )
+
+    def mark_reprinting(self, job_id):
+        """인쇄 도중 종료된 작업을 다시 인쇄함을 표시 (카드가 두 장 나왔을 수 있음)"""
+        with self.conn:
+            self.conn.execute(
+                "UPDATE jobs SET print_state = ?, last_error = ? WHERE id = ?",
+                (STATE_PENDING, REPRINT_NOTE, job_id),
+            )
+
+    def mark_uploaded(self, job_id, ok, error=None):
+        self._set_state("upload_state", job_id, ok, error)
+
+    def _set_state(self, column, job_id, ok, error):
+        state = STATE_DONE if ok else STATE_FAILED
+        with self.conn:
+            self.conn.execute(
+                f"UPDATE jobs SET {column} = ?, last_error = COALESCE(?, last_error) WHERE id = ?",
+                (state, error, job_id),
+            )
+
+    def text(self, job_id):
+        """작업의 이름 (없으면 None)"""
+        row = self.conn.execute("SELECT text FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return row[0] if row else None
+
+    def unfinished_prints(self):
+        """인쇄가 끝나지 않은 채 남은 작업 [(작업 ID, 이름, 인쇄 중이었는지)]"""
+        return [
+            (job_id, text, state == STATE_PRINTING)
+            for job_id, text, state in self.conn.execute(
+                "SELECT id, text, print_state FROM jobs WHERE print_state IN (?, ?) ORDER BY id",
+                (STATE_PENDING, STATE_PRINTING),
+            )
+        ]
+
+    def unfinished_uploads(self):
+        """서버 전송이 끝나지 않았거나 실패한 작업 [(작업 ID, 이름)]"""
+        return self.conn.execute(
+            "SELECT id, text FROM jobs WHERE upload_state != ? ORDER BY id", (STATE_DONE,)
+        ).fetchall()
+
+    def compact(self, keep_seconds=KEEP_SECONDS, failed_upload_keep_seconds=FAILED_UPLOAD_KEEP_SECONDS):
+        """
+        보관 기간이 지난 완료 작업을 지우고 WAL 파일을 비움
+
+        서버 전송에 실패한 작업은 실행할 때마다 다시 보내므로 더 오래 두지만,
+        서버가 오래 멈춰도 스풀이 끝없이 커지지 않도록 그 기간이 지나면 지운다.
+        """
+        now = time.time()
+        with self.conn:
+            deleted = self.conn.execute(
+                "DELETE FROM jobs WHERE print_state IN (?, ?) AND ("
+                "(upload_state = ? AND created_at < ?) OR (upload_state = ? AND created_at < ?))",
+                (
+                    STATE_DONE, STATE_FAILED,
+                    STATE_DONE, now - keep_seconds,
+                    STATE_FAILED, now - failed_upload_keep_seconds,
+                ),
+            ).rowcount
+        if deleted:
+            self.conn.execute("VACUUM")
+        self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self.added_since_compact = 0
+        return deleted
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,113 @@
+"""
+시작 시간 분석용 import 프로파일러
+
+PyInstaller onefile 빌드에서는 -X importtime을 쓸 수 없으므로, 환경 변수
+PSAPP_IMPORT_PROFILE=1 또는 --import-profile 인자로 켜면 모듈별 import 시간을
+직접 측정해 import_profile.txt에 기록한다 (console=False 빌드에서도 확인 가능).
+"""
+import os
+import sys
+import threading
+import time
+
+PROFILE_ENV = "PSAPP_IMPORT_PROFILE"
+PROFILE_ARG = "--import-profile"
+REPORT_FILE = "import_profile.txt"
+
+class TimedLoader:
+    """exec_module 시간을 재는 로더 프록시 (나머지 속성은 원래 로더에 위임)"""
+
+    def __init__(self, profiler, name, loader):
+        self._profiler = profiler
+        self._name = name
+        self._loader = loader
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._profiler.enter(self._name)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler.leave(self._name)
+
+
+class ImportProfiler:
+    """
+    sys.meta_path 맨 앞에서 다른 finder의 결과를 감싸 모듈별 실행 시간을 기록
+
+    GUI 스레드와 모듈 미리 불러오기 스레드가 동시에 import하므로, 진행 중인 import
+    스택과 재진입 플래그는 스레드별로 두고 결과 목록만 잠금으로 공유한다.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.records = []  # (모듈 이름, 누적 시간, 자체 시간)
+
+    def _stack(self):
+        """이 스레드의 [모듈 이름, 시작 시각, 하위 모듈 시간] 스택"""
+        stack = getattr(self.local, "stack", None)
+        if stack is None:
+            stack = self.local.stack = []
+        return stack
+
+    def find_spec(self, name, path, target=None):
+        if getattr(self.local, "finding", False):
+            return None
+        self.local.finding = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(name, path, target)
+                if spec is not None:
+                    if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                        spec.loader = TimedLoader(self, name, spec.loader)
+                    return spec
+            return None
+        finally:
+            self.local.finding = False
+
+    def enter(self, name):
+        self._stack().append([name, time.perf_counter(), 0.0])
+
+    def leave(self, name):
+        stack = self._stack()
+        name, started, children = stack.pop()
+        total = time.perf_counter() - started
+        with self.lock:
+            self.records.append((name, total, total - children))
+        if stack:
+            stack[-1][2] += total
+
+    def report(self, limit=40):
+        with self.lock:
+            records = list(self.records)
+        lines = [f"시작 후 {time.perf_counter() - self.started:.3f}초 시점, 모듈 {len(records)}개"]
+        lines.append(f"{'누적(ms)':>10} {'자체(ms)':>10}  모듈")
+        for name, total, own in sorted(records, key=lambda r: r[1], reverse=True)[:limit]:
+            lines.append(f"{total * 1000:10.1f} {own * 1000:10.1f}  {name}")
+        return "\n".join(lines)
+
+    def write_report(self, path=REPORT_FILE):
+        report = self.report()
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+        print(report)
+
+
+profiler = None
+
+def install_if_requested():
+    """환경 변수나 인자로 요청된 경우에만 프로파일러를 설치"""
+    global profiler
+    if os.environ.get(PROFILE_ENV) or PROFILE_ARG in sys.argv:
+        profiler = ImportProfiler()
+        sys.meta_path.insert(0, profiler)
+    return profiler
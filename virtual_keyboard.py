@@ -41,14 +41,9 @@ class VirtualKeyboard(QWidget):
     def initUI(self):
         self.layout = QVBoxLayout()
         self.layout.setSpacing(5)
-        self.setStyleSheet(f"""
-        VirtualKeyboard {{
-            background-color: {self.bg_color};
-            border: {self.border_width}px solid {self.border_color};
-            border-radius: {self.border_radius}px;
-            padding: {self.padding}px;
-        }}
-        """)
+        # 스타일시트는 키보드 전체에 한 번만 설정하고, 키 종류/상태는 동적 속성으로 구분
+        self.setStyleSheet(self.get_keyboard_style())
+        self.setFont(QFont('Pretendard', self.font_size))
             
         self.keys = [
             ['Q', 'W', 'E', 'R', 'T', 'Y', 'U', 'I', 'O', 'P', '←'],
@@ -60,56 +55,32 @@ class VirtualKeyboard(QWidget):
         self.fixed_button_width = 100
         
         self.button_widgets = []
-        for row_idx, row in enumerate(self.keys):
+        self.letter_buttons = []
+        for row in self.keys:
             row_buttons = []
+            row_layout = QHBoxLayout()
+            row_layout.setSpacing(5)
             
-            # 상단 3줄은 고정 너비 사용
-            if row_idx < 4:
-                row_layout = QHBoxLayout()
-                row_layout.setSpacing(5)
+            for key in row:
+                # Backspace 버튼 특별 처리
+                if key == '←':
+                    button = self.create_button(key, self.backspace, "backspace")
+                    self.backspace_button = button
+                else:
+                    button = self.create_button(self.get_display_key(key), None)
+                    button.clicked.connect(lambda checked, text=key: self.button_clicked(text))
+                    self.letter_buttons.append((button, key))
                 
-                for key in row:
-                    button = QPushButton(self.get_display_key(key))
-                    button.setFont(QFont('Pretendard', self.font_size))
-                    
-                    # Backspace 버튼 특별 처리
-                    if key == '←':
-                        button.clicked.connect(self.backspace)
-                        button.setStyleSheet(self.get_special_button_style(self.backspace_btn_color))
-                    else:
-                        button.clicked.connect(lambda checked, text=key: self.button_clicked(text))
-                        button.setStyleSheet(self.get_button_style())
-                    
-                    # 버튼 너비 고정, 높이는 확장
-                    button.setFixedWidth(self.fixed_button_width)
-                    button.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Expanding)
-                    
-                    row_layout.addWidget(button)
-                    row_buttons.append(button)
+                # 버튼 너비 고정, 높이는 확장
+                button.setFixedWidth(self.fixed_button_width)
+                button.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Expanding)
                 
-                # 각 줄을 중앙 정렬
-                row_layout.addStretch(1)
-                row_layout.insertStretch(0, 1)
+                row_layout.addWidget(button)
+                row_buttons.append(button)
             
-            # 마지막 줄은 기존 방식 유지
-            else:
-                row_layout = QGridLayout()
-                row_layout.setSpacing(5)
-                
-                for i, key in enumerate(row):
-                    button = QPushButton(self.get_display_key(key))
-                    button.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
-                    button.setFont(QFont('Pretendard', self.font_size))
-                    
-                    # Backspace 버튼 특별 처리
-                    if key == '←':
-                        button.clicked.connect(self.backspace)
-                        button.setStyleSheet(self.get_special_button_style(self.backspace_btn_color))
-                    else:
-                        button.clicked.connect(lambda checked, text=key: self.button_clicked(text))
-                        button.setStyleSheet(self.get_button_style())
-                    row_layout.addWidget(button, 0, i)
-                    row_buttons.append(button)
+            # 각 줄을 중앙 정렬
+            row_layout.addStretch(1)
+            row_layout.insertStretch(0, 1)
             
             self.layout.addLayout(row_layout)
             self.button_widgets.append(row_buttons)
@@ -117,142 +88,121 @@ class VirtualKeyboard(QWidget):
         special_layout = QGridLayout()
         special_layout.setSpacing(5)
 
-        # 각 버튼 설정
-        shift_btn = QPushButton('Shift')
-        shift_btn.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
-        shift_btn.setFont(QFont('Pretendard', self.font_size))
-        shift_btn.clicked.connect(self.toggle_shift)
-        shift_btn.setStyleSheet(self.get_special_button_style(self.shift_btn_color))
-        shift_btn.setFixedWidth(200)
+        # 특수 키는 속성으로 바로 참조 (findChildren으로 찾지 않음)
+        self.shift_button = self.create_button('Shift', self.toggle_shift, "shift")
+        self.shift_button.setFixedWidth(200)
 
-        space_btn = QPushButton('Space')
-        space_btn.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
-        space_btn.setFont(QFont('Pretendard', self.font_size))
-        space_btn.clicked.connect(self.space_pressed)
-        space_btn.setStyleSheet(self.get_button_style())
-        space_btn.setFixedWidth(600)
+        self.space_button = self.create_button('Space', self.space_pressed)
+        self.space_button.setFixedWidth(600)
 
         # 다음 버튼 추가
-        next_btn = QPushButton('다음')
-        next_btn.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
-        next_btn.setFont(QFont('Pretendard', self.font_size))
-        next_btn.clicked.connect(self.next_pressed)
-        next_btn.setStyleSheet(self.get_special_button_style(self.next_btn_color))
-        next_btn.setFixedWidth(200)
+        self.next_button = self.create_button('다음', self.next_pressed, "next")
+        self.next_button.setFixedWidth(200)
         
         # 레이아웃에 버튼 추가
-        special_layout.addWidget(shift_btn, 0, 0)
-        special_layout.addWidget(space_btn, 0, 1)
-        special_layout.addWidget(next_btn, 0, 2)
-        
-        # 열 비율 설정 제거 (고정 너비 사용)
-        # special_layout.setColumnStretch(0, 2)
-        # special_layout.setColumnStretch(1, 4)
-        # special_layout.setColumnStretch(2, 2)
+        special_layout.addWidget(self.shift_button, 0, 0)
+        special_layout.addWidget(self.space_button, 0, 1)
+        special_layout.addWidget(self.next_button, 0, 2)
 
         self.layout.addLayout(special_layout)
         self.setLayout(self.layout)
 
+    def create_button(self, text, slot, role=None):
+        button = QPushButton(text)
+        button.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+        # 포커스를 가져가지 않아야 입력창 커서와 선택 영역이 유지됨
+        button.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        if role:
+            button.setProperty("role", role)
+        if slot:
+            button.clicked.connect(slot)
+        return button
+
     def button_clicked(self, key):
-        current_text = self.input_widget.text()
-        
         char = key.upper() if self.is_uppercase else key.lower()
-        self.input_widget.setText(current_text + char)
+        self.insert_text(char)
         self.bumper = True
         
     def insert_text(self, char):
+        # 커서 위치에 삽입 (선택 영역이 있으면 대체), 전체 문자열을 다시 만들지 않음
         if char:
-            self.input_widget.setText(self.input_widget.text() + char)
-            self.input_widget.setCursorPosition(len(self.input_widget.text()))
+            self.input_widget.insert(char)
 
-    def toggle_shift(self):
-        self.is_uppercase = not self.is_uppercase
+    def set_uppercase(self, uppercase):
+        if uppercase == self.is_uppercase:
+            return
+        self.is_uppercase = uppercase
         self.update_keyboard_labels()
-        
-        # shift 버튼 색상 업데이트
-        shift_button = None
-        for widget in self.findChildren(QPushButton):
-            if widget.text().lower() == 'shift':
-                shift_button = widget
-                break
-                
-        if shift_button:
-            if self.is_uppercase:
-                shift_button.setStyleSheet(self.get_special_button_style(self.shift_btn_active_color))
-            else:
-                shift_button.setStyleSheet(self.get_special_button_style(self.shift_btn_color))
+
+        # shift 버튼은 active 속성만 바꾸고 해당 버튼만 다시 polish
+        self.shift_button.setProperty("active", uppercase)
+        style = self.shift_button.style()
+        style.unpolish(self.shift_button)
+        style.polish(self.shift_button)
+        self.shift_button.update()
+
+    def toggle_shift(self):
+        self.set_uppercase(not self.is_uppercase)
 
     def space_pressed(self):
         self.insert_text(' ')
         self.bumper = True
 
     def backspace(self):
-        text = self.input_widget.text()
-        if not text:
-            return
-
-        text = text[:-1]
-        self.input_widget.setText(text)
-        self.input_widget.setCursorPosition(len(text))
+        self.input_widget.backspace()
 
     def next_pressed(self):
         """다음 버튼 클릭 시 동작"""
         # shift 상태 초기화 (대문자 상태 해제)
-        if self.is_uppercase:
-            self.is_uppercase = False
-            self.update_keyboard_labels()
-            
-            # shift 버튼 색상 업데이트
-            shift_button = None
-            for widget in self.findChildren(QPushButton):
-                if widget.text().lower() == 'shift':
-                    shift_button = widget
-                    break
-                    
-            if shift_button:
-                shift_button.setStyleSheet(self.get_special_button_style(self.shift_btn_color))
+        self.set_uppercase(False)
         
         # 콜백 함수가 설정되어 있으면 호출
         if self.on_next_pressed:
             self.on_next_pressed()
             
     def update_keyboard_labels(self):
-        for row_buttons, row_keys in zip(self.button_widgets, self.keys):
-            for button, key in zip(row_buttons, row_keys):
-                button.setText(key.upper() if self.is_uppercase else key.lower())
+        for button, key in self.letter_buttons:
+            button.setText(key.upper() if self.is_uppercase else key.lower())
 
     def get_display_key(self, key):
         if self.is_uppercase:
             return key.upper()
         return key.lower()
 
-    def get_button_style(self):
+    def get_keyboard_style(self):
         return f"""
-            QPushButton {{
-                background-color: {self.button_bg_color};
-                color: {self.button_text_color};
-                border: none;
-                border-radius: {self.button_radius}px;
-            }}
-            QPushButton:pressed {{
-                background-color: {self.button_pressed_color};
-            }}
+        VirtualKeyboard {{
+            background-color: {self.bg_color};
+            border: {self.border_width}px solid {self.border_color};
+            border-radius: {self.border_radius}px;
+            padding: {self.padding}px;
+        }}
+        QPushButton {{
+            background-color: {self.button_bg_color};
+            color: {self.button_text_color};
+            border: none;
+            border-radius: {self.button_radius}px;
+        }}
+        QPushButton:pressed {{
+            background-color: {self.button_pressed_color};
+        }}
+        {self.get_special_button_style('[role="backspace"]', self.backspace_btn_color)}
+        {self.get_special_button_style('[role="shift"]', self.shift_btn_color)}
+        {self.get_special_button_style('[role="shift"][active="true"]', self.shift_btn_active_color)}
+        {self.get_special_button_style('[role="next"]', self.next_btn_color)}
         """
 
-    def get_special_button_style(self, color):
+    def get_special_button_style(self, selector, color):
         return f"""
-            QPushButton {{
-                background-color: {color};
-                color: {self.button_text_color};
-                border: none;
-                border-radius: {self.button_radius}px;
-            }}
-            QPushButton:pressed {{
-                background-color: {self.darken_color(color)};
-            }}
+        QPushButton{selector} {{
+            background-color: {color};
+        }}
+        QPushButton{selector}:pressed {{
+            background-color: {self.darken_color(color)};
+        }}
         """
 
     def darken_color(self, color):
         # 색상 코드가 #RRGGBB 형식이라고 가정
         r, g, b = int(color[1:3], 16), int(color[3:5], 16), int(color[5:7], 16)
-        return f'#{max(0, r-30):02X}{max(0, g-30):02X}{max(0, b-30):02X}'
\ No newline at end of file
+        return f'#{max(0, r-30):02X}{max(0, g-30):02X}{max(0, b-30):02X}'